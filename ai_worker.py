@@ -0,0 +1,51 @@
+import threading
+import time
+
+
+class AIWorker:
+    """Executa a busca da IA numa thread em segundo plano, sobre uma cópia do jogo
+
+    A interface continua processando eventos enquanto a IA pensa; quando is_done() fica
+    verdadeiro, a jogada está em move. cancel() interrompe a busca rapidamente.
+    """
+
+    def __init__(self, game):
+        self.snapshot = game.snapshot()
+        self.move = None
+        self.error = None
+        self.started_at = None
+        self.elapsed = None
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="gomoku-ai", daemon=True)
+
+    def start(self):
+        self.started_at = time.perf_counter()
+        self._thread.start()
+        return self
+
+    def _run(self):
+        try:
+            self.move = self.snapshot.find_best_move()
+        except Exception as exc:  # O erro é repassado para a thread principal
+            self.error = exc
+        finally:
+            self.elapsed = time.perf_counter() - self.started_at
+            self._done.set()
+
+    def is_done(self):
+        return self._done.is_set()
+
+    def cancel(self, timeout=1.0):
+        """Pede para a busca parar e espera a thread terminar"""
+        self.snapshot.cancel_search()
+        self._thread.join(timeout)
+
+    def search_stats(self):
+        """Estatísticas da busca (SearchStats) depois que ela termina"""
+        return self.snapshot.search_stats
+
+    def result(self):
+        """Retorna a jogada calculada, relançando um erro ocorrido na busca"""
+        if self.error is not None:
+            raise self.error
+        return self.move
@@ -0,0 +1,306 @@
+import argparse
+import json
+import os
+import sys
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+# Análise em lote de posições, lidas como fluxo JSONL de um arquivo ou da entrada padrão.
+# Cada linha é um objeto com "moves" (lista de [linha, coluna], alternando a partir do
+# jogador 1) ou "board" (matriz com 0, 1 e 2), e opcionalmente "id", "depth" e "time".
+# Só o motor (gomoku.py) é importado, nunca o pygame.
+
+DEFAULT_SETTINGS = {'board_size': 15, 'depth': 4, 'time': 2.0, 'use_vct': False, 'evaluate_only': False}
+
+# Intervalo mínimo entre gravações do ponto de retomada (segundos)
+CHECKPOINT_INTERVAL = 1.0
+
+_settings = None
+_games = {}
+
+
+def _init_worker(settings):
+    global _settings
+    _settings = settings
+
+
+def _engine(board_size, ai_player):
+    """Jogo reaproveitado entre posições no mesmo processo (um por tamanho e lado a jogar)"""
+    from gomoku import GomokuGame
+
+    game = _games.get((board_size, ai_player))
+    if game is None:
+        game = GomokuGame(board_size, ai_player=ai_player)
+        game.use_vct = _settings['use_vct']
+        _games[(board_size, ai_player)] = game
+    return game
+
+
+def _setup_position(record, board_size):
+    """Monta a posição do registro; retorna (jogo, lado a jogar)
+
+    O jogo é carregado com load_board em vez de reiniciado, para que a tabela de
+    transposição continue valendo entre posições da mesma partida.
+    """
+    import numpy as np
+
+    if 'moves' in record:
+        board = np.zeros((board_size, board_size), dtype=int)
+        player = 1
+        for row, col in record['moves']:
+            if not (0 <= row < board_size and 0 <= col < board_size) or board[row, col]:
+                raise ValueError(f"jogada inválida: {[row, col]}")
+            board[row, col] = player
+            player = 3 - player
+    else:
+        board = np.asarray(record['board'], dtype=int)
+        if board.shape != (board_size, board_size):
+            raise ValueError(f"tabuleiro {board.shape} diferente de {board_size}x{board_size}")
+        ones, twos = int(np.count_nonzero(board == 1)), int(np.count_nonzero(board == 2))
+        if twos not in (ones, ones - 1):
+            raise ValueError(f"contagem de peças impossível: {ones} x {twos}")
+        player = 1 if ones == twos else 2
+
+    game = _engine(board_size, player)
+    game.load_board(board)
+    game.game_over = False
+    game.winner = None
+    for i, j in zip(*np.nonzero(board)):
+        if game.check_win(int(i), int(j)):
+            game.game_over = True
+            game.winner = int(board[i, j])
+            break
+    return game, player
+
+
+def analyse_line(index, line):
+    """Analisa uma linha de entrada; retorna o registro de saída (com 'error' se ela for inválida)"""
+    result = {'index': index}
+    try:
+        record = json.loads(line)
+        if not isinstance(record, dict):
+            raise TypeError(f"esperado um objeto JSON, recebido {type(record).__name__}")
+        result['id'] = record.get('id')
+        board_size = record.get('board_size', _settings['board_size'])
+        game, player = _setup_position(record, board_size)
+        result['to_move'] = player
+        result['evaluation'] = game.evaluate_board()
+        if game.game_over:
+            result['winner'] = game.winner
+            return result
+        if _settings['evaluate_only']:
+            return result
+
+        game.set_difficulty(search_depth=record.get('depth', _settings['depth']),
+                            time_limit=record.get('time', _settings['time']))
+        started = time.perf_counter()
+        move = game.find_best_move()
+        stats = game.search_stats
+        result.update({
+            'move': list(move) if move is not None else None,
+            'score': stats.score,
+            'depth': stats.depth,
+            'source': stats.source,
+            'nodes': stats.counters['nodes'],
+            'elapsed': round(time.perf_counter() - started, 4)
+        })
+    except (ValueError, KeyError, TypeError, IndexError) as exc:
+        result['error'] = f"{type(exc).__name__}: {exc}"
+    return result
+
+
+def _analyse_chunk(chunk):
+    return [analyse_line(index, line) for index, line in chunk]
+
+
+def read_chunks(stream, chunk_size, start=0, done=frozenset()):
+    """Agrupa as linhas não vazias em blocos de (índice, linha), sem ler o fluxo inteiro
+
+    O índice é o número da linha (a partir de 0); linhas antes de start e as que estão em
+    done (já analisadas numa execução anterior) são puladas. Cada bloco sai com o índice
+    da linha seguinte à última, usado como ponto de retomada.
+    """
+    chunk = []
+    for index, line in enumerate(stream):
+        if index < start or index in done or not line.strip():
+            continue
+        chunk.append((index, line))
+        if len(chunk) == chunk_size:
+            yield chunk, index + 1
+            chunk = []
+    if chunk:
+        yield chunk, chunk[-1][0] + 1
+
+
+def checkpoint_path(output):
+    return output + '.checkpoint'
+
+
+def load_checkpoint(output):
+    """Prepara a retomada: ponto de retomada e índices já gravados depois dele
+
+    A última linha do arquivo de saída é descartada se estiver incompleta. Os índices
+    depois do ponto de retomada são no máximo os blocos que estavam em andamento (sem o
+    arquivo do ponto de retomada, todos os índices gravados são lidos).
+    """
+    if not os.path.exists(output):
+        return 0, set()
+    watermark = 0
+    path = checkpoint_path(output)
+    if os.path.exists(path):
+        with open(path) as f:
+            watermark = json.load(f)['watermark']
+
+    with open(output, 'rb+') as f:
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        if size:
+            # Procura a última quebra de linha de trás para frente
+            position = size
+            while position > 0:
+                step = min(4096, position)
+                f.seek(position - step)
+                block = f.read(step)
+                newline = block.rfind(b'\n')
+                if newline >= 0:
+                    position = position - step + newline + 1
+                    break
+                position -= step
+            if position != size:
+                f.truncate(position)
+
+    done = set()
+    with open(output) as f:
+        for line in f:
+            index = json.loads(line)['index']
+            if index >= watermark:
+                done.add(index)
+    return watermark, done
+
+
+def save_checkpoint(output, watermark):
+    path = checkpoint_path(output)
+    with open(path + '.tmp', 'w') as f:
+        json.dump({'watermark': watermark}, f)
+    os.replace(path + '.tmp', path)
+
+
+def run_analysis(source, output, settings=None, workers=None, max_in_flight=None, chunk_size=1,
+                 ordered=False, resume=False, progress=None):
+    """Analisa as posições de source (um iterável de linhas) e grava os resultados em output
+
+    No máximo max_in_flight blocos ficam pendentes ao mesmo tempo (em análise ou esperando
+    os anteriores), o que limita a leitura da entrada e a memória: um novo bloco só é lido
+    quando outro termina. Os resultados são gravados assim que cada bloco termina (ou na
+    ordem da entrada, com ordered). Com um arquivo de saída, o ponto de retomada é gravado
+    ao lado dele, e resume=True continua uma execução interrompida. Retorna o número de
+    posições analisadas nesta execução.
+    """
+    settings = dict(DEFAULT_SETTINGS, **(settings or {}))
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = max_in_flight or 2 * workers
+    to_file = output not in (None, '-')
+
+    watermark, done = load_checkpoint(output) if to_file and resume else (0, set())
+    if to_file and not resume and os.path.exists(checkpoint_path(output)):
+        os.unlink(checkpoint_path(output))
+    out = open(output, 'a' if resume else 'w') if to_file else sys.stdout
+
+    chunks = read_chunks(source, chunk_size, watermark, frozenset(done))
+    pending = OrderedDict()  # Bloco -> (fim, future), na ordem da entrada
+    running = set()  # Futures ainda não recolhidos por wait
+    analysed = 0
+    last_checkpoint = time.perf_counter()
+    exhausted = False
+
+    def write(results):
+        for result in results:
+            out.write(json.dumps(result) + '\n')
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(settings,)) as pool:
+            next_id = 0
+            while True:
+                while not exhausted and len(pending) < max_in_flight:
+                    item = next(chunks, None)
+                    if item is None:
+                        exhausted = True
+                        break
+                    chunk, end = item
+                    future = pool.submit(_analyse_chunk, chunk)
+                    pending[next_id] = (end, future)
+                    running.add(future)
+                    next_id += 1
+                if not pending:
+                    break
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                running -= finished
+                if not ordered:
+                    for future in finished:
+                        results = future.result()
+                        write(results)
+                        analysed += len(results)
+
+                # Blocos recolhidos no início da fila avançam o ponto de retomada
+                while pending and next(iter(pending.values()))[1] not in running:
+                    _, (end, future) = pending.popitem(last=False)
+                    if ordered:
+                        results = future.result()
+                        write(results)
+                        analysed += len(results)
+                    watermark = end
+
+                if progress is not None:
+                    progress(analysed)
+                if to_file and time.perf_counter() - last_checkpoint >= CHECKPOINT_INTERVAL:
+                    out.flush()
+                    os.fsync(out.fileno())
+                    save_checkpoint(output, watermark)
+                    last_checkpoint = time.perf_counter()
+    finally:
+        out.flush()
+        if to_file:
+            os.fsync(out.fileno())
+            out.close()
+            save_checkpoint(output, watermark)
+    return analysed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Análise em lote de posições de Gomoku (JSONL)")
+    parser.add_argument('input', nargs='?', default='-', help="arquivo JSONL ou - para a entrada padrão")
+    parser.add_argument('--output', '-o', default='-', help="arquivo JSONL de saída ou - para a saída padrão")
+    parser.add_argument('--depth', type=int, default=DEFAULT_SETTINGS['depth'])
+    parser.add_argument('--time', type=float, default=DEFAULT_SETTINGS['time'], help="segundos por posição")
+    parser.add_argument('--board-size', type=int, default=DEFAULT_SETTINGS['board_size'])
+    parser.add_argument('--vct', action='store_true')
+    parser.add_argument('--evaluate-only', action='store_true', help="só evaluate_board, sem busca")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--max-in-flight', type=int, default=None, help="blocos pendentes ao mesmo tempo")
+    parser.add_argument('--chunk-size', type=int, default=1, help="posições por tarefa do pool")
+    parser.add_argument('--ordered', action='store_true', help="grava na ordem da entrada")
+    parser.add_argument('--resume', action='store_true', help="continua uma execução interrompida")
+    args = parser.parse_args()
+
+    if args.resume and args.output == '-':
+        parser.error("--resume exige um arquivo de saída")
+
+    settings = {'board_size': args.board_size, 'depth': args.depth, 'time': args.time,
+                'use_vct': args.vct, 'evaluate_only': args.evaluate_only}
+    started = time.perf_counter()
+    source = sys.stdin if args.input == '-' else open(args.input)
+    try:
+        count = run_analysis(source, args.output, settings, args.workers, args.max_in_flight, args.chunk_size,
+                             args.ordered, args.resume)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+    elapsed = time.perf_counter() - started
+    print(f"{count} posições em {elapsed:.1f}s ({count / elapsed if elapsed else 0:.1f} por segundo)",
+          file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,338 @@
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from compact_game import CompactGame
+from gomoku import GomokuGame
+from symmetry import NUM_SYMMETRIES, transform_cell
+
+# Corpus fixo de posições: jogadas alternadas a partir do jogador 1 (humano)
+BENCHMARK_POSITIONS = {
+    'abertura': [(7, 7), (8, 8), (6, 8)],
+    'meio_jogo': [(7, 7), (7, 8), (8, 6), (6, 8), (9, 5), (10, 4), (8, 8), (8, 7), (6, 6), (9, 9),
+                  (5, 5), (4, 4), (7, 5), (6, 4)],
+    'tatico': [(7, 7), (6, 6), (7, 9), (8, 8), (5, 8), (9, 9), (10, 10), (6, 7), (8, 10)],
+    'defesa': [(7, 7), (8, 8), (7, 8), (6, 6), (7, 9), (9, 9), (5, 5)],
+}
+
+# Células deixadas vazias na posição de tabuleiro quase cheio
+NEAR_FULL_EMPTY = 20
+
+
+def near_full_board(board_size=15, empty=NEAR_FULL_EMPTY, seed=7):
+    """Tabuleiro quase cheio sem nenhuma sequência de cinco
+
+    O padrão ((linha // 2) + coluna) % 2 nunca forma mais de duas peças iguais seguidas
+    em nenhuma direção; algumas células escolhidas de forma determinística ficam vazias.
+    """
+    rows, cols = np.indices((board_size, board_size))
+    board = (rows // 2 + cols) % 2 + 1
+    cells = random.Random(seed).sample(range(board_size * board_size), empty)
+    board.flat[cells] = 0
+    return board
+
+
+def benchmark_game(name, board_size=15, board_backend='numpy'):
+    """Jogo novo na posição do corpus, com a IA a jogar"""
+    game = GomokuGame(board_size, board_backend=board_backend)
+    if name == 'quase_cheio':
+        board = near_full_board(board_size)
+        # A IA é o segundo jogador: a posição precisa ter uma peça a mais do jogador 1
+        ones = np.flatnonzero(board == 1)
+        twos = np.flatnonzero(board == 2)
+        surplus = len(twos) - len(ones) + 1
+        if surplus > 0:
+            board.flat[twos[:surplus]] = 0
+        game.load_board(board)
+        return game
+
+    player = game.human_player
+    for row, col in BENCHMARK_POSITIONS[name]:
+        game.make_move(row, col, player)
+        player = game.ai_player if player == game.human_player else game.human_player
+    return game
+
+
+def position_names():
+    return list(BENCHMARK_POSITIONS) + ['quase_cheio']
+
+
+def _time_call(function, number, repeat):
+    """Melhor tempo médio por chamada (em microssegundos) entre repeat rodadas de number chamadas"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best * 1e6
+
+
+def micro_benchmarks(game, number=200, repeat=7):
+    """Tempo por chamada das operações básicas numa posição"""
+    last = game.candidates.stack[-1] if game.candidates.stack else game.board_size ** 2 // 2
+    row, col = divmod(last, game.board_size)
+    return {
+        'evaluate_board_us': _time_call(game.evaluate_board, number * 10, repeat),
+        'evaluate_board_full_us': _time_call(game.evaluate_board_full, max(1, number // 20), repeat),
+        'check_win_us': _time_call(lambda: game.check_win(row, col), number * 10, repeat),
+        'get_valid_moves_us': _time_call(game.get_valid_moves, number, repeat),
+        'update_search_area_us': _time_call(game.update_search_area, max(1, number // 10), repeat),
+    }
+
+
+def search_benchmark(name, depth, board_backend='numpy', time_limit=600.0):
+    """find_best_move numa posição com profundidade fixa e tabela de transposição vazia"""
+    game = benchmark_game(name, board_backend=board_backend)
+    game.set_difficulty(search_depth=depth, time_limit=time_limit)
+    start = time.perf_counter()
+    move = game.find_best_move()
+    elapsed = time.perf_counter() - start
+    nodes = game.ordering_stats['nodes']
+    return {
+        'move': list(move),
+        # Posições resolvidas pela busca de ameaças não chegam ao Minimax
+        'stage': game.search_stats.source,
+        'depth': game.last_search_depth,
+        'score': game.last_search_score if game.last_search_depth else None,
+        'time': elapsed,
+        'nodes': nodes,
+        'nodes_per_second': nodes / elapsed if elapsed else 0.0,
+        'time_to_depth': game.search_stats.depth_times,
+    }
+
+
+def run_suite(depth=3, board_backend='numpy', micro_number=200, micro_repeat=7, positions=None):
+    """Executa o conjunto completo e retorna os resultados num dicionário serializável em JSON"""
+    results = {
+        'environment': {
+            'python': sys.version.split()[0],
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'processor': platform.machine(),
+        },
+        'settings': {'depth': depth, 'board_backend': board_backend,
+                     'micro_number': micro_number, 'micro_repeat': micro_repeat},
+        'positions': {}
+    }
+
+    for name in positions or position_names():
+        game = benchmark_game(name, board_backend=board_backend)
+        entry = {'stones': game.stone_count}
+        entry['micro'] = micro_benchmarks(game, micro_number, micro_repeat)
+        entry['search'] = search_benchmark(name, depth, board_backend)
+        results['positions'][name] = entry
+        search = entry['search']
+        print(f"{name:12s} {search['move']} {search['stage']} prof. {search['depth']} {search['time']:.3f}s "
+              f"{search['nodes']} nós ({search['nodes_per_second']:.0f} nós/s)")
+    return results
+
+
+# Métricas comparadas: caminho no resultado e se um valor maior é melhor
+COMPARED_METRICS = [
+    (('micro', 'evaluate_board_us'), False),
+    (('micro', 'evaluate_board_full_us'), False),
+    (('micro', 'check_win_us'), False),
+    (('micro', 'get_valid_moves_us'), False),
+    (('micro', 'update_search_area_us'), False),
+    (('search', 'time'), False),
+    (('search', 'nodes_per_second'), True),
+]
+
+
+def compare(baseline, current, threshold=0.20):
+    """Compara dois resultados; retorna a lista de (posição, métrica, base, atual, variação, status)
+
+    O status é 'regressão' ou 'melhoria' quando a variação passa do limiar, 'mudou' quando a
+    jogada escolhida, a etapa ou a contagem de nós é diferente e 'ok' nos demais casos.
+    """
+    rows = []
+    for name, entry in current['positions'].items():
+        base_entry = baseline['positions'].get(name)
+        if base_entry is None:
+            continue
+
+        for (group, metric), higher_is_better in COMPARED_METRICS:
+            base = base_entry[group].get(metric)
+            value = entry[group].get(metric)
+            if not base or value is None:
+                continue
+            change = (value - base) / base
+            worse = -change if higher_is_better else change
+            status = 'regressão' if worse > threshold else 'melhoria' if worse < -threshold else 'ok'
+            rows.append((name, metric, base, value, change, status))
+
+        # Com profundidade fixa a busca é determinística: jogada e nós só mudam se o algoritmo mudou
+        for metric in ('move', 'stage', 'nodes'):
+            base = base_entry['search'].get(metric)
+            value = entry['search'].get(metric)
+            if base != value:
+                rows.append((name, metric, base, value, None, 'mudou'))
+    return rows
+
+
+def print_comparison(rows):
+    for name, metric, base, value, change, status in rows:
+        if change is None:
+            print(f"{name:12s} {metric:24s} {base} -> {value} [{status}]")
+        else:
+            print(f"{name:12s} {metric:24s} {base:12.2f} -> {value:12.2f} {change:+7.1%} [{status}]")
+    regressions = sum(1 for row in rows if row[5] == 'regressão')
+    print(f"{regressions} regressões")
+    return regressions
+
+
+def random_openings(count, stones=5, board_size=15, radius=2, seed=11):
+    """Aberturas aleatórias (número ímpar de peças, com a IA a jogar) perto do centro"""
+    rng = random.Random(seed)
+    center = board_size // 2
+    cells = [(center + i, center + j) for i in range(-radius, radius + 1) for j in range(-radius, radius + 1)]
+    return [rng.sample(cells, stones) for _ in range(count)]
+
+
+def measure_symmetry_cache(openings, depth=3, time_limit=30.0, board_size=15):
+    """Tempo para responder às 8 orientações de cada abertura, sem e com o cache canônico
+
+    Um único jogo é reiniciado entre as posições, como entre partidas na interface. Retorna
+    {'sem_cache': ..., 'com_cache': ...} com tempo total, taxa de acerto e jogadas.
+    """
+    results = {}
+    for label, entries in (('sem_cache', 0), ('com_cache', 4096)):
+        game = GomokuGame(board_size, search_cache_entries=entries)
+        game.set_difficulty(search_depth=depth, time_limit=time_limit)
+        total = 0.0
+        moves = []
+        for opening in openings:
+            for symmetry in range(NUM_SYMMETRIES):
+                game.reset_game()
+                player = game.human_player
+                for row, col in opening:
+                    game.make_move(*transform_cell(row, col, symmetry, board_size), player)
+                    player = game.ai_player if player == game.human_player else game.human_player
+                start = time.perf_counter()
+                move = game.find_best_move()
+                total += time.perf_counter() - start
+                moves.append(move)
+        results[label] = {'time': total, 'moves': moves,
+                          'cache': game.search_cache.stats() if game.search_cache else None}
+    return results
+
+
+def _played(game, name):
+    """Joga as jogadas da posição do corpus em game (GomokuGame ou CompactGame)"""
+    player = game.human_player
+    for row, col in BENCHMARK_POSITIONS[name]:
+        game.make_move(row, col, player)
+        player = 3 - player
+    return game
+
+
+def measure_memory(count=200, name='meio_jogo', board_size=15):
+    """Bytes por partida (tracemalloc) de cada representação, todas na mesma posição
+
+    Uma partida é criada antes de medir, para que as tabelas compartilhadas entre as
+    instâncias (geometria das janelas, chaves de Zobrist, tabelas de padrões) não entrem na
+    conta. O GomokuGame padrão aloca a tabela de transposição inteira, então é medido com
+    menos instâncias.
+    """
+    factories = (
+        ('GomokuGame', max(1, count // 20), lambda: _played(GomokuGame(board_size), name)),
+        ('GomokuGame sem tabela/cache', count,
+         lambda: _played(GomokuGame(board_size, tt_memory_mb=0, search_cache_entries=0), name)),
+        ('CompactGame', count, lambda: _played(CompactGame(board_size), name)),
+    )
+    results = {}
+    for label, instances, factory in factories:
+        factory()
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        games = [factory() for _ in range(instances)]
+        used = tracemalloc.get_traced_memory()[0] - before
+        tracemalloc.stop()
+        results[label] = used / len(games)
+        del games
+
+    compact = _played(CompactGame(board_size), name)
+    serialized = compact.to_bytes()
+    start = time.perf_counter()
+    for _ in range(1000):
+        CompactGame.from_bytes(serialized)
+    results['serializado'] = len(serialized)
+    results['from_bytes_us'] = (time.perf_counter() - start) * 1000
+    return results
+
+
+def _load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks da busca e das operações do tabuleiro")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    run = sub.add_parser('run', help="executa o conjunto e grava os resultados em JSON")
+    run.add_argument('--output', default='benchmark.json')
+    run.add_argument('--depth', type=int, default=3)
+    run.add_argument('--backend', choices=GomokuGame.BOARD_BACKENDS, default='numpy')
+    run.add_argument('--positions', nargs='*', choices=position_names())
+    run.add_argument('--number', type=int, default=200, help="chamadas por rodada dos micro-benchmarks")
+    run.add_argument('--repeat', type=int, default=7)
+    run.add_argument('--baseline', help="compara com este resultado ao terminar")
+    run.add_argument('--threshold', type=float, default=0.20)
+
+    cmp = sub.add_parser('compare', help="compara um resultado com uma base")
+    cmp.add_argument('baseline')
+    cmp.add_argument('current')
+    cmp.add_argument('--threshold', type=float, default=0.20)
+
+    sym = sub.add_parser('symmetry', help="mede o cache de busca por posição canônica nas aberturas")
+    sym.add_argument('--openings', type=int, default=6)
+    sym.add_argument('--stones', type=int, default=5)
+    sym.add_argument('--depth', type=int, default=3)
+
+    mem = sub.add_parser('memory', help="mede os bytes por partida de cada representação do estado")
+    mem.add_argument('--count', type=int, default=200)
+    mem.add_argument('--position', choices=list(BENCHMARK_POSITIONS), default='meio_jogo')
+
+    args = parser.parse_args()
+    if args.command == 'memory':
+        results = measure_memory(args.count, args.position)
+        for label in ('GomokuGame', 'GomokuGame sem tabela/cache', 'CompactGame'):
+            print(f"{label}: {results[label]:,.0f} bytes por partida")
+        print(f"CompactGame serializado: {results['serializado']} bytes, "
+              f"from_bytes em {results['from_bytes_us']:.1f} µs")
+        return
+    if args.command == 'symmetry':
+        results = measure_symmetry_cache(random_openings(args.openings, args.stones), args.depth)
+        without, with_cache = results['sem_cache'], results['com_cache']
+        cache = with_cache['cache']
+        print(f"sem cache: {without['time']:.2f}s | com cache: {with_cache['time']:.2f}s "
+              f"({1 - with_cache['time'] / without['time']:.0%} menos) | "
+              f"acertos {cache['hits']}/{cache['hits'] + cache['misses']} ({cache['hit_rate']:.0%})")
+        return
+    if args.command == 'run':
+        results = run_suite(args.depth, args.backend, args.number, args.repeat, args.positions)
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"resultados gravados em {args.output}")
+        if not args.baseline:
+            return
+        baseline, current = _load(args.baseline), results
+    else:
+        baseline, current = _load(args.baseline), _load(args.current)
+
+    if baseline['settings'] != current['settings']:
+        print(f"aviso: configurações diferentes ({baseline['settings']} x {current['settings']})")
+    regressions = print_comparison(compare(baseline, current, args.threshold))
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+import numpy as np
+
+
+class BitBoard:
+    """Tabuleiro que guarda as peças de cada jogador como uma máscara de bits
+
+    A célula (row, col) ocupa o bit row * stride + col, com stride = board_size + 1: a coluna
+    extra de cada linha fica sempre vazia e impede que os deslocamentos horizontais e
+    diagonais passem de uma linha para a outra. Suporta a mesma indexação board[i, j] do
+    ndarray, então pode substituir GomokuGame.board sem mudar a interface gráfica.
+    """
+
+    def __init__(self, board_size):
+        self.board_size = board_size
+        self.shape = (board_size, board_size)
+        self.stride = board_size + 1
+        # Índice 0 não é usado: bits[1] e bits[2] são as peças de cada jogador
+        self.bits = [0, 0, 0]
+
+        # Deslocamentos: horizontal, vertical, diagonal e antidiagonal
+        self.shifts = (1, self.stride, self.stride + 1, self.stride - 1)
+
+        # Para cada célula e direção, máscara dos inícios de sequências de 5 que passam por ela
+        self._five_masks = []
+        for i in range(board_size):
+            for j in range(board_size):
+                bit = i * self.stride + j
+                masks = []
+                for shift in self.shifts:
+                    mask = 0
+                    for k in range(5):
+                        start = bit - k * shift
+                        if start >= 0:
+                            mask |= 1 << start
+                    masks.append(mask)
+                self._five_masks.append(tuple(masks))
+
+    def __getitem__(self, key):
+        row, col = key
+        if isinstance(row, slice) or isinstance(col, slice):
+            return self.to_array()[key]
+
+        bit = 1 << (int(row) * self.stride + int(col))
+        if self.bits[1] & bit:
+            return 1
+        if self.bits[2] & bit:
+            return 2
+        return 0
+
+    def __setitem__(self, key, value):
+        row, col = key
+        bit = 1 << (int(row) * self.stride + int(col))
+        self.bits[1] &= ~bit
+        self.bits[2] &= ~bit
+        if value:
+            self.bits[int(value)] |= bit
+
+    def __array__(self, dtype=None, copy=None):
+        array = self.to_array()
+        return array.astype(dtype) if dtype is not None else array
+
+    def to_array(self):
+        """Converte para o ndarray equivalente"""
+        array = np.zeros(self.shape, dtype=int)
+        for player in (1, 2):
+            bits = self.bits[player]
+            while bits:
+                low = bits & -bits
+                row, col = divmod(low.bit_length() - 1, self.stride)
+                array[row, col] = player
+                bits ^= low
+        return array
+
+    def copy(self):
+        """Cópia independente do tabuleiro"""
+        other = BitBoard.__new__(BitBoard)
+        other.__dict__.update(self.__dict__)
+        other.bits = list(self.bits)
+        return other
+
+    def check_win(self, row, col):
+        """Verifica se a peça em (row, col) faz parte de uma sequência de 5"""
+        origin = row * self.stride + col
+        if (self.bits[1] >> origin) & 1:
+            bits = self.bits[1]
+        elif (self.bits[2] >> origin) & 1:
+            bits = self.bits[2]
+        else:
+            return False
+
+        masks = self._five_masks[row * self.board_size + col]
+        for shift, mask in zip(self.shifts, masks):
+            starts = bits & (bits >> shift)
+            starts &= starts >> (2 * shift)
+            starts &= bits >> (4 * shift)
+            if starts & mask:
+                return True
+        return False
+
+    def count_consecutive(self, row, col):
+        """Maior sequência de peças iguais que passa por (row, col)"""
+        player = self[row, col]
+        bits = self.bits[player] if player else 0
+        origin = row * self.stride + col
+        max_count = 1
+
+        for shift in self.shifts:
+            count = 1
+            bit = origin + shift
+            while (bits >> bit) & 1:
+                count += 1
+                bit += shift
+            bit = origin - shift
+            while bit >= 0 and (bits >> bit) & 1:
+                count += 1
+                bit -= shift
+            if count > max_count:
+                max_count = count
+
+        return max_count
@@ -0,0 +1,195 @@
+from functools import lru_cache
+
+
+@lru_cache(maxsize=None)
+def neighborhoods(board_size, radius=2):
+    """Para cada célula, lista (índice plano, (linha, coluna)) dos vizinhos no quadrado de raio dado"""
+    result = []
+    for i in range(board_size):
+        for j in range(board_size):
+            cells = []
+            for di in range(-radius, radius + 1):
+                for dj in range(-radius, radius + 1):
+                    ni, nj = i + di, j + dj
+                    if (di or dj) and 0 <= ni < board_size and 0 <= nj < board_size:
+                        cells.append((ni * board_size + nj, (ni, nj)))
+            result.append(tuple(cells))
+    return tuple(result)
+
+
+class CandidateSet:
+    """Conjunto incremental de jogadas candidatas (células vazias próximas a alguma peça)
+
+    Cada célula guarda quantas peças existem na sua vizinhança; ela é candidata enquanto
+    estiver vazia e essa contagem for positiva. Colocar ou remover uma peça só visita os
+    vizinhos da célula, e as peças colocadas ficam numa pilha para desfazer em ordem.
+    """
+
+    def __init__(self, board_size, radius=2):
+        self.board_size = board_size
+        self.radius = radius
+        self.center = (board_size // 2, board_size // 2)
+        self._neighbors = neighborhoods(board_size, radius)
+        self.cells = set()
+        self.clear()
+
+    def clear(self):
+        """Volta ao tabuleiro vazio (apenas o centro é candidato)"""
+        num_cells = self.board_size * self.board_size
+        self.counts = [0] * num_cells
+        self.occupied = bytearray(num_cells)
+        self.stack = []
+        self.stone_count = 0
+        # O mesmo objeto set é mantido para que referências externas continuem válidas
+        self.cells.clear()
+        self.cells.add(self.center)
+
+    def rebuild(self, board):
+        """Reconstrói o conjunto a partir de um tabuleiro completo"""
+        self.clear()
+        for i in range(self.board_size):
+            for j in range(self.board_size):
+                if board[i, j] != 0:
+                    self.add(i, j)
+
+    def add(self, row, col):
+        """Registra uma peça colocada em (row, col)"""
+        cell = row * self.board_size + col
+        if self.stone_count == 0:
+            self.cells.discard(self.center)
+
+        self.occupied[cell] = 1
+        self.stone_count += 1
+        self.stack.append(cell)
+        self.cells.discard((row, col))
+
+        counts = self.counts
+        occupied = self.occupied
+        for neighbor, pos in self._neighbors[cell]:
+            count = counts[neighbor] + 1
+            counts[neighbor] = count
+            if count == 1 and not occupied[neighbor]:
+                self.cells.add(pos)
+
+    def remove(self, row, col):
+        """Registra a remoção da peça em (row, col)"""
+        cell = row * self.board_size + col
+        if self.stack and self.stack[-1] == cell:
+            self.stack.pop()
+        else:
+            self.stack.remove(cell)
+
+        self.occupied[cell] = 0
+        self.stone_count -= 1
+
+        counts = self.counts
+        for neighbor, pos in self._neighbors[cell]:
+            count = counts[neighbor] - 1
+            counts[neighbor] = count
+            if count == 0:
+                self.cells.discard(pos)
+
+        if counts[cell] > 0:
+            self.cells.add((row, col))
+        if self.stone_count == 0:
+            self.cells.add(self.center)
+
+    def undo(self):
+        """Desfaz a última peça registrada e retorna sua posição"""
+        cell = self.stack[-1]
+        row, col = divmod(cell, self.board_size)
+        self.remove(row, col)
+        return row, col
+
+
+class SparseCandidateSet:
+    """Versão de CandidateSet para tabuleiros esparsos: contagens num dicionário
+
+    Os vizinhos de uma célula são calculados na primeira vez que ela recebe uma peça, então a
+    memória e o custo dependem só das células usadas. Com bounded=False as células não são
+    limitadas às bordas do tabuleiro.
+    """
+
+    def __init__(self, board_size, radius=2, bounded=True):
+        self.board_size = board_size
+        self.radius = radius
+        self.bounded = bounded
+        self.center = (board_size // 2, board_size // 2)
+        self._offsets = tuple((di, dj) for di in range(-radius, radius + 1) for dj in range(-radius, radius + 1)
+                              if di or dj)
+        self._neighbor_cache = {}
+        self.cells = set()
+        self.clear()
+
+    def clear(self):
+        """Volta ao tabuleiro vazio (apenas o centro é candidato)"""
+        self.counts = {}
+        self.occupied = set()
+        self.stack = []
+        self.stone_count = 0
+        self.cells.clear()
+        self.cells.add(self.center)
+
+    def rebuild(self, board):
+        """Reconstrói o conjunto a partir das peças de um tabuleiro esparso"""
+        self.clear()
+        for row, col in board.stones:
+            self.add(row, col)
+
+    def _neighbors(self, row, col):
+        neighbors = self._neighbor_cache.get((row, col))
+        if neighbors is None:
+            size = self.board_size
+            neighbors = tuple((row + di, col + dj) for di, dj in self._offsets
+                              if not self.bounded or (0 <= row + di < size and 0 <= col + dj < size))
+            self._neighbor_cache[(row, col)] = neighbors
+        return neighbors
+
+    def add(self, row, col):
+        """Registra uma peça colocada em (row, col)"""
+        if self.stone_count == 0:
+            self.cells.discard(self.center)
+
+        self.occupied.add((row, col))
+        self.stone_count += 1
+        self.stack.append(row * self.board_size + col)
+        self.cells.discard((row, col))
+
+        counts = self.counts
+        occupied = self.occupied
+        for pos in self._neighbors(row, col):
+            count = counts.get(pos, 0) + 1
+            counts[pos] = count
+            if count == 1 and pos not in occupied:
+                self.cells.add(pos)
+
+    def remove(self, row, col):
+        """Registra a remoção da peça em (row, col)"""
+        cell = row * self.board_size + col
+        if self.stack and self.stack[-1] == cell:
+            self.stack.pop()
+        else:
+            self.stack.remove(cell)
+
+        self.occupied.discard((row, col))
+        self.stone_count -= 1
+
+        counts = self.counts
+        for pos in self._neighbors(row, col):
+            count = counts[pos] - 1
+            if count:
+                counts[pos] = count
+            else:
+                del counts[pos]
+                self.cells.discard(pos)
+
+        if counts.get((row, col), 0) > 0:
+            self.cells.add((row, col))
+        if self.stone_count == 0:
+            self.cells.add(self.center)
+
+    def undo(self):
+        """Desfaz a última peça registrada e retorna sua posição"""
+        row, col = divmod(self.stack[-1], self.board_size)
+        self.remove(row, col)
+        return row, col
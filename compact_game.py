@@ -0,0 +1,275 @@
+import struct
+from functools import lru_cache
+
+import numpy as np
+
+# Estado compacto de uma partida, para manter milhares de partidas vivas num mesmo processo
+# (por exemplo, as sessões do server.py): só as regras e o tabuleiro, sem tabela de
+# transposição, avaliação incremental nem campos da interface. A busca continua sendo feita
+# por um GomokuGame, carregado a partir deste estado com load_into.
+
+# Formato serializado: assinatura, lado, cor da IA, vencedor (0 = nenhum), última jogada
+# (0xFFFF = nenhuma), seguido das máscaras de bits das peças 1 e 2
+HEADER = struct.Struct('<2sBBBH')
+MAGIC = b'GC'
+NO_MOVE = 0xFFFF
+
+
+class BoardGeometry:
+    """Máscaras de um tamanho de tabuleiro, compartilhadas por todas as partidas desse tamanho
+
+    A célula (row, col) ocupa o bit row * stride + col, com stride = board_size + 1, como no
+    BitBoard: a coluna extra fica sempre vazia e impede que os deslocamentos passem de uma
+    linha para a outra.
+    """
+
+    __slots__ = ('board_size', 'stride', 'full_mask', 'shifts', 'five_masks', 'neighbors', 'mask_bytes')
+
+    def __init__(self, board_size, radius=2):
+        self.board_size = board_size
+        self.stride = board_size + 1
+        self.shifts = (1, self.stride, self.stride + 1, self.stride - 1)
+        self.mask_bytes = (board_size * self.stride + 7) // 8
+        self.full_mask = 0
+        five_masks = []
+        neighbors = []
+        for row in range(board_size):
+            for col in range(board_size):
+                bit = row * self.stride + col
+                self.full_mask |= 1 << bit
+                # Inícios das sequências de 5 que passam pela célula, por direção
+                masks = []
+                for shift in self.shifts:
+                    mask = 0
+                    for k in range(5):
+                        if bit - k * shift >= 0:
+                            mask |= 1 << (bit - k * shift)
+                    masks.append(mask)
+                five_masks.append(tuple(masks))
+                # Vizinhança quadrada de raio dado, que vira candidata quando a célula é ocupada
+                mask = 0
+                for r in range(max(0, row - radius), min(board_size, row + radius + 1)):
+                    for c in range(max(0, col - radius), min(board_size, col + radius + 1)):
+                        mask |= 1 << (r * self.stride + c)
+                neighbors.append(mask)
+        self.five_masks = tuple(five_masks)
+        self.neighbors = tuple(neighbors)
+
+
+@lru_cache(maxsize=None)
+def board_geometry(board_size):
+    return BoardGeometry(board_size)
+
+
+class UIState:
+    """Campos que só a interface usa (mensagem e de quem é a vez), fora do estado do motor
+
+    Fica com o GomokuGUI: nem o GomokuGame nem o CompactGame guardam esses campos.
+    """
+
+    __slots__ = ('message', 'current_player')
+
+    def __init__(self, message="Sua vez de jogar", current_player=1):
+        self.message = message
+        self.current_player = current_player
+
+
+class CompactGame:
+    """Partida com o tabuleiro em duas máscaras de bits e as candidatas numa terceira
+
+    Sem __dict__: cada instância guarda só inteiros e uma referência à geometria
+    compartilhada do tamanho do tabuleiro. snapshot()/restore() copiam o estado em O(1)
+    (os inteiros são imutáveis) e to_bytes()/from_bytes() o serializam em poucas dezenas
+    de bytes, para tirar sessões da memória e trazê-las de volta.
+    """
+
+    __slots__ = ('geometry', 'ai_player', 'bits', 'candidates', 'stone_count', 'winner', 'last_move')
+
+    def __init__(self, board_size=15, ai_player=2):
+        if ai_player not in (1, 2):
+            raise ValueError(f"Jogador da IA inválido: {ai_player}")
+        self.geometry = board_geometry(board_size)
+        self.ai_player = ai_player
+        self.bits = (0, 0, 0)  # Índice 0 não é usado: bits[1] e bits[2] são as peças de cada jogador
+        self.candidates = 0
+        self.stone_count = 0
+        self.winner = None
+        self.last_move = None
+
+    @property
+    def board_size(self):
+        return self.geometry.board_size
+
+    @property
+    def human_player(self):
+        return 3 - self.ai_player
+
+    @property
+    def game_over(self):
+        return self.winner is not None
+
+    def _bit(self, row, col):
+        return row * self.geometry.stride + col
+
+    def get(self, row, col):
+        """Jogador na célula (0 se vazia)"""
+        bit = 1 << self._bit(row, col)
+        if self.bits[1] & bit:
+            return 1
+        if self.bits[2] & bit:
+            return 2
+        return 0
+
+    def make_move(self, row, col, player):
+        """Faz uma jogada; retorna False se ela for inválida (fora do tabuleiro ou casa ocupada)"""
+        size = self.board_size
+        if not (0 <= row < size and 0 <= col < size) or self.get(row, col):
+            return False
+        bit = self._bit(row, col)
+        bits = list(self.bits)
+        bits[player] |= 1 << bit
+        self.bits = tuple(bits)
+        self.stone_count += 1
+        self.last_move = (row, col)
+        self.candidates = (self.candidates | self.geometry.neighbors[row * size + col]) & ~(bits[1] | bits[2])
+        if self.check_win(row, col):
+            self.winner = player
+        return True
+
+    def remove_stone(self, row, col):
+        """Tira a peça da célula (para desfazer jogadas) e recalcula as candidatas"""
+        bit = 1 << self._bit(row, col)
+        self.bits = tuple(value & ~bit for value in self.bits)
+        self.stone_count -= 1
+        self.winner = None
+        self.last_move = None
+        self._rebuild_candidates()
+
+    def _rebuild_candidates(self):
+        occupied = self.bits[1] | self.bits[2]
+        stride, size = self.geometry.stride, self.board_size
+        neighbors = self.geometry.neighbors
+        candidates = 0
+        remaining = occupied
+        while remaining:
+            low = remaining & -remaining
+            row, col = divmod(low.bit_length() - 1, stride)
+            candidates |= neighbors[row * size + col]
+            remaining ^= low
+        self.candidates = candidates & ~occupied
+
+    def check_win(self, row, col):
+        """Verifica se a peça em (row, col) faz parte de uma sequência de 5"""
+        player = self.get(row, col)
+        if not player:
+            return False
+        bits = self.bits[player]
+        geometry = self.geometry
+        for shift, mask in zip(geometry.shifts, geometry.five_masks[row * self.board_size + col]):
+            starts = bits & (bits >> shift)
+            starts &= starts >> (2 * shift)
+            starts &= bits >> (4 * shift)
+            if starts & mask:
+                return True
+        return False
+
+    def get_valid_moves(self):
+        """Células candidatas (vazias perto de alguma peça); o centro com o tabuleiro vazio"""
+        if not self.stone_count:
+            center = self.board_size // 2
+            return [(center, center)]
+        stride = self.geometry.stride
+        moves = []
+        remaining = self.candidates
+        while remaining:
+            low = remaining & -remaining
+            moves.append(divmod(low.bit_length() - 1, stride))
+            remaining ^= low
+        return moves
+
+    def board_array(self, dtype=np.int8):
+        """Tabuleiro como ndarray (size, size), no formato de GomokuGame.load_board"""
+        size, stride = self.board_size, self.geometry.stride
+        array = np.zeros(size * stride, dtype=dtype)
+        for player in (1, 2):
+            packed = np.frombuffer(self.bits[player].to_bytes(self.geometry.mask_bytes, 'little'), dtype=np.uint8)
+            cells = np.unpackbits(packed, bitorder='little')[:size * stride]
+            array[cells.astype(bool)] = player
+        return array.reshape(size, stride)[:, :size]
+
+    def load_board(self, board):
+        """Substitui o tabuleiro por um array (size, size) com 0, 1 e 2"""
+        board = np.asarray(board)
+        size = self.board_size
+        if board.shape != (size, size):
+            raise ValueError(f"Esperado um tabuleiro {size}x{size}, recebido {board.shape}")
+        padded = np.zeros((size, self.geometry.stride), dtype=np.uint8)
+        bits = [0, 0, 0]
+        for player in (1, 2):
+            padded[:, :size] = board == player
+            bits[player] = int.from_bytes(np.packbits(padded.ravel(), bitorder='little').tobytes(), 'little')
+        self.bits = tuple(bits)
+        self.stone_count = bits[1].bit_count() + bits[2].bit_count()
+        self.last_move = None
+        self._rebuild_candidates()
+        self.winner = None
+        for player in (1, 2):
+            if self._has_five(bits[player]):
+                self.winner = player
+
+    def _has_five(self, bits):
+        for shift in self.geometry.shifts:
+            starts = bits & (bits >> shift)
+            starts &= starts >> (2 * shift)
+            if starts & (bits >> (4 * shift)):
+                return True
+        return False
+
+    def snapshot(self):
+        """Estado completo numa tupla imutável (restaurável com restore)"""
+        return (self.board_size, self.ai_player, self.bits, self.candidates, self.stone_count,
+                self.winner, self.last_move)
+
+    def restore(self, snapshot):
+        board_size, self.ai_player, self.bits, self.candidates, self.stone_count, self.winner, \
+            self.last_move = snapshot
+        self.geometry = board_geometry(board_size)
+
+    def to_bytes(self):
+        """Serialização compacta; as candidatas e o número de peças são recalculados ao ler"""
+        last = NO_MOVE if self.last_move is None else self.last_move[0] * self.board_size + self.last_move[1]
+        length = self.geometry.mask_bytes
+        return (HEADER.pack(MAGIC, self.board_size, self.ai_player, self.winner or 0, last)
+                + self.bits[1].to_bytes(length, 'little') + self.bits[2].to_bytes(length, 'little'))
+
+    @classmethod
+    def from_bytes(cls, data):
+        magic, board_size, ai_player, winner, last = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError("Não é um estado de partida serializado")
+        game = cls(board_size, ai_player)
+        length = game.geometry.mask_bytes
+        offset = HEADER.size
+        if len(data) != offset + 2 * length:
+            raise ValueError(f"Tamanho inválido: {len(data)} bytes")
+        black = int.from_bytes(data[offset:offset + length], 'little')
+        white = int.from_bytes(data[offset + length:], 'little')
+        game.bits = (0, black, white)
+        game.stone_count = black.bit_count() + white.bit_count()
+        game.winner = winner or None
+        game.last_move = None if last == NO_MOVE else divmod(last, board_size)
+        game._rebuild_candidates()
+        return game
+
+    @classmethod
+    def from_game(cls, game):
+        """Estado compacto de um GomokuGame (tabuleiro limitado)"""
+        compact = cls(game.board_size, game.ai_player)
+        compact.load_board(np.asarray(game.board))
+        return compact
+
+    def load_into(self, game):
+        """Carrega este estado num GomokuGame do mesmo tamanho, para buscar ou jogar com ele"""
+        game.load_board(self.board_array())
+        game.game_over = self.winner is not None
+        game.winner = self.winner
@@ -0,0 +1,260 @@
+import argparse
+import asyncio
+import math
+import os
+import random
+import sys
+import time
+
+# Cliente do servidor do motor (server.py) e gerador de carga: cada sessão é uma partida
+# contra um adversário aleatório (jogadas perto das peças, barato para não pesar no cliente),
+# e o tempo entre o envio de cada jogada e a resposta do motor é a latência medida.
+
+
+class EngineError(Exception):
+    """Resposta ERROR ou UNKNOWN do servidor"""
+
+
+class EngineClient:
+    """Conexão com o servidor por TCP ou com um processo do motor pela entrada e saída padrão"""
+
+    def __init__(self, reader, writer, process=None):
+        self.reader = reader
+        self.writer = writer
+        self.process = process
+        self.debug = []  # Linhas DEBUG/MESSAGE da última resposta
+
+    @classmethod
+    async def connect(cls, host, port):
+        reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    @classmethod
+    async def spawn(cls, *args):
+        """Inicia server.py como subprocesso (modo stdin/stdout) com os argumentos dados"""
+        server = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'server.py')
+        process = await asyncio.create_subprocess_exec(sys.executable, server, *args,
+                                                       stdin=asyncio.subprocess.PIPE,
+                                                       stdout=asyncio.subprocess.PIPE)
+        return cls(process.stdout, process.stdin, process)
+
+    async def send(self, line):
+        self.writer.write((line + '\n').encode())
+        await self.writer.drain()
+
+    async def response(self):
+        """Próxima linha de resposta, guardando as linhas DEBUG e MESSAGE que vêm antes"""
+        self.debug = []
+        while True:
+            line = await self.reader.readline()
+            if not line:
+                raise ConnectionError("conexão encerrada pelo servidor")
+            line = line.decode().strip()
+            if line.split(' ', 1)[0] in ('DEBUG', 'MESSAGE'):
+                self.debug.append(line)
+                continue
+            if line.startswith(('ERROR', 'UNKNOWN')):
+                raise EngineError(line)
+            return line
+
+    async def command(self, line):
+        await self.send(line)
+        return await self.response()
+
+    async def start(self, board_size=15, turn_ms=None):
+        await self.command(f"START {board_size}")
+        if turn_ms is not None:
+            await self.send(f"INFO timeout_turn {turn_ms}")
+
+    @staticmethod
+    def _move(line):
+        x, y = (int(value) for value in line.split(','))
+        return y, x
+
+    async def begin(self):
+        """O motor joga primeiro; retorna a jogada como (linha, coluna)"""
+        return self._move(await self.command("BEGIN"))
+
+    async def turn(self, row, col):
+        """Envia a jogada do adversário e retorna a resposta do motor como (linha, coluna)"""
+        return self._move(await self.command(f"TURN {col},{row}"))
+
+    async def close(self):
+        try:
+            await self.send("END")
+        except ConnectionError:
+            pass
+        if self.process is not None:
+            await self.process.wait()
+        else:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except ConnectionError:
+                pass
+
+
+def random_reply(board, board_size, rng, radius=1):
+    """Jogada aleatória vizinha de alguma peça (ou o centro, com o tabuleiro vazio)"""
+    if not board:
+        return board_size // 2, board_size // 2
+    cells = [(r + dr, c + dc) for r, c in board for dr in range(-radius, radius + 1)
+             for dc in range(-radius, radius + 1)]
+    cells = [cell for cell in cells if cell not in board
+             and 0 <= cell[0] < board_size and 0 <= cell[1] < board_size]
+    return rng.choice(cells) if cells else None
+
+
+def has_five(board, row, col):
+    player = board[(row, col)]
+    for dr, dc in ((0, 1), (1, 0), (1, 1), (1, -1)):
+        count = 1
+        for sign in (1, -1):
+            r, c = row + sign * dr, col + sign * dc
+            while board.get((r, c)) == player:
+                count += 1
+                r, c = r + sign * dr, c + sign * dc
+        if count >= 5:
+            return True
+    return False
+
+
+async def play_session(client, board_size=15, max_moves=30, turn_ms=None, seed=0, engine_first=None,
+                       on_move=None):
+    """Joga uma partida contra o motor; retorna as latências (segundos) de cada resposta dele
+
+    O motor começa em metade das partidas (pela semente) e a partida termina com uma
+    sequência de 5, com o tabuleiro cheio ou depois de max_moves jogadas do motor.
+    """
+    rng = random.Random(seed)
+    board = {}  # (linha, coluna) -> 1 motor, 2 adversário
+    latencies = []
+    await client.start(board_size, turn_ms)
+    engine_first = rng.random() < 0.5 if engine_first is None else engine_first
+
+    reply = None
+    if not engine_first:
+        reply = random_reply(board, board_size, rng)
+        board[reply] = 2
+    for _ in range(max_moves):
+        started = time.perf_counter()
+        move = await (client.turn(*reply) if reply is not None else client.begin())
+        latencies.append(time.perf_counter() - started)
+        if move in board:
+            raise EngineError(f"jogada em casa ocupada: {move}")
+        board[move] = 1
+        if on_move is not None:
+            on_move(move, reply, client.debug)
+        if has_five(board, *move):
+            break
+        reply = random_reply(board, board_size, rng)
+        if reply is None:
+            break
+        board[reply] = 2
+        if has_five(board, *reply):
+            break
+    return latencies
+
+
+def percentile(values, fraction):
+    """Percentil pelo posto mais próximo (values já ordenados)"""
+    if not values:
+        return 0.0
+    return values[max(0, math.ceil(fraction * len(values)) - 1)]
+
+
+async def run_load(host, port, sessions=32, concurrency=8, board_size=15, max_moves=20, turn_ms=500, seed=0):
+    """Joga sessions partidas com até concurrency conexões simultâneas e mede as latências
+
+    Retorna o resumo: jogadas respondidas por segundo, percentis da latência, erros.
+    """
+    limit = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = []
+
+    async def one(index):
+        async with limit:
+            client = None
+            try:
+                client = await EngineClient.connect(host, port)
+                latencies.extend(await play_session(client, board_size, max_moves, turn_ms, seed + index))
+            except (EngineError, ConnectionError, OSError) as exc:
+                errors.append(str(exc))
+            finally:
+                if client is not None:
+                    await client.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(index) for index in range(sessions)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {'sessions': sessions, 'moves': len(latencies), 'errors': errors, 'elapsed': elapsed,
+            'moves_per_second': len(latencies) / elapsed if elapsed else 0.0,
+            'p50': percentile(latencies, 0.5), 'p95': percentile(latencies, 0.95),
+            'p99': percentile(latencies, 0.99), 'max': latencies[-1] if latencies else 0.0}
+
+
+def _print_board(board_size, moves):
+    symbols = {1: 'X', 2: 'O'}
+    for row in range(board_size):
+        print(' '.join(symbols.get(moves.get((row, col)), '.') for col in range(board_size)))
+
+
+async def _play(args):
+    if args.port is None:
+        client = await EngineClient.spawn('--time', str(args.turn_ms / 1000))
+    else:
+        client = await EngineClient.connect(args.host, args.port)
+    moves = {}
+
+    def show(move, reply, debug):
+        if reply is not None:
+            moves[reply] = 2
+        moves[move] = 1
+        print(f"adversário {reply} -> motor {move} {' '.join(debug)}")
+
+    try:
+        latencies = await play_session(client, args.board_size, args.moves, args.turn_ms, args.seed, on_move=show)
+    finally:
+        await client.close()
+    _print_board(args.board_size, moves)
+    print(f"{len(latencies)} respostas, média {sum(latencies) / len(latencies):.3f}s, máxima {max(latencies):.3f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cliente de teste e gerador de carga do servidor do motor")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    play = sub.add_parser('play', help="joga uma partida mostrando as jogadas")
+    play.add_argument('--port', type=int, default=None, help="servidor TCP (sem porta: inicia server.py pela entrada padrão)")
+    play.add_argument('--moves', type=int, default=30)
+
+    load = sub.add_parser('load', help="muitas partidas simultâneas; mede vazão e latência")
+    load.add_argument('--port', type=int, required=True)
+    load.add_argument('--sessions', type=int, default=32)
+    load.add_argument('--concurrency', type=int, default=8, help="conexões simultâneas")
+    load.add_argument('--moves', type=int, default=20, help="jogadas do motor por partida (no máximo)")
+
+    for command in (play, load):
+        command.add_argument('--host', default='127.0.0.1')
+        command.add_argument('--board-size', type=int, default=15)
+        command.add_argument('--turn-ms', type=int, default=500, help="tempo por jogada (INFO timeout_turn)")
+        command.add_argument('--seed', type=int, default=0)
+
+    args = parser.parse_args()
+    if args.command == 'play':
+        asyncio.run(_play(args))
+        return
+
+    summary = asyncio.run(run_load(args.host, args.port, args.sessions, args.concurrency, args.board_size,
+                                   args.moves, args.turn_ms, args.seed))
+    print(f"{summary['sessions']} partidas, {summary['moves']} respostas em {summary['elapsed']:.1f}s "
+          f"({summary['moves_per_second']:.1f} por segundo), {len(summary['errors'])} erros")
+    print(f"latência p50 {summary['p50'] * 1000:.0f} ms, p95 {summary['p95'] * 1000:.0f} ms, "
+          f"p99 {summary['p99'] * 1000:.0f} ms, máxima {summary['max'] * 1000:.0f} ms")
+    for error in summary['errors'][:5]:
+        print(f"  {error}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+from functools import lru_cache
+
+import numpy as np
+
+WINDOW_LENGTH = 5
+
+# Direções das janelas: horizontal, vertical, diagonal e antidiagonal
+WINDOW_DIRECTIONS = [(0, 1), (1, 0), (1, 1), (1, -1)]
+
+# Peso de cada posição da janela na codificação em base 3
+WINDOW_POWERS = [3 ** k for k in range(WINDOW_LENGTH)]
+
+# Quantidade de conteúdos possíveis de uma janela (vazio, jogador 1 ou jogador 2 em cada célula)
+NUM_WINDOW_CODES = 3 ** WINDOW_LENGTH
+
+
+def build_windows(board_size):
+    """Lista todas as janelas de 5 células do tabuleiro como tuplas de índices planos"""
+    windows = []
+    for r in range(board_size):
+        for c in range(board_size):
+            for dr, dc in WINDOW_DIRECTIONS:
+                end_r = r + (WINDOW_LENGTH - 1) * dr
+                end_c = c + (WINDOW_LENGTH - 1) * dc
+                if 0 <= end_r < board_size and 0 <= end_c < board_size:
+                    windows.append(tuple((r + k * dr) * board_size + c + k * dc
+                                         for k in range(WINDOW_LENGTH)))
+    return windows
+
+
+def build_cell_windows(board_size, windows):
+    """Para cada célula, lista (índice da janela, peso em base 3) das janelas que passam por ela"""
+    cell_windows = [[] for _ in range(board_size * board_size)]
+    for w, cells in enumerate(windows):
+        for k, cell in enumerate(cells):
+            cell_windows[cell].append((w, WINDOW_POWERS[k]))
+    return cell_windows
+
+
+@lru_cache(maxsize=None)
+def window_geometry(board_size):
+    """Geometria das janelas compartilhada por todas as partidas com o mesmo tamanho de tabuleiro"""
+    windows = build_windows(board_size)
+    cell_windows = build_cell_windows(board_size, windows)
+    return tuple(windows), tuple(tuple(entries) for entries in cell_windows)
+
+
+@lru_cache(maxsize=None)
+def window_cell_array(board_size):
+    """Índices das células de cada janela (mesma ordem de window_geometry) num array (W, 5)"""
+    return np.array(window_geometry(board_size)[0], dtype=np.intp).reshape(-1, WINDOW_LENGTH)
+
+
+class SparseCellWindows(dict):
+    """Janelas de cada célula (índice da janela, peso em base 3), criadas na primeira consulta"""
+
+    def __init__(self, geometry):
+        super().__init__()
+        self.geometry = geometry
+
+    def __missing__(self, cell):
+        entries = self.geometry.windows_through(cell)
+        self[cell] = entries
+        return entries
+
+
+class SparseWindowGeometry:
+    """Geometria das janelas para tabuleiros esparsos, criada só perto das peças
+
+    Em vez de listar as janelas do tabuleiro inteiro, cada janela é criada (com código 0)
+    na primeira vez que uma célula dela é consultada. Todas as janelas que passam por uma
+    célula são criadas quando uma peça é colocada nela, então uma janela nova está sempre
+    vazia e o custo acompanha o número de peças, não a área. Com bounded=False não há
+    bordas: só o índice plano linha * board_size + coluna precisa caber no tabuleiro virtual.
+    """
+
+    def __init__(self, board_size, bounded=True):
+        self.board_size = board_size
+        self.bounded = bounded
+        self.windows = []
+        self.codes = []
+        self.cell_windows = SparseCellWindows(self)
+        self._index = {}  # (célula inicial, direção) -> índice da janela
+
+    def windows_through(self, cell):
+        size = self.board_size
+        row, col = divmod(cell, size)
+        entries = []
+        for direction, (dr, dc) in enumerate(WINDOW_DIRECTIONS):
+            for k in range(WINDOW_LENGTH):
+                start_r, start_c = row - k * dr, col - k * dc
+                end_r = start_r + (WINDOW_LENGTH - 1) * dr
+                end_c = start_c + (WINDOW_LENGTH - 1) * dc
+                if self.bounded and not (0 <= start_r < size and 0 <= end_r < size
+                                         and 0 <= min(start_c, end_c) and max(start_c, end_c) < size):
+                    continue
+                key = (start_r * size + start_c, direction)
+                w = self._index.get(key)
+                if w is None:
+                    w = len(self.windows)
+                    self._index[key] = w
+                    self.windows.append(tuple((start_r + i * dr) * size + start_c + i * dc
+                                              for i in range(WINDOW_LENGTH)))
+                    self.codes.append(0)
+                entries.append((w, WINDOW_POWERS[k]))
+        return entries
+
+
+def decode_window(code):
+    """Converte o código em base 3 de uma janela de volta na lista de 5 células"""
+    segment = []
+    for _ in range(WINDOW_LENGTH):
+        segment.append(code % 3)
+        code //= 3
+    return segment
+
+
+class PatternWeights(dict):
+    """Dicionário de pesos que avisa quando é alterado
+
+    Qualquer modificação chama on_change(), o que permite reconstruir a tabela de
+    pontuação das janelas sempre que os pesos mudam.
+    """
+
+    def __init__(self, weights, on_change=None):
+        super().__init__(weights)
+        self.on_change = on_change
+
+    def _changed(self):
+        if self.on_change is not None:
+            self.on_change()
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self._changed()
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._changed()
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self._changed()
+
+    def setdefault(self, key, default=None):
+        value = super().setdefault(key, default)
+        self._changed()
+        return value
+
+    def pop(self, *args):
+        value = super().pop(*args)
+        self._changed()
+        return value
+
+    def popitem(self):
+        item = super().popitem()
+        self._changed()
+        return item
+
+    def clear(self):
+        super().clear()
+        self._changed()
+
+
+def build_window_table(evaluate_segment):
+    """Tabela com a pontuação de cada um dos 243 conteúdos possíveis de janela"""
+    return np.array([evaluate_segment(decode_window(code)) for code in range(NUM_WINDOW_CODES)],
+                    dtype=np.int64)
+
+
+def batch_window_codes(boards):
+    """Códigos em base 3 de todas as janelas de um lote de tabuleiros
+
+    Recebe um array (N, size, size) e retorna (N, W) com os códigos das W janelas de cada
+    tabuleiro. As janelas de cada direção saem de fatias deslocadas do próprio array,
+    sem laços em Python por janela.
+    """
+    boards = np.asarray(boards, dtype=np.int16)
+    n = boards.shape[-1]
+    span = n - WINDOW_LENGTH + 1
+    parts = []
+
+    # Horizontal, vertical, diagonal e antidiagonal
+    for slicer in (
+        lambda k: boards[:, :, k:k + span],
+        lambda k: boards[:, k:k + span, :],
+        lambda k: boards[:, k:k + span, k:k + span],
+        lambda k: boards[:, k:k + span, WINDOW_LENGTH - 1 - k:WINDOW_LENGTH - 1 - k + span],
+    ):
+        codes = slicer(0).copy()
+        for k in range(1, WINDOW_LENGTH):
+            codes += slicer(k) * WINDOW_POWERS[k]
+        parts.append(codes.reshape(len(boards), -1))
+
+    return np.concatenate(parts, axis=1)
+
+
+# Pesos da ordenação de jogadas: peças numa janela livre que passa pela célula candidata
+ATTACK_ORDER_WEIGHTS = (0, 2, 12, 80, 2000)
+DEFENSE_ORDER_WEIGHTS = (0, 1, 10, 60, 1000)
+
+
+@lru_cache(maxsize=None)
+def move_order_tables():
+    """Para cada jogador, pontuação estática de uma janela quando ele joga numa célula dela
+
+    Janelas só com peças próprias valem como ataque e janelas só com peças do adversário
+    valem como bloqueio; janelas mistas não valem nada. O índice é o código da janela.
+    """
+    tables = [None]
+    for player in (1, 2):
+        opponent = 3 - player
+        table = []
+        for code in range(NUM_WINDOW_CODES):
+            segment = decode_window(code)
+            own = min(segment.count(player), 4)
+            other = min(segment.count(opponent), 4)
+            if own and not other:
+                table.append(ATTACK_ORDER_WEIGHTS[own])
+            elif other and not own:
+                table.append(DEFENSE_ORDER_WEIGHTS[other])
+            else:
+                table.append(0)
+        tables.append(tuple(table))
+    return tuple(tables)
@@ -1,30 +1,208 @@
+import json
+import os
 import time
+from collections import defaultdict
+
 import numpy as np
 
+from bitboard import BitBoard
+from candidates import CandidateSet, SparseCandidateSet
+from evaluation import (window_geometry, decode_window, build_window_table, batch_window_codes,
+                        PatternWeights, NUM_WINDOW_CODES, WINDOW_POWERS, move_order_tables, SparseWindowGeometry,
+                        window_cell_array)
+from opening_book import OpeningBook
+from persistent_cache import PersistentCache, DEFAULT_CACHE_MB
+from search_cache import SearchCache
+from search_stats import SearchStats, SamplingProfiler
+from sparse_board import SparseBoard, UNBOUNDED_SIZE
+from symmetry import packed_symmetry_keys, unpack_hashes, canonical_from_hashes, to_canonical, from_canonical
+from threats import ThreatSolver
+from transposition import (ZobristHasher, TranspositionTable,
+                           EXACT, LOWER_BOUND, UPPER_BOUND)
+
+# Profundidade máxima (em plies) para a qual há slots de jogadas assassinas
+MAX_PLY = 64
+
+# Acima desta meia-largura a janela de aspiração vira a janela completa
+MAX_ASPIRATION_WINDOW = 1 << 20
+
+# Tabelas de janelas já montadas, compartilhadas pelos jogos com a mesma cor da IA e os mesmos
+# pesos: (cor da IA, pesos ordenados) -> (array, lista). Esvaziado quando passa do limite.
+_window_tables = {}
+MAX_SHARED_WINDOW_TABLES = 256
+
+
 class GomokuGame:
     """Classe principal que gerencia o estado do jogo"""
 
-    def __init__(self, board_size=15):
-        """Inicializa o jogo com tabuleiro vazio"""
-        self.board_size = board_size
-        self.board = np.zeros((board_size, board_size), dtype=int)
-        self.human_player = 1  # Jogador humano usa 1
-        self.ai_player = 2  # IA usa 2
-        self.current_player = self.human_player
+    BOARD_BACKENDS = ('numpy', 'bitboard', 'sparse')
+    SEARCH_ALGORITHMS = ('pvs', 'alphabeta')
+
+    def __init__(self, board_size=15, tt_memory_mb=32, board_backend='numpy', opening_book=None,
+                 ai_player=2, search_cache_entries=4096, persistent_cache=None,
+                 persistent_cache_mb=DEFAULT_CACHE_MB, weights=None):
+        """Inicializa o jogo com tabuleiro vazio
+
+        board_backend escolhe a representação do tabuleiro: 'numpy' (ndarray), 'bitboard'
+        (máscaras de bits, com detecção de vitória por deslocamentos) ou 'sparse' (só as
+        células ocupadas; o custo acompanha o número de peças e não a área). Com 'sparse',
+        board_size=None dá um tabuleiro ilimitado, centrado num tabuleiro virtual enorme.
+        opening_book é o caminho de um livro de aberturas (ignorado se não existir).
+        ai_player é a cor da IA (1 joga primeiro, 2 responde); o adversário fica com a outra.
+        search_cache_entries limita o cache de resultados por posição canônica (0 desliga).
+        persistent_cache é o caminho de um cache em disco compartilhado entre processos e
+        execuções (criado com persistent_cache_mb MB se não existir).
+        weights é o caminho de um arquivo JSON de pesos relativos (ver apply_weights), como o
+        gerado por tuning.py; é ignorado se não existir.
+        """
+        if board_backend not in self.BOARD_BACKENDS:
+            raise ValueError(f"Representação de tabuleiro desconhecida: {board_backend}")
+        if ai_player not in (1, 2):
+            raise ValueError(f"Jogador da IA inválido: {ai_player}")
+        if board_size is None and board_backend != 'sparse':
+            raise ValueError("Só o tabuleiro esparso pode ser ilimitado")
+
+        self.sparse = board_backend == 'sparse'
+        self.bounded = board_size is not None
+        self.board_size = board_size if self.bounded else UNBOUNDED_SIZE
+        board_size = self.board_size
+        self.board_backend = board_backend
+        self.board = self._new_board()
+        self.human_player = 3 - ai_player  # Adversário da IA (o humano, na interface gráfica)
+        self.ai_player = ai_player  # IA usa 2 por padrão
         self.game_over = False
         self.winner = None
-        self.message = "Sua vez de jogar"
 
         # Configurações da IA
         self.search_depth = 9  # Profundidade da busca
         self.time_limit = 5  # Tempo máximo de cálculo (segundos)
 
-        # Área de busca otimizada
-        self.search_area = set()
+        # Hash Zobrist da posição atual e tabela de transposição (mantida entre jogadas)
+        self.zobrist = ZobristHasher(board_size, sparse=self.sparse)
+        self.hash = 0
+        self.tt = TranspositionTable(max_memory_mb=tt_memory_mb)
+
+        # Hashes da posição sob as 8 simetrias, empacotados num inteiro e mantidos a cada peça,
+        # e o cache de resultados de busca indexado pela chave canônica derivada deles
+        self._symmetry_keys = packed_symmetry_keys(board_size, sparse=self.sparse)
+        self.symmetric_hash = 0
+        self.search_cache = SearchCache(search_cache_entries) if search_cache_entries else None
+        self.persistent_cache = PersistentCache(persistent_cache, board_size, persistent_cache_mb) \
+            if persistent_cache else None
+
+        self.last_search_depth = 0  # Última profundidade completada pelo aprofundamento iterativo
+        self.last_search_score = 0  # Pontuação da melhor jogada nessa profundidade
+
+        # Instrumentação: contadores extras e tempos por etapa (False desliga tudo que não é essencial)
+        self.instrumentation = True
+        self.search_hooks = []  # Objetos avisados no início e no fim de cada busca (ex.: SamplingProfiler)
+        self.search_stats = SearchStats(detailed=False)
+
+        # Livro de aberturas, consultado enquanto há poucas peças no tabuleiro
+        self.opening_book = OpeningBook.open_if_exists(opening_book)
+        self.book_max_stones = 20
+
+        # Sinal para interromper uma busca em andamento (por exemplo, a partir de outra thread)
+        self.search_cancelled = False
+
+        # Busca paralela na raiz: número de processos (1 = busca no próprio processo)
+        self.parallel_workers = 1
+        self._parallel = None
+
+        # Busca de ameaças (VCF/VCT) feita antes do Minimax, limitada em nós e em fração do tempo
+        self.use_vct = False
+        self.vcf_depth = 12
+        self.vct_depth = 6
+        self.threat_max_nodes = 20000
+        self.threat_time_fraction = 0.2
+
+        # Algoritmo da busca: 'pvs' (variação principal, janelas de aspiração e reduções de
+        # jogadas tardias) ou 'alphabeta' (Alpha-Beta simples, para comparação)
+        self.search_algorithm = 'pvs'
+        self.aspiration_window = 2000  # Meia-largura inicial da janela em torno da pontuação anterior
+        self.lmr_min_depth = 3  # Profundidade restante mínima para reduzir jogadas tardias
+        self.lmr_min_index = 6  # Jogadas antes desta posição na ordenação nunca são reduzidas
+        self.lmr_quiet_limit = 10  # Valor de ordenação a partir do qual uma janela deixa de ser quieta (duas peças)
+
+        # Ordenação de jogadas: jogadas assassinas por ply e histórico de cortes por jogador
+        self.max_candidates = None  # Limite opcional de jogadas expandidas por nó (None = todas)
+        self._order_tables = move_order_tables()
+        self.killers = [[None, None] for _ in range(MAX_PLY)]
+        self.history = self._new_history()
+        self.ordering_stats = self.search_stats.counters
+
+        # Área de busca otimizada, mantida incrementalmente a cada peça colocada ou removida
+        if self.sparse:
+            self.candidates = SparseCandidateSet(board_size, bounded=self.bounded)
+        else:
+            self.candidates = CandidateSet(board_size)
+        self.search_area = self.candidates.cells
         self.update_search_area()
 
-        # Padrões estratégicos com seus respectivos pesos
+        # Avaliação incremental: código em base 3 de cada janela de 5 células
+        # (no tabuleiro esparso as janelas são criadas sob demanda por _rescan_evaluation)
+        if not self.sparse:
+            self._windows, self._cell_windows = window_geometry(board_size)
+        self._window_codes = None
+
+        # Confere cada consulta à tabela de janelas contra _evaluate_segment (lento; só para depuração)
+        self.debug_evaluation = False
+
+        # Padrões estratégicos com seus respectivos pesos (a tabela de janelas é derivada deles)
         self.patterns = self._create_pattern_weights()
+        if weights and os.path.exists(weights):
+            with open(weights) as f:
+                self.apply_weights(json.load(f))
+        self._rescan_evaluation()
+
+    @property
+    def patterns(self):
+        return self._patterns
+
+    @patterns.setter
+    def patterns(self, weights):
+        self._patterns = PatternWeights(weights, on_change=self._rebuild_window_table)
+        self._rebuild_window_table()
+
+    def _rebuild_window_table(self):
+        """Recalcula a pontuação dos 243 conteúdos possíveis de janela a partir de self.patterns
+
+        A tabela é compartilhada entre os jogos com os mesmos pesos (e nunca alterada no lugar).
+        """
+        weights = tuple(sorted(self._patterns.items(), key=repr))
+        key = (self.ai_player, weights)
+        tables = _window_tables.get(key)
+        if tables is None:
+            if len(_window_tables) >= MAX_SHARED_WINDOW_TABLES:
+                _window_tables.clear()
+            array = build_window_table(self._evaluate_segment)
+            array.flags.writeable = False
+            tables = _window_tables[key] = (array, [int(score) for score in array])
+        self._window_table_array, self._window_table = tables
+        # Identifica os pesos nas chaves do cache de busca: resultados de outros pesos não valem
+        self._patterns_key = hash(weights)
+        if self._window_codes is not None:
+            table = self._window_table
+            self._pattern_score = sum(table[code] for code in self._window_codes)
+
+    def verify_window_table(self):
+        """Compara a tabela com _evaluate_segment e retorna os códigos que divergem"""
+        return [code for code in range(NUM_WINDOW_CODES)
+                if self._window_table[code] != self._evaluate_segment(decode_window(code))]
+
+    def _new_board(self):
+        """Cria um tabuleiro vazio na representação configurada"""
+        if self.board_backend == 'bitboard':
+            return BitBoard(self.board_size)
+        if self.sparse:
+            return SparseBoard(self.board_size, self.bounded)
+        return np.zeros((self.board_size, self.board_size), dtype=int)
+
+    def _new_history(self):
+        """Histórico de cortes por jogador: lista por célula, ou dicionário no tabuleiro esparso"""
+        if self.sparse:
+            return [None, defaultdict(int), defaultdict(int)]
+        return [None, [0] * (self.board_size ** 2), [0] * (self.board_size ** 2)]
 
     def _create_pattern_weights(self):
         """Define os pesos para cada padrão estratégico - Versão mais agressiva"""
@@ -52,23 +230,49 @@ class GomokuGame:
             (self.human_player, 3, 'split'): -8000  # Penaliza sequências com espaço
         }
 
+    def apply_weights(self, weights):
+        """Aplica pesos relativos no formato {"own:4:open": 100000, "opponent:3": -5000, ...}
+
+        'own' é a IA e 'opponent' o adversário; os padrões ausentes mantêm o peso atual.
+        """
+        patterns = dict(self.patterns)
+        owners = {'own': self.ai_player, 'opponent': self.human_player}
+        for name, value in weights.items():
+            owner, size, *kind = name.split(':')
+            if owner not in owners:
+                raise ValueError(f"Padrão inválido: {name}")
+            patterns[(owners[owner], int(size), *kind)] = value
+        self.patterns = patterns
+
+    def relative_weights(self):
+        """Pesos atuais no formato relativo de apply_weights"""
+        names = {self.ai_player: 'own', self.human_player: 'opponent'}
+        return {':'.join([names[owner], str(size), *kind]): value
+                for (owner, size, *kind), value in self.patterns.items()}
+
     def update_search_area(self):
-        """Atualiza a área de busca para incluir apenas células próximas a peças existentes"""
-        self.search_area = set()
+        """Reconstrói a área de busca do zero a partir do tabuleiro
 
-        for i in range(self.board_size):
-            for j in range(self.board_size):
-                if self.board[i, j] != 0:
-                    for di in range(-2, 3):
-                        for dj in range(-2, 3):
-                            ni, nj = i + di, j + dj
-                            if 0 <= ni < self.board_size and 0 <= nj < self.board_size:
-                                if self.board[ni, nj] == 0:
-                                    self.search_area.add((ni, nj))
-
-        # Se não houver peças no tabuleiro, começa pelo centro
-        if not self.search_area and self.board[self.board_size // 2][self.board_size // 2] == 0:
-            self.search_area.add((self.board_size // 2, self.board_size // 2))
+        Durante o jogo e a busca a área é atualizada incrementalmente por _place_stone e
+        _remove_stone; a reconstrução completa só é necessária quando o tabuleiro é trocado.
+        """
+        self.candidates.rebuild(self.board)
+
+    def load_board(self, board):
+        """Substitui o tabuleiro por outro (array size x size ou SparseBoard) e reconstrói o estado incremental"""
+        if isinstance(board, SparseBoard):
+            stones = list(board.stones.items())
+        else:
+            board = np.asarray(board)
+            stones = [((int(i), int(j)), int(board[i, j])) for i, j in zip(*np.nonzero(board))]
+        self.board = self._new_board()
+        self.symmetric_hash = 0
+        for (i, j), player in stones:
+            self.board[i, j] = player
+            self.symmetric_hash ^= self._symmetry_keys[player][i * self.board_size + j]
+        self.hash = self.zobrist.hash_board(self.board)
+        self._rescan_evaluation()
+        self.update_search_area()
 
     def make_move(self, row, col, player):
         """Faz uma jogada no tabuleiro"""
@@ -78,8 +282,7 @@ class GomokuGame:
         if self.board[row, col] != 0:
             return False
 
-        self.board[row, col] = player
-        self.update_search_area()
+        self._place_stone(row, col, player)
 
         if self.check_win(row, col):
             self.game_over = True
@@ -88,8 +291,74 @@ class GomokuGame:
 
         return True
 
+    def _place_stone(self, row, col, player):
+        """Coloca uma peça e atualiza o hash Zobrist e a avaliação incremental"""
+        cell = row * self.board_size + col
+        self.board[row, col] = player
+        self.hash ^= self.zobrist.keys[player][cell]
+        self.symmetric_hash ^= self._symmetry_keys[player][cell]
+        self.stone_count += 1
+        self._update_windows(cell, player)
+        self.candidates.add(row, col)
+
+    def _remove_stone(self, row, col):
+        """Remove uma peça e atualiza o hash Zobrist e a avaliação incremental"""
+        cell = row * self.board_size + col
+        player = int(self.board[row, col])
+        self.board[row, col] = 0
+        self.hash ^= self.zobrist.keys[player][cell]
+        self.symmetric_hash ^= self._symmetry_keys[player][cell]
+        self.stone_count -= 1
+        self._update_windows(cell, -player)
+        self.candidates.remove(row, col)
+
+    def _update_windows(self, cell, delta):
+        """Soma delta ao código das janelas que passam pela célula e ajusta a pontuação total"""
+        codes = self._window_codes
+        table = self._window_table
+        total = self._pattern_score
+        for w, power in self._cell_windows[cell]:
+            old_code = codes[w]
+            code = old_code + delta * power
+            codes[w] = code
+            total += table[code] - table[old_code]
+        self._pattern_score = total
+
+        if self.debug_evaluation:
+            for w, _ in self._cell_windows[cell]:
+                expected = self._evaluate_segment(decode_window(codes[w]))
+                if table[codes[w]] != expected:
+                    raise AssertionError(f"Tabela de janelas divergente para o código {codes[w]}: "
+                                         f"{table[codes[w]]} != {expected}")
+
+    def _rescan_evaluation(self):
+        """Recalcula do zero os códigos e pontuações de todas as janelas a partir do tabuleiro"""
+        if self.sparse:
+            self._rescan_sparse_evaluation()
+            return
+        flat = np.asarray(self.board, dtype=np.int64).ravel()
+        self._window_codes = (flat[window_cell_array(self.board_size)] @ WINDOW_POWERS).tolist()
+        table = self._window_table
+        self._pattern_score = sum(table[code] for code in self._window_codes)
+        self.stone_count = int(np.count_nonzero(flat))
+
+    def _rescan_sparse_evaluation(self):
+        """Versão esparsa de _rescan_evaluation: só as janelas que passam pelas peças"""
+        geometry = SparseWindowGeometry(self.board_size, self.bounded)
+        self._windows, self._cell_windows = geometry.windows, geometry.cell_windows
+        codes = self._window_codes = geometry.codes
+        for (i, j), player in self.board.stones.items():
+            for w, power in self._cell_windows[i * self.board_size + j]:
+                codes[w] += player * power
+        table = self._window_table
+        self._pattern_score = sum(table[code] for code in codes)
+        self.stone_count = len(self.board)
+
     def check_win(self, row, col):
         """Verifica se a última jogada resultou em vitória"""
+        if self.board_backend != 'numpy':
+            return self.board.check_win(row, col)
+
         directions = [(0, 1), (1, 0), (1, 1), (1, -1)]
         player = self.board[row, col]
 
@@ -115,11 +384,23 @@ class GomokuGame:
 
     def get_valid_moves(self):
         """Retorna todas as jogadas válidas na área de busca"""
-        return list(self.search_area) if self.search_area else \
-            [(i, j) for i in range(self.board_size) for j in range(self.board_size) if self.board[i, j] == 0]
+        if self.search_area:
+            return list(self.search_area)
+        if not self.bounded:  # Sem bordas, a área de busca nunca fica vazia
+            return []
+        return [(i, j) for i in range(self.board_size) for j in range(self.board_size) if self.board[i, j] == 0]
 
     def evaluate_board(self):
-        """Avalia o tabuleiro e retorna uma pontuação"""
+        """Avalia o tabuleiro e retorna uma pontuação
+
+        As janelas são mantidas incrementalmente a cada jogada, então a avaliação é O(1).
+        """
+        return self._pattern_score + self._center_bonus(self.stone_count)
+
+    def evaluate_board_full(self):
+        """Avalia o tabuleiro varrendo todas as linhas (referência para a avaliação incremental)"""
+        if self.sparse:
+            return self._evaluate_sparse_full()
         score = 0
 
         for i in range(self.board_size):
@@ -130,20 +411,68 @@ class GomokuGame:
 
         score += self._evaluate_diagonals()
 
+        return score + self._center_bonus(int(np.count_nonzero(np.asarray(self.board))))
+
+    def _evaluate_sparse_full(self):
+        """Referência do tabuleiro esparso: avalia célula a célula as janelas em volta das peças
+
+        As janelas que não passam por nenhuma peça estão vazias e valem zero, então basta
+        percorrer as que encontram alguma peça.
+        """
+        geometry = SparseWindowGeometry(self.board_size, self.bounded)
+        for i, j in self.board.stones:
+            geometry.cell_windows[i * self.board_size + j]
+        score = 0
+        for cells in geometry.windows:
+            score += self._evaluate_segment([self.board[divmod(cell, self.board_size)] for cell in cells])
+        return score + self._center_bonus(len(self.board))
+
+    def evaluate_boards(self, boards, chunk_size=4096):
+        """Avalia um lote de tabuleiros (N, size, size) de uma vez e retorna um vetor (N,)
+
+        Usa os mesmos pesos de self.patterns e dá exatamente o mesmo resultado de
+        evaluate_board para cada tabuleiro, mas sem alterar o estado do jogo.
+        """
+        if not self.bounded:
+            raise ValueError("A avaliação em lote exige um tabuleiro de tamanho fixo")
+        boards = np.asarray(boards, dtype=np.int8)
+        if boards.ndim == 2:
+            boards = boards[np.newaxis]
+        if boards.shape[1:] != (self.board_size, self.board_size):
+            raise ValueError(f"Esperado um array (N, {self.board_size}, {self.board_size}), "
+                             f"recebido {boards.shape}")
+
+        table = self._window_table_array
+        scores = np.empty(len(boards), dtype=np.int64)
+
+        # Processa em blocos para limitar a memória dos códigos intermediários
+        for start in range(0, len(boards), chunk_size):
+            chunk = boards[start:start + chunk_size]
+            scores[start:start + len(chunk)] = table[batch_window_codes(chunk)].sum(axis=1)
+
+        # Bônus do centro, com as mesmas regras de _center_bonus
+        center = self.board_size // 2
+        pieces = np.count_nonzero(boards.reshape(len(boards), -1), axis=1)
+        center_cells = boards[:, center, center]
+        early = np.where(center_cells == self.ai_player, 100, np.where(center_cells == 0, 50, 0))
+        opening = np.where(center_cells == self.ai_player, 50, np.where(center_cells == 0, 30, 0))
+        scores += np.where(pieces < 4, early, 0) + np.where(pieces < 6, opening, 0)
+
+        return scores
+
+    def _center_bonus(self, total_pieces):
+        """Bônus para o centro no início do jogo"""
+        score = 0
+        center = self.board_size // 2
+
         # Bônus adicional para o centro no início do jogo
-        total_pieces = np.sum(self.board != 0)
         if total_pieces < 4:
-            center = self.board_size // 2
             if self.board[center, center] == self.ai_player:
                 score += 100  # Bônus maior para ocupar o centro
             elif self.board[center, center] == 0:
                 score += 50  # Incentivo maior para ir para o centro
 
-        ai_pieces = np.sum(self.board == self.ai_player)
-        human_pieces = np.sum(self.board == self.human_player)
-
-        if ai_pieces + human_pieces < 6:
-            center = self.board_size // 2
+        if total_pieces < 6:
             if self.board[center, center] == self.ai_player:
                 score += 50
             elif self.board[center, center] == 0:
@@ -204,130 +533,613 @@ class GomokuGame:
 
         return score
 
-    def minimax(self, depth, alpha, beta, maximizing_player, start_time):
-        """Implementação do algoritmo Minimax com poda Alpha-Beta"""
-        if time.time() - start_time > self.time_limit:
+    def _order_moves(self, moves, player, tt_move=None, ply=None):
+        """Ordena as jogadas: tabela de transposição, assassinas, depois histórico e avaliação estática"""
+        size = self.board_size
+        codes = self._window_codes
+        cell_windows = self._cell_windows
+        table = self._order_tables[player]
+        history = self.history[player]
+        killers = self.killers[ply] if ply is not None and ply < MAX_PLY else ()
+
+        scored = []
+        for move in moves:
+            if move == tt_move:
+                key = 1 << 62
+            elif move in killers:
+                key = (1 << 61) - killers.index(move)
+            else:
+                cell = move[0] * size + move[1]
+                static = 0
+                for w, _ in cell_windows[cell]:
+                    static += table[codes[w]]
+                key = static * 64 + history[cell]
+            scored.append((key, move))
+
+        scored.sort(reverse=True)
+        return [move for _, move in scored]
+
+    def _record_cutoff(self, move, player, depth, ply, move_index):
+        """Atualiza jogadas assassinas, histórico e contadores após um corte beta"""
+        stats = self.ordering_stats
+        stats['cutoffs'] += 1
+        if move_index == 0:
+            stats['first_move_cutoffs'] += 1
+
+        self.history[player][move[0] * self.board_size + move[1]] += depth * depth
+        if ply < MAX_PLY:
+            killers = self.killers[ply]
+            if killers[0] != move:
+                killers[1] = killers[0]
+                killers[0] = move
+
+    def get_search_stats(self):
+        """Estatísticas da última chamada de find_best_move (ver SearchStats.as_dict)"""
+        return self.search_stats.as_dict()
+
+    def enable_profiler(self, interval=0.002):
+        """Liga o profiler por amostragem nas próximas buscas e o retorna"""
+        profiler = SamplingProfiler(interval)
+        self.search_hooks.append(profiler)
+        return profiler
+
+    def get_ordering_stats(self):
+        """Contadores da última busca: nós expandidos, cortes e taxa de corte na primeira jogada"""
+        stats = dict(self.ordering_stats)
+        nodes = stats['nodes']
+        cutoffs = stats['cutoffs']
+        stats['cutoff_rate'] = cutoffs / nodes if nodes else 0.0
+        stats['first_move_cutoff_rate'] = stats['first_move_cutoffs'] / cutoffs if cutoffs else 0.0
+        return stats
+
+    def minimax(self, depth, alpha, beta, maximizing_player, deadline, ply=1):
+        """Busca Minimax com poda Alpha-Beta, do ponto de vista da IA
+
+        deadline é um instante de time.perf_counter(); ao ultrapassá-lo a busca retorna None.
+        ply é a distância até a raiz, usada pelas jogadas assassinas. O trabalho é feito
+        por _negamax, que devolve a pontuação do lado que joga.
+        """
+        if maximizing_player:
+            return self._negamax(depth, alpha, beta, 1, deadline, ply)
+        score = self._negamax(depth, -beta, -alpha, -1, deadline, ply)
+        return None if score is None else -score
+
+    def _negamax(self, depth, alpha, beta, sign, deadline, ply):
+        """Núcleo negamax: pontuação do ponto de vista de quem joga (sign 1 = IA, -1 = adversário)
+
+        Com search_algorithm 'pvs', só a primeira jogada de cada nó é buscada com a janela
+        completa; as demais recebem uma janela nula e são buscadas de novo se superarem
+        alpha (busca de variação principal). Jogadas tardias e quietas também têm a
+        profundidade reduzida em um ply, até provarem ser melhores que o esperado. Com
+        'alphabeta' todas as jogadas usam a janela completa, como no Minimax original.
+        """
+        if self.search_cancelled or time.perf_counter() > deadline:
             return None
 
+        instrumented = self.instrumentation
         if depth == 0 or self.game_over:
-            return self.evaluate_board()
+            if instrumented:
+                return sign * self._timed_leaf()
+            return sign * self.evaluate_board()
+
+        # Consulta a tabela de transposição (a chave inclui o lado que joga). As pontuações
+        # ficam do ponto de vista da IA, então os limites trocam de lado quando o adversário joga
+        key = self.hash ^ self.zobrist.side_key if sign > 0 else self.hash
+        tt_move = None
+        entry = self.tt.probe(key)
+        if entry is not None:
+            _, entry_depth, entry_score, entry_flag, tt_move, _ = entry
+            if entry_depth >= depth:
+                entry_score *= sign
+                if sign < 0 and entry_flag != EXACT:
+                    entry_flag = LOWER_BOUND if entry_flag == UPPER_BOUND else UPPER_BOUND
+                if entry_flag == LOWER_BOUND:
+                    alpha = max(alpha, entry_score)
+                elif entry_flag == UPPER_BOUND:
+                    beta = min(beta, entry_score)
+                if entry_flag == EXACT or beta <= alpha:
+                    if instrumented:
+                        self.ordering_stats['tt_hits'] += 1
+                    return entry_score
+
+        original_alpha = alpha
+        player = self.ai_player if sign > 0 else self.human_player
+        if instrumented:
+            started = time.perf_counter()
+            valid_moves = self._order_moves(self.get_valid_moves(), player, tt_move, ply)
+            self.search_stats.add_time('geracao', time.perf_counter() - started)
+        else:
+            valid_moves = self._order_moves(self.get_valid_moves(), player, tt_move, ply)
+        if self.max_candidates is not None:
+            valid_moves = valid_moves[:self.max_candidates]
+        self.ordering_stats['nodes'] += 1
+
+        pvs = self.search_algorithm == 'pvs'
+        reduce_late = pvs and depth >= self.lmr_min_depth
+        killers = self.killers[ply] if ply < MAX_PLY else ()
+        best_score = -float('inf')
+        best_move = None
+        for index, (i, j) in enumerate(valid_moves):
+            # Reduz jogadas tardias que não atacam nem defendem nada (avaliado antes de jogar)
+            reduction = 1 if (reduce_late and index >= self.lmr_min_index and (i, j) not in killers
+                              and self._is_quiet(i, j, player)) else 0
+            self._place_stone(i, j, player)
+            if self.check_win(i, j):  # Posição terminal: não há o que buscar abaixo
+                score = sign * self.evaluate_board()
+                if instrumented:
+                    self.ordering_stats['terminals'] += 1
+            elif index == 0 or not pvs:
+                score = self._negate(self._negamax(depth - 1, -beta, -alpha, -sign, deadline, ply + 1))
+            else:
+                # Janela nula: só interessa saber se a jogada supera alpha
+                score = self._negate(self._negamax(depth - 1 - reduction, -alpha - 1, -alpha, -sign,
+                                                   deadline, ply + 1))
+                if score is not None and score > alpha and reduction:
+                    if instrumented:
+                        self.ordering_stats['lmr_researches'] += 1
+                    score = self._negate(self._negamax(depth - 1, -alpha - 1, -alpha, -sign, deadline, ply + 1))
+                if score is not None and alpha < score < beta:
+                    if instrumented:
+                        self.ordering_stats['pvs_researches'] += 1
+                    score = self._negate(self._negamax(depth - 1, -beta, -alpha, -sign, deadline, ply + 1))
+            self._remove_stone(i, j)
+
+            if score is None:
+                return None
 
-        valid_moves = self.get_valid_moves()
+            if score > best_score:
+                best_score = score
+                best_move = (i, j)
+            alpha = max(alpha, score)
+            if alpha >= beta:
+                self._record_cutoff((i, j), player, depth, ply, index)
+                break
 
-        if maximizing_player:
-            max_eval = -float('inf')
-            for (i, j) in valid_moves:
-                self.board[i, j] = self.ai_player
-                current_eval = self.minimax(depth - 1, alpha, beta, False, start_time)
-                self.board[i, j] = 0
-
-                if current_eval is None:
-                    return None
-
-                max_eval = max(max_eval, current_eval)
-                alpha = max(alpha, current_eval)
-                if beta <= alpha:
-                    break
-            return max_eval
+        # Guarda o resultado com o tipo de limite correspondente à janela original (visto pela IA)
+        if best_score <= original_alpha:
+            flag = UPPER_BOUND if sign > 0 else LOWER_BOUND
+        elif best_score >= beta:
+            flag = LOWER_BOUND if sign > 0 else UPPER_BOUND
         else:
-            min_eval = float('inf')
-            for (i, j) in valid_moves:
-                self.board[i, j] = self.human_player
-                current_eval = self.minimax(depth - 1, alpha, beta, True, start_time)
-                self.board[i, j] = 0
+            flag = EXACT
+        self.tt.store(key, depth, sign * best_score, flag, best_move)
+
+        return best_score
+
+    @staticmethod
+    def _negate(score):
+        return None if score is None else -score
+
+    def _is_quiet(self, row, col, player):
+        """Indica se a jogada não cria nem bloqueia nada além de pares (candidata à redução)"""
+        codes = self._window_codes
+        table = self._order_tables[player]
+        limit = self.lmr_quiet_limit
+        for w, _ in self._cell_windows[row * self.board_size + col]:
+            if table[codes[w]] >= limit:
+                return False
+        return True
+
+    def _timed_leaf(self):
+        """Avaliação de uma folha com contagem e tempo (só com a instrumentação ligada)"""
+        started = time.perf_counter()
+        score = self.evaluate_board()
+        stats = self.search_stats
+        stats.add_time('avaliacao', time.perf_counter() - started)
+        stats.counters['leaves'] += 1
+        return score
 
-                if current_eval is None:
-                    return None
+    def _search_root(self, root_moves, depth, deadline, alpha=-float('inf'), beta=float('inf'), shared=None):
+        """Executa uma iteração completa na raiz com profundidade fixa, na janela (alpha, beta)
 
-                min_eval = min(min_eval, current_eval)
-                beta = min(beta, current_eval)
-                if beta <= alpha:
-                    break
-            return min_eval
+        Retorna (melhor jogada, melhor pontuação, pontuações por jogada) ou None se o
+        tempo acabar antes de todas as jogadas da raiz serem avaliadas. Se a melhor
+        pontuação cair fora da janela, ela é só um limite e a iteração deve ser repetida.
 
-    def find_best_move(self):
-        """Encontra a melhor jogada para a IA com bloqueio agressivo"""
-        start_time = time.time()
+        shared é o alpha compartilhado da busca paralela (read/publish por profundidade): ele
+        eleva o alpha antes de cada jogada, e só uma pontuação acima do alpha usado é exata e
+        pode virar a melhor jogada (a melhor fica None se todas falharem baixo). Um alpha
+        compartilhado acima de beta encerra a iteração como falha alta.
+        """
+        window_alpha = alpha
+        pvs = self.search_algorithm == 'pvs'
         best_move = None
         best_score = -float('inf')
-
-        # 1. Prioridade máxima: Vitória imediata da IA
-        for (i, j) in self.get_valid_moves():
-            self.board[i, j] = self.ai_player
+        scores = {}
+
+        for index, (i, j) in enumerate(root_moves):
+            searched_alpha = alpha
+            if shared is not None:
+                alpha = searched_alpha = max(alpha, shared.read(depth))
+                if alpha >= beta:
+                    return best_move, alpha, scores
+            self._place_stone(i, j, self.ai_player)
             if self.check_win(i, j):
-                self.board[i, j] = 0
-                return i, j
-            self.board[i, j] = 0
+                score = self.evaluate_board()
+            elif index == 0 or not pvs:
+                score = self.minimax(depth - 1, alpha, beta, False, deadline)
+            else:
+                score = self.minimax(depth - 1, alpha, alpha + 1, False, deadline)
+                if score is not None and alpha < score < beta:
+                    if self.search_stats.detailed:
+                        self.ordering_stats['pvs_researches'] += 1
+                    score = self.minimax(depth - 1, alpha, beta, False, deadline)
+            self._remove_stone(i, j)
+
+            if score is None:
+                return None
+
+            scores[(i, j)] = score
+            if score > best_score and (shared is None or score > searched_alpha):
+                best_score = score
+                best_move = (i, j)
+                if shared is not None:
+                    shared.publish(depth, score)
+            alpha = max(alpha, score)
+            if alpha >= beta:  # Falha alta da janela de aspiração
+                break
 
-        # 2. Prioridade alta: Bloquear vitória iminente do jogador (4 em linha)
-        for (i, j) in self.get_valid_moves():
-            self.board[i, j] = self.human_player
-            if self.check_win(i, j):
-                self.board[i, j] = 0
-                return i, j
-            self.board[i, j] = 0
-
-        # 3. Prioridade média: Bloquear sequências de 3 do jogador
-        for (i, j) in self.get_valid_moves():
-            self.board[i, j] = self.human_player
-            if self.count_consecutive(i, j) >= 3:  # Detecta 3 peças consecutivas
-                self.board[i, j] = 0
-                # Verifica se este bloqueio também cria uma ameaça para a IA
-                self.board[i, j] = self.ai_player
-                if self.count_consecutive(i, j) >= 3:
-                    return i, j  # Bloqueia E cria ameaça
-                self.board[i, j] = 0
-                best_move = (i, j)  # Guarda o movimento de bloqueio
+        # A raiz também entra na tabela para que a variação principal possa ser recuperada
+        if window_alpha < best_score < beta:
+            self.tt.store(self.hash ^ self.zobrist.side_key, depth, best_score, EXACT, best_move)
+        return best_move, best_score, scores
+
+    def get_principal_variation(self, max_length=None):
+        """Reconstrói a variação principal a partir da tabela de transposição"""
+        pv = []
+        played = []
+        maximizing = True
+        limit = max_length if max_length is not None else self.last_search_depth
+
+        while len(pv) < limit:
+            key = self.hash ^ self.zobrist.side_key if maximizing else self.hash
+            entry = self.tt.probe(key)
+            if entry is None or entry[4] is None:
+                break
+            i, j = entry[4]
+            if self.board[i, j] != 0:
+                break
+            self._place_stone(i, j, self.ai_player if maximizing else self.human_player)
+            played.append((i, j))
+            pv.append((i, j))
+            maximizing = not maximizing
+
+        for (i, j) in reversed(played):
+            self._remove_stone(i, j)
+        return pv
+
+    def _parallel_searcher(self):
+        """Pool de processos da busca paralela, criado na primeira vez e reutilizado entre jogadas"""
+        if self._parallel is None or self._parallel.workers != self.parallel_workers:
+            from parallel import ParallelSearcher
+            if self._parallel is not None:
+                self._parallel.close()
+            self._parallel = ParallelSearcher(self.parallel_workers)
+        return self._parallel
+
+    def close(self):
+        """Libera recursos externos (o pool da busca paralela, o livro de aberturas e o cache em disco)"""
+        if self._parallel is not None:
+            self._parallel.close()
+            self._parallel = None
+        if self.opening_book is not None:
+            self.opening_book.close()
+            self.opening_book = None
+        if self.persistent_cache is not None:
+            self.persistent_cache.close()
+            self.persistent_cache = None
+
+    def _new_search(self):
+        """Prepara as estruturas auxiliares e as estatísticas para uma nova busca"""
+        self.search_stats = SearchStats(detailed=self.instrumentation)
+        self.ordering_stats = self.search_stats.counters
+        self.tt.new_search()
+        self.killers = [[None, None] for _ in range(MAX_PLY)]
+        # O histórico é envelhecido em vez de descartado: a posição mudou pouco desde a última busca
+        for player in (self.human_player, self.ai_player):
+            history = self.history[player]
+            if self.sparse:
+                self.history[player] = defaultdict(int, {cell: value >> 1 for cell, value in history.items()
+                                                         if value > 1})
             else:
-                self.board[i, j] = 0
+                self.history[player] = [value >> 1 for value in history]
 
-        # 4. Se encontrou um movimento para bloquear 3 peças, retorna ele
-        if best_move:
-            return best_move
+    def _blocks_open_fours(self, solver, move):
+        """Verifica se a jogada da IA em move elimina todos os quatros abertos do jogador"""
+        self._place_stone(move[0], move[1], self.ai_player)
+        blocked = not solver.open_four_moves(self.human_player)
+        self._remove_stone(move[0], move[1])
+        return blocked
 
-        # 5. Estratégia ofensiva usando Minimax
-        for (i, j) in self.get_valid_moves():
-            self.board[i, j] = self.ai_player
-            score = self.minimax(self.search_depth - 1, -float('inf'), float('inf'), False, start_time)
-            self.board[i, j] = 0
+    def canonical_key(self):
+        """Chave canônica da posição (o menor dos 8 hashes simétricos) e a simetria que a produz"""
+        return canonical_from_hashes(unpack_hashes(self.symmetric_hash))
 
-            if score is None:  # Tempo esgotado
+    def _search_cache_key(self):
+        """Chave do cache de busca: posição canônica e o que muda o resultado além da profundidade"""
+        key, symmetry = self.canonical_key()
+        return (key, self.ai_player, self._patterns_key, self.use_vct, self.max_candidates), symmetry
+
+    def find_best_move(self):
+        """Encontra a melhor jogada para a IA: ameaças forçadas primeiro, depois Minimax
+
+        Os contadores e tempos da busca ficam em self.search_stats (ver get_search_stats).
+        """
+        start_time = time.perf_counter()
+        deadline = start_time + self.time_limit
+
+        self._new_search()
+        stats = self.search_stats
+        stats.started = start_time
+        for hook in self.search_hooks:
+            hook.search_started(self)
+
+        move, source = None, None
+        try:
+            move, source = self._choose_move(start_time, deadline)
+            if self.search_cache is not None and source in ('minimax', 'paralela', 'persistente') and stats.depth \
+                    and not self.search_cancelled:
+                key, symmetry = self._search_cache_key()
+                self.search_cache.put(key, to_canonical(move, symmetry, self.board_size), stats.depth,
+                                      stats.score or 0, self.search_depth, self.time_limit)
+            if self.persistent_cache is not None and source in ('minimax', 'paralela') and stats.depth \
+                    and not self.search_cancelled:
+                self.persistent_cache.store(self, move, stats.depth, stats.score or 0)
+        finally:
+            stats.finish(move, source)
+            stats.cancelled = self.search_cancelled
+            for hook in self.search_hooks:
+                hook.search_finished(self, stats)
+        return move
+
+    def _choose_move(self, start_time, deadline):
+        """Executa as etapas da busca; retorna (jogada, etapa que a decidiu)"""
+        stats = self.search_stats
+
+        # Abertura conhecida: a jogada sai do livro sem busca
+        if self.opening_book is not None and self.stone_count <= self.book_max_stones:
+            move = self.opening_book.lookup(self)
+            stats.add_time('livro', time.perf_counter() - start_time)
+            if move is not None:
+                return move, 'livro'
+
+        # Posição já buscada nesta ou em outra orientação (em qualquer partida desde o início)
+        if self.search_cache is not None:
+            started = time.perf_counter()
+            key, symmetry = self._search_cache_key()
+            cached = self.search_cache.get(key, self.search_depth, self.time_limit)
+            stats.add_time('cache', time.perf_counter() - started)
+            if cached is not None:
+                move = from_canonical(cached[0], symmetry, self.board_size)
+                if self.board[move] == 0:
+                    stats.depth, stats.score = cached[1], cached[2]
+                    return move, 'cache'
+
+        # Resultado gravado em disco por este ou por outro processo, nesta ou numa execução anterior
+        if self.persistent_cache is not None:
+            started = time.perf_counter()
+            cached = self.persistent_cache.lookup(self)
+            stats.add_time('cache', time.perf_counter() - started)
+            if cached is not None:
+                move, stats.depth, stats.score = cached
+                return move, 'persistente'
+
+        started = time.perf_counter()
+        solver = ThreatSolver(self, max_nodes=self.threat_max_nodes,
+                              deadline=start_time + self.time_limit * self.threat_time_fraction)
+        move, root_moves = self._tactical_stage(solver)
+        stats.add_time('tatico', time.perf_counter() - started)
+        if stats.detailed:
+            stats.counters['threat_nodes'] = solver.nodes
+        if move is not None:
+            return move, 'tatico'
+
+        started = time.perf_counter()
+        # Os processos recebem o tabuleiro como array, então o tabuleiro esparso busca aqui mesmo
+        if self.parallel_workers > 1 and len(root_moves) > 1 and not self.sparse:
+            searcher = self._parallel_searcher()
+            move, score = searcher.search(self, root_moves, deadline - time.perf_counter())
+            stats.add_time('paralela', time.perf_counter() - started)
+            stats.counters['nodes'] = searcher.last_nodes
+            stats.depth = searcher.last_depth
+            stats.score = score
+            if score is not None:
+                self.last_search_score = score
+            return move, 'paralela'
+
+        move = self._iterative_deepening(root_moves, start_time, deadline)
+        stats.add_time('minimax', time.perf_counter() - started)
+        return move, 'minimax'
+
+    def _tactical_stage(self, solver):
+        """Etapas táticas antes do Minimax
+
+        Retorna (jogada, None) quando há uma jogada forçada, ou (None, jogadas da raiz) com as
+        jogadas que o Minimax deve considerar.
+        """
+
+        # 1. Prioridade máxima: Vitória imediata da IA
+        ai_wins = solver.five_cells(self.ai_player)
+        if ai_wins:
+            return min(ai_wins), None
+
+        # 2. Prioridade alta: Bloquear vitória iminente do jogador (4 em linha)
+        human_wins = solver.five_cells(self.human_player)
+        if human_wins:
+            return min(human_wins), None
+
+        # 3. Vitória forçada da IA por quatros contínuos (e por três, se habilitado)
+        move = solver.find_vcf(self.ai_player, self.vcf_depth)
+        if move is None and self.use_vct and not solver.aborted:
+            move = solver.find_vct(self.ai_player, self.vct_depth)
+        if move is not None:
+            return move, None
+
+        # 4. Defesa forçada: o jogador tem VCF, então só servem jogadas que a refutam. A defesa
+        # tem orçamento próprio: um ataque que esgotou o da etapa 3 não pode pular esta verificação
+        solver.new_budget(time.perf_counter() + self.time_limit * self.threat_time_fraction)
+        root_moves = self._order_moves(self.get_valid_moves(), self.ai_player)
+        threat_line = solver.vcf_line(self.human_player, self.vcf_depth)
+        if threat_line:
+            own_fours = solver.four_moves(self.ai_player)
+            candidates = threat_line + [m for m in own_fours if m not in threat_line]
+            candidates += [m for m in root_moves if m not in candidates]
+            move = solver.find_defense(self.ai_player, candidates, self.vcf_depth)
+            if move is not None:
+                return move, None
+
+        # Um quatro aberto do jogador na próxima jogada também precisa ser impedido: a busca
+        # fica restrita aos bloqueios e aos quatros da própria IA (sem busca, sempre verificado)
+        threats = solver.open_four_moves(self.human_player)
+        if threats:
+            own_fours = solver.four_moves(self.ai_player)
+            defenses = [m for m in root_moves
+                        if m in threats or m in own_fours or self._blocks_open_fours(solver, m)]
+            if defenses:
+                root_moves = defenses
+
+        return None, root_moves
+
+    def _iterative_deepening(self, root_moves, start_time, deadline):
+        """5. Estratégia ofensiva: Minimax com aprofundamento iterativo"""
+        best_move = None
+        self.last_search_depth = 0
+        stats = self.search_stats
+        iteration_scores = {}  # Profundidade -> pontuação, para as janelas de aspiração
+
+        for depth in range(1, self.search_depth + 1):
+            result = self._aspiration_search(root_moves, depth, deadline, iteration_scores.get(depth - 2))
+            if result is None:  # Tempo esgotado no meio da iteração: vale a última completa
+                if not self.search_cancelled:
+                    stats.timed_out = True
+                    if stats.detailed:
+                        stats.counters['timeouts'] += 1
                 break
 
-            if score > best_score:
-                best_score = score
-                best_move = (i, j)
+            best_move, best_score, scores = result
+            self.last_search_depth = depth
+            self.last_search_score = best_score
+            iteration_scores[depth] = best_score
+            stats.depth = depth
+            stats.score = best_score
+            stats.depth_times.append(time.perf_counter() - start_time)
+
+            # A variação principal da iteração anterior abre a próxima
+            root_moves.sort(key=lambda move: scores[move], reverse=True)
+
+            # Vitória forçada encontrada: aprofundar não muda a escolha
+            if best_score >= self.patterns[(self.ai_player, 5)]:
+                break
 
-            # Verifica o tempo para não exceder o limite
-            if time.time() - start_time > self.time_limit / 2:
+            # Não inicia uma iteração que dificilmente terminaria a tempo
+            if time.perf_counter() - start_time > self.time_limit / 2:
                 break
 
-        return best_move if best_move else self.get_valid_moves()[0]
+        # Nem a profundidade 1 terminou: a primeira jogada da raiz já vem ordenada e restrita à defesa
+        return best_move if best_move else root_moves[0]
+
+    def _aspiration_search(self, root_moves, depth, deadline, previous=None, shared=None):
+        """Iteração na raiz com janela de aspiração em torno de uma pontuação anterior
+
+        previous é a pontuação de duas profundidades atrás: a avaliação oscila conforme o
+        último ply é da IA ou do adversário, então a iteração imediatamente anterior seria
+        uma estimativa ruim. Quando a pontuação cai fora da janela, ela é alargada (4 vezes)
+        no lado que falhou e a iteração é repetida. Só é usada com 'pvs' e longe das
+        pontuações de vitória. shared é repassado a _search_root (busca paralela).
+        """
+        window = self.aspiration_window
+        if (self.search_algorithm != 'pvs' or previous is None or not window
+                or abs(previous) >= self.patterns[(self.ai_player, 5)]):
+            return self._search_root(root_moves, depth, deadline, shared=shared)
+
+        low, high = window, window
+        while True:
+            alpha = previous - low if low < MAX_ASPIRATION_WINDOW else -float('inf')
+            beta = previous + high if high < MAX_ASPIRATION_WINDOW else float('inf')
+            result = self._search_root(root_moves, depth, deadline, alpha, beta, shared)
+            if result is None:
+                return None
+            score = result[1]
+            if score <= alpha:
+                # Outro processo já tem uma pontuação exata acima da janela: estas jogadas perderam
+                if shared is not None and shared.read(depth) > alpha:
+                    return result
+                low *= 4
+            elif score >= beta:
+                high *= 4
+            else:
+                return result
+            if self.search_stats.detailed:
+                self.ordering_stats['aspiration_researches'] += 1
 
     def ai_move(self):
         """Executa a jogada da IA e atualiza o estado do jogo"""
-        move = self.find_best_move()
+        self.play_ai_move(self.find_best_move())
 
+    def play_ai_move(self, move):
+        """Aplica uma jogada da IA já calculada (por exemplo, por uma busca em segundo plano)"""
         if move:
             i, j = move
             self.make_move(i, j, self.ai_player)
 
-        if not self.game_over:
-            self.message = "Sua vez de jogar"
-        else:
-            self.message = "IA venceu! Clique para reiniciar."
+    def snapshot(self):
+        """Cópia independente da posição e das configurações, para buscar em outra thread
+
+        A tabela de transposição é compartilhada, então o trabalho feito sobre a cópia
+        continua disponível para as próximas buscas deste jogo.
+        """
+        other = GomokuGame(self.board_size if self.bounded else None, tt_memory_mb=0, board_backend=self.board_backend,
+                           ai_player=self.ai_player, search_cache_entries=0)
+        other.tt = self.tt
+        other.search_cache = self.search_cache
+        other.persistent_cache = self.persistent_cache
+        other.search_depth = self.search_depth
+        other.time_limit = self.time_limit
+        other.max_candidates = self.max_candidates
+        other.search_algorithm = self.search_algorithm
+        other.aspiration_window = self.aspiration_window
+        other.lmr_min_depth = self.lmr_min_depth
+        other.lmr_min_index = self.lmr_min_index
+        other.lmr_quiet_limit = self.lmr_quiet_limit
+        other.use_vct = self.use_vct
+        other.vcf_depth = self.vcf_depth
+        other.vct_depth = self.vct_depth
+        other.threat_max_nodes = self.threat_max_nodes
+        other.threat_time_fraction = self.threat_time_fraction
+        other.parallel_workers = self.parallel_workers
+        other._parallel = self._parallel
+        # A interface busca sempre numa cópia: o profiler e a instrumentação precisam acompanhá-la
+        other.instrumentation = self.instrumentation
+        other.search_hooks = list(self.search_hooks)
+        other.opening_book = self.opening_book
+        other.book_max_stones = self.book_max_stones
+        other.history = [None, self.history[1].copy(), self.history[2].copy()]
+        other.patterns = dict(self.patterns)
+        other.load_board(self.board)
+        return other
+
+    def cancel_search(self):
+        """Interrompe a busca em andamento assim que possível (o resultado deve ser descartado)"""
+        self.search_cancelled = True
 
     def reset_game(self):
         """Reinicia o jogo para o estado inicial"""
-        self.board = np.zeros((self.board_size, self.board_size), dtype=int)
-        self.current_player = self.human_player
+        self.board = self._new_board()
         self.game_over = False
         self.winner = None
-        self.message = "Sua vez de jogar"
+        self.hash = 0
+        self.symmetric_hash = 0
+        self.tt.clear()
+        self.killers = [[None, None] for _ in range(MAX_PLY)]
+        self.history = self._new_history()
+        self._rescan_evaluation()
         self.update_search_area()
 
     def count_consecutive(self, row, col):
         """Conta o máximo de peças consecutivas que esta jogada criaria"""
+        if self.board_backend != 'numpy':
+            return self.board.count_consecutive(row, col)
+
         directions = [(0, 1), (1, 0), (1, 1), (1, -1)]
         max_count = 1
         player = self.board[row, col]
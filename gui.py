@@ -2,9 +2,28 @@ import pygame
 import sys
 import os
 
+import numpy as np
+
+from ai_worker import AIWorker
+from compact_game import UIState
+from ponder import Ponderer
+
 # Constantes de interface
 CELL_SIZE = 40
 MARGIN = 50
+MESSAGE_HEIGHT = 45  # Faixa da mensagem, abaixo do tabuleiro
+OVERLAY_LEFT = 130  # Sobreposição de estatísticas: à direita do botão Voltar, acima da grade
+OVERLAY_HEIGHT = MARGIN - CELL_SIZE // 2 + 4
+TEXT_CACHE_SIZE = 256
+
+
+def star_points(board_size):
+    """Linhas/colunas dos pontos de referência: a 3 casas da borda (2 em tabuleiros pequenos) e o centro"""
+    edge = 3 if board_size >= 13 else 2
+    points = [edge, board_size - 1 - edge]
+    if board_size % 2 == 1:
+        points.insert(1, board_size // 2)
+    return points
 
 
 def load_image(path, size=None):
@@ -15,15 +34,23 @@ def load_image(path, size=None):
 
 
 class GomokuGUI:
-    def __init__(self, game):
+    def __init__(self, game, ponder=False, show_stats=False, log_stats=False):
         pygame.init()
         self.game = game
+        self.ui = UIState(current_player=game.human_player)  # Mensagem e vez, fora do estado do motor
+        # Pondering: a IA pensa durante a vez do humano nas respostas mais prováveis
+        self.ponderer = Ponderer() if ponder else None
+        # Estatísticas da última busca: sobreposição na tela (F3 alterna) e/ou uma linha no console
+        self.show_stats = show_stats
+        self.log_stats = log_stats
+        self.last_stats = None
         self.screen_width = game.board_size * CELL_SIZE + 2 * MARGIN
         self.screen_height = self.screen_width + 50
         self.screen = pygame.display.set_mode((self.screen_width, self.screen_height))
         pygame.display.set_caption("Gomoku com IA")
         self.clock = pygame.time.Clock()
         self.current_screen = "menu"
+        self.ai_worker = None  # Busca da IA em segundo plano, quando for a vez dela
         self.settings = {
             'depth': game.search_depth,
             'time': game.time_limit
@@ -35,6 +62,7 @@ class GomokuGUI:
         except:
             self.font = pygame.font.SysFont('Arial', 24)
             self.title_font = pygame.font.SysFont('Arial', 36, bold=True)
+        self.stats_font = pygame.font.SysFont('Arial', 13)
 
         # Cores
         self.colors = {
@@ -56,14 +84,46 @@ class GomokuGUI:
         self.background_menu = load_image("assets/images/menu_background.png", (self.screen_width, self.screen_height))
         self.background_board = load_image("assets/images/board_background.png", (self.screen_width, self.screen_height))
 
+        # Cache de desenho: camada estática do tabuleiro, textos renderizados e o que já está na tela
+        self._layer = None
+        self._back_button = None
+        self._text_cache = {}
+        self._frame = None  # Tela (ou estado da tela) desenhada por último
+        self._drawn = None
+        self._menu_buttons = None
+        self._settings_buttons = None
+
+    def render_text(self, font, text, color):
+        """Superfície de texto renderizada uma única vez e reaproveitada nos quadros seguintes"""
+        key = (id(font), text, color)
+        surface = self._text_cache.get(key)
+        if surface is None:
+            if len(self._text_cache) >= TEXT_CACHE_SIZE:
+                self._text_cache.clear()
+            surface = font.render(text, True, color)
+            self._text_cache[key] = surface
+        return surface
+
+    def invalidate(self):
+        """Força o redesenho completo da tela no próximo quadro (ex.: janela exposta novamente)"""
+        self._frame = None
+
+    def _check_redraw(self, event):
+        if event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+            self.invalidate()
+
     def draw_menu(self):
+        # A tela do menu é estática: só é desenhada ao entrar nela
+        if self._frame == 'menu':
+            return self._menu_buttons
+
         if self.background_menu:
             self.screen.blit(self.background_menu, (0, 0))
         else:
             self.screen.fill(self.colors['wood'])
 
         # Título
-        title = self.title_font.render("GOMOKU", True, self.colors['wood'])
+        title = self.render_text(self.title_font, "GOMOKU", self.colors['wood'])
         title_x = self.screen_width // 2 - title.get_width() // 2
         title_y = 100
         self.screen.blit(title, (title_x, title_y))
@@ -89,62 +149,122 @@ class GomokuGUI:
                                                    button_height)
 
         pygame.display.flip()
-        return play_button, settings_button
+        self._frame = 'menu'
+        self._menu_buttons = (play_button, settings_button)
+        return self._menu_buttons
+
+    def _board_layer(self):
+        """Fundo, grade, pontos de referência e botão Voltar, desenhados uma única vez"""
+        if self._layer is None:
+            layer = pygame.Surface((self.screen_width, self.screen_height)).convert()
+            if self.background_board:
+                layer.blit(self.background_board, (0, 0))
+            else:
+                layer.fill(self.colors['wood'])
+
+            # Grade: uma linha por linha e por coluna do tabuleiro
+            size = self.game.board_size
+            last = MARGIN + (size - 1) * CELL_SIZE
+            for k in range(size):
+                position = MARGIN + k * CELL_SIZE
+                pygame.draw.line(layer, self.colors['dark_wood'], (position, MARGIN), (position, last), 2)
+                pygame.draw.line(layer, self.colors['dark_wood'], (MARGIN, position), (last, position), 2)
+
+            # Estrelas
+            points = star_points(size)
+            for i in points:
+                for j in points:
+                    pygame.draw.circle(layer, self.colors['dark_wood'],
+                                       (MARGIN + i * CELL_SIZE, MARGIN + j * CELL_SIZE), 5)
+
+            # Botão voltar
+            self._back_button = self.draw_rounded_button("Voltar", 4, 5, 120, 40, surface=layer)
+            self._layer = layer
+        return self._layer
+
+    def _cell_rect(self, row, col):
+        return pygame.Rect(MARGIN + col * CELL_SIZE - CELL_SIZE // 2, MARGIN + row * CELL_SIZE - CELL_SIZE // 2,
+                           CELL_SIZE, CELL_SIZE)
 
     def draw_board(self):
-        if self.background_board:
-            self.screen.blit(self.background_board, (0, 0))
+        """Desenha o jogo atualizando só as regiões que mudaram desde o último quadro"""
+        layer = self._board_layer()
+        board = np.array(self.game.board, dtype=np.int8)
+
+        # Mensagem (com indicador animado enquanto a IA pensa)
+        message = self.ui.message
+        if self.ai_worker is not None:
+            elapsed = pygame.time.get_ticks() // 400
+            message = "IA pensando" + "." * (elapsed % 4)
+        overlay = self._stats_lines() if self.show_stats and self.last_stats is not None else ()
+
+        if self._frame != 'game':
+            self.screen.blit(layer, (0, 0))
+            for i, j in zip(*np.nonzero(board)):
+                self._draw_cell(layer, i, j, board[i, j])
+            self._draw_message(layer, message)
+            self._draw_overlay(layer, overlay)
+            pygame.display.flip()
         else:
-            self.screen.fill(self.colors['wood'])
-
-        # Grade
-        for i in range(self.game.board_size):
-            for j in range(self.game.board_size):
-                pygame.draw.line(self.screen, self.colors['dark_wood'],
-                                 (MARGIN + j * CELL_SIZE, MARGIN),
-                                 (MARGIN + j * CELL_SIZE, MARGIN + (self.game.board_size - 1) * CELL_SIZE), 2)
-                pygame.draw.line(self.screen, self.colors['dark_wood'],
-                                 (MARGIN, MARGIN + i * CELL_SIZE),
-                                 (MARGIN + (self.game.board_size - 1) * CELL_SIZE, MARGIN + i * CELL_SIZE), 2)
-
-        # Estrelas
-        star_points = [3, 7, 11]
-        for i in star_points:
-            for j in star_points:
-                pygame.draw.circle(self.screen, self.colors['dark_wood'],
-                                   (MARGIN + i * CELL_SIZE, MARGIN + j * CELL_SIZE), 5)
-
-        # Pedras
-        for i in range(self.game.board_size):
-            for j in range(self.game.board_size):
-                if self.game.board[i, j] == self.game.human_player:
-                    self.draw_stone(i, j, self.colors['black_stone'])
-                elif self.game.board[i, j] == self.game.ai_player:
-                    self.draw_stone(i, j, self.colors['white'])
-
-        # Mensagem
-        msg = self.font.render(self.game.message, True, self.colors['text'])
-        self.screen.blit(msg, (20, self.screen_height - 40))
-
-        # Botão voltar
-        back_button = self.draw_rounded_button("Voltar", 4, 5, 120, 40)
-        pygame.display.flip()
-        return back_button
+            dirty = []
+            for i, j in zip(*np.nonzero(board != self._drawn['board'])):
+                dirty.append(self._draw_cell(layer, i, j, board[i, j]))
+            if message != self._drawn['message']:
+                dirty.append(self._draw_message(layer, message))
+            if overlay != self._drawn['overlay']:
+                dirty.append(self._draw_overlay(layer, overlay))
+            if dirty:
+                pygame.display.update(dirty)
+
+        self._frame = 'game'
+        self._drawn = {'board': board, 'message': message, 'overlay': overlay}
+        return self._back_button
+
+    def _draw_cell(self, layer, row, col, player):
+        """Restaura a célula a partir da camada estática e desenha a pedra, se houver"""
+        rect = self._cell_rect(row, col)
+        self.screen.blit(layer, rect, rect)
+        if player == self.game.human_player:
+            self.draw_stone(row, col, self.colors['black_stone'])
+        elif player == self.game.ai_player:
+            self.draw_stone(row, col, self.colors['white'])
+        return rect
+
+    def _draw_message(self, layer, message):
+        rect = pygame.Rect(0, self.screen_height - MESSAGE_HEIGHT, self.screen_width, MESSAGE_HEIGHT)
+        self.screen.blit(layer, rect, rect)
+        self.screen.blit(self.render_text(self.font, message, self.colors['text']), (20, self.screen_height - 40))
+        return rect
+
+    def _stats_lines(self):
+        parts = self.last_stats.summary_line().split(" | ")
+        # Contadores numa linha, tempos por etapa na outra
+        return (" | ".join(parts[:-1]), parts[-1]) if len(parts) > 1 else tuple(parts)
+
+    def _draw_overlay(self, layer, lines):
+        """Resumo da última busca da IA no topo da tela, ao lado do botão Voltar"""
+        rect = pygame.Rect(OVERLAY_LEFT, 0, self.screen_width - OVERLAY_LEFT, OVERLAY_HEIGHT)
+        self.screen.blit(layer, rect, rect)
+        for k, line in enumerate(lines):
+            self.screen.blit(self.render_text(self.stats_font, line, self.colors['text']),
+                             (OVERLAY_LEFT + 5, 4 + k * 15))
+        return rect
 
     def draw_stone(self, row, col, color):
         x = MARGIN + col * CELL_SIZE
         y = MARGIN + row * CELL_SIZE
         pygame.draw.circle(self.screen, color, (x, y), CELL_SIZE // 2 - 4)
 
-    def draw_rounded_button(self, text, x, y, width, height):
+    def draw_rounded_button(self, text, x, y, width, height, surface=None):
         button_rect = pygame.Rect(x, y, width, height)
+        surface = surface if surface is not None else self.screen
         color = self.colors['dark_wood']
 
-        pygame.draw.rect(self.screen, color, button_rect, border_radius=20)
-        pygame.draw.rect(self.screen, self.colors['dark_wood'], button_rect, 2, border_radius=20)
+        pygame.draw.rect(surface, color, button_rect, border_radius=20)
+        pygame.draw.rect(surface, self.colors['dark_wood'], button_rect, 2, border_radius=20)
 
-        text_surf = self.font.render(text, True, self.colors['white'])
-        self.screen.blit(text_surf, (
+        text_surf = self.render_text(self.font, text, self.colors['white'])
+        surface.blit(text_surf, (
             x + width // 2 - text_surf.get_width() // 2,
             y + height // 2 - text_surf.get_height() // 2
         ))
@@ -152,38 +272,42 @@ class GomokuGUI:
         return button_rect
 
     def draw_settings(self):
-        """Desenha a tela de configurações"""
+        """Desenha a tela de configurações (só quando ela muda)"""
+        frame = ('settings', self.settings['depth'], self.settings['time'])
+        if self._frame == frame:
+            return self._settings_buttons
+
         self.screen.fill(self.colors['wood'])
 
         # Título
-        title = self.title_font.render("Configurações", True, self.colors['black_stone'])
+        title = self.render_text(self.title_font, "Configurações", self.colors['black_stone'])
         self.screen.blit(title, (self.screen_width // 2 - title.get_width() // 2, 30))
 
         # Configuração de profundidade
-        depth_text = self.font.render(f"Profundidade: {self.settings['depth']}", True, self.colors['black_stone'])
+        depth_text = self.render_text(self.font, f"Profundidade: {self.settings['depth']}", self.colors['black_stone'])
         self.screen.blit(depth_text, (50, 100))
 
         # Botões de profundidade
         depth_down = pygame.Rect(250, 100, 30, 30)
         pygame.draw.rect(self.screen, self.colors['red'], depth_down)
-        self.screen.blit(self.font.render("-", True, self.colors['white']), (depth_down.x + 10, depth_down.y))
+        self.screen.blit(self.render_text(self.font, "-", self.colors['white']), (depth_down.x + 10, depth_down.y))
 
         depth_up = pygame.Rect(300, 100, 30, 30)
         pygame.draw.rect(self.screen, self.colors['green'], depth_up)
-        self.screen.blit(self.font.render("+", True, self.colors['white']), (depth_up.x + 10, depth_up.y))
+        self.screen.blit(self.render_text(self.font, "+", self.colors['white']), (depth_up.x + 10, depth_up.y))
 
         # Configuração de tempo
-        time_text = self.font.render(f"Tempo (seg): {self.settings['time']}", True, self.colors['black_stone'])
+        time_text = self.render_text(self.font, f"Tempo (seg): {self.settings['time']}", self.colors['black_stone'])
         self.screen.blit(time_text, (50, 150))
 
         # Botões de tempo
         time_down = pygame.Rect(250, 150, 30, 30)
         pygame.draw.rect(self.screen, self.colors['red'], time_down)
-        self.screen.blit(self.font.render("-", True, self.colors['white']), (time_down.x + 10, time_down.y))
+        self.screen.blit(self.render_text(self.font, "-", self.colors['white']), (time_down.x + 10, time_down.y))
 
         time_up = pygame.Rect(300, 150, 30, 30)
         pygame.draw.rect(self.screen, self.colors['green'], time_up)
-        self.screen.blit(self.font.render("+", True, self.colors['white']), (time_up.x + 10, time_up.y))
+        self.screen.blit(self.render_text(self.font, "+", self.colors['white']), (time_up.x + 10, time_up.y))
 
         # Botão Voltar
         back_button = pygame.Rect(
@@ -193,7 +317,7 @@ class GomokuGUI:
             50
         )
         pygame.draw.rect(self.screen, self.colors['dark_wood'], back_button)
-        back_text = self.font.render("Voltar", True, self.colors['white'])
+        back_text = self.render_text(self.font, "Voltar", self.colors['white'])
         self.screen.blit(back_text, (
             back_button.x + 100 - back_text.get_width() // 2,
             back_button.y + 25 - back_text.get_height() // 2
@@ -201,7 +325,9 @@ class GomokuGUI:
 
         pygame.display.flip()
 
-        return depth_down, depth_up, time_down, time_up, back_button
+        self._frame = frame
+        self._settings_buttons = (depth_down, depth_up, time_down, time_up, back_button)
+        return self._settings_buttons
 
     def draw_menu_button(self, text, x, y, width, height, color, hover_color):
         """Desenha um botão estilizado, com efeito, e hover"""
@@ -231,9 +357,9 @@ class GomokuGUI:
         while self.current_screen == "menu":
             self.draw_menu()
             for event in pygame.event.get():
+                self._check_redraw(event)
                 if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
+                    self.quit()
 
                 if event.type == pygame.MOUSEBUTTONDOWN:
                     mouse_pos = pygame.mouse.get_pos()
@@ -254,9 +380,9 @@ class GomokuGUI:
             depth_down, depth_up, time_down, time_up, back_button = self.draw_settings()
 
             for event in pygame.event.get():
+                self._check_redraw(event)
                 if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
+                    self.quit()
 
                 if event.type == pygame.MOUSEBUTTONDOWN:
                     mouse_pos = pygame.mouse.get_pos()
@@ -281,26 +407,77 @@ class GomokuGUI:
 
             self.clock.tick(30)
 
+    def start_ai_turn(self, human_move=None):
+        """Inicia a busca da IA em segundo plano, aproveitando o pondering quando ele acertou"""
+        self.ui.current_player = self.game.ai_player
+        self.ui.message = "IA pensando..."
+
+        pondered = None
+        if self.ponderer is not None and human_move is not None:
+            pondered = self.ponderer.on_human_move(self.game, human_move)
+        self.ai_worker = pondered if pondered is not None else AIWorker(self.game).start()
+
+    def poll_ai_turn(self):
+        """Aplica a jogada da IA quando a busca em segundo plano termina"""
+        if self.ai_worker is not None and self.ai_worker.is_done():
+            move = self.ai_worker.result()
+            stats = self.ai_worker.search_stats()
+            self.ai_worker = None
+            if stats is not None:
+                self.last_stats = stats
+                if self.log_stats:
+                    print(f"IA jogou {move}: {stats.summary_line()}")
+            self.game.play_ai_move(move)
+            self.ui.current_player = self.game.human_player
+            self.ui.message = "IA venceu! Clique para reiniciar." if self.game.game_over else "Sua vez de jogar"
+            if self.ponderer is not None:
+                self.ponderer.start(self.game)
+
+    def cancel_ai_turn(self):
+        """Interrompe a busca da IA (ao voltar ao menu ou fechar a janela)"""
+        if self.ai_worker is not None:
+            self.ai_worker.cancel()
+            self.ai_worker = None
+        if self.ponderer is not None:
+            self.ponderer.stop(force=True)
+
+    def quit(self):
+        """Encerra o jogo sem esperar uma busca em andamento"""
+        self.cancel_ai_turn()
+        self.game.close()
+        pygame.quit()
+        sys.exit()
+
+    def reset_game(self):
+        """Reinicia a partida e o estado da interface"""
+        self.game.reset_game()
+        self.ui = UIState(current_player=self.game.human_player)
+
     def handle_game_events(self):
         """Processa eventos durante o jogo"""
+        self.poll_ai_turn()
         back_button = self.draw_board()
 
         for event in pygame.event.get():
+            self._check_redraw(event)
             if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
+                self.quit()
+
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                self.show_stats = not self.show_stats
 
             if event.type == pygame.MOUSEBUTTONDOWN:
                 mouse_pos = pygame.mouse.get_pos()
 
                 if back_button.collidepoint(mouse_pos):
-                    self.game.reset_game()
+                    self.cancel_ai_turn()
+                    self.reset_game()
                     self.current_screen = "menu"
                     self.draw_menu()  # Redesenha o menu imediatamente
                     return  # Sai da função completamente
 
                 # Lógica original do jogo
-                if not self.game.game_over and self.game.current_player == self.game.human_player:
+                if not self.game.game_over and self.ui.current_player == self.game.human_player:
                     x, y = pygame.mouse.get_pos()
                     col = (x - MARGIN) // CELL_SIZE
                     row = (y - MARGIN) // CELL_SIZE
@@ -308,16 +485,16 @@ class GomokuGUI:
                     if 0 <= row < self.game.board_size and 0 <= col < self.game.board_size:
                         if self.game.make_move(row, col, self.game.human_player):
                             if not self.game.game_over:
-                                self.game.current_player = self.game.ai_player
-                                self.game.message = "IA pensando..."
-                                self.draw_board()
-                                pygame.time.delay(300)
-                                self.game.ai_move()
-                                self.game.current_player = self.game.human_player
+                                self.start_ai_turn((row, col))
                             else:
-                                self.game.message = "Você venceu! Clique para reiniciar."
+                                # As previsões do pondering não servem mais: a partida acabou
+                                if self.ponderer is not None:
+                                    self.ponderer.stop(force=True)
+                                self.ui.message = "Você venceu! Clique para reiniciar."
                 elif self.game.game_over:
-                    self.game.reset_game()
+                    # Nenhuma busca pode continuar escrevendo na TT que o reset vai limpar
+                    self.cancel_ai_turn()
+                    self.reset_game()
 
                     return
 
@@ -1,16 +1,29 @@
+import argparse
+
 from gomoku import GomokuGame
 from gui import GomokuGUI
+from opening_book import DEFAULT_BOOK_PATH
+from persistent_cache import DEFAULT_CACHE_PATH
+from tuning import DEFAULT_WEIGHTS_PATH
 
 def main():
-    # Cria o jogo com configurações padrão
-    gomoku_game = GomokuGame()
+    parser = argparse.ArgumentParser(description="Gomoku contra a IA")
+    parser.add_argument('--search-cache', nargs='?', const=DEFAULT_CACHE_PATH, default=None, metavar='ARQUIVO',
+                        help=f"guarda as análises num cache em disco entre execuções (padrão: {DEFAULT_CACHE_PATH})")
+    args = parser.parse_args()
+
+    # Cria o jogo com configurações padrão (usa o livro de aberturas, se ele tiver sido gerado,
+    # e os pesos ajustados por tuning.py, se existirem). O cache de busca em disco ocupa dezenas
+    # de MB, então só é usado quando pedido com --search-cache
+    gomoku_game = GomokuGame(opening_book=DEFAULT_BOOK_PATH, persistent_cache=args.search_cache,
+                             weights=DEFAULT_WEIGHTS_PATH)
 
-    # Cria a interface com o jogo
-    gomoku_gui = GomokuGUI(gomoku_game)
+    # Cria a interface com o jogo (a IA aproveita o tempo do jogador para pensar)
+    gomoku_gui = GomokuGUI(gomoku_game, ponder=True)
 
     # Inicia o jogo
     gomoku_gui.run()
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,247 @@
+import argparse
+import mmap
+import os
+import struct
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from symmetry import canonical_key, to_canonical, from_canonical, cell_maps, inverse_maps
+
+# Formato do arquivo: cabeçalho seguido de entradas de tamanho fixo ordenadas pela chave
+BOOK_MAGIC = b'GMKBOOK1'
+HEADER = struct.Struct('<8sHxxI')  # magic, tamanho do tabuleiro, número de entradas
+ENTRY = struct.Struct('<QHBxi')  # chave canônica, célula (orientação canônica), profundidade, pontuação
+
+DEFAULT_BOOK_PATH = "assets/opening_book.bin"
+
+
+class OpeningBook:
+    """Livro de aberturas somente leitura, consultado via mmap
+
+    As posições são indexadas pela chave canônica sob as 8 simetrias do tabuleiro, e a
+    jogada guardada está na orientação canônica; lookup() a devolve na orientação real.
+    Abrir o arquivo não lê as entradas: só as páginas tocadas pela busca binária são
+    carregadas pelo sistema operacional.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.board_size, self.size = HEADER.unpack_from(self._map, 0)
+        if magic != BOOK_MAGIC:
+            self.close()
+            raise ValueError(f"{path} não é um livro de aberturas")
+        # Prepara os mapas de simetria agora, para que a primeira consulta também seja rápida
+        cell_maps(self.board_size)
+        inverse_maps(self.board_size)
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def open_if_exists(cls, path):
+        """Abre o livro se o arquivo existir; senão retorna None"""
+        return cls(path) if path and os.path.exists(path) else None
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def _entry(self, index):
+        return ENTRY.unpack_from(self._map, HEADER.size + index * ENTRY.size)
+
+    def probe(self, key):
+        """Busca binária pela chave; retorna (célula canônica, profundidade, pontuação) ou None"""
+        low, high = 0, self.size
+        while low < high:
+            middle = (low + high) // 2
+            entry_key = ENTRY.unpack_from(self._map, HEADER.size + middle * ENTRY.size)[0]
+            if entry_key < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.size:
+            entry_key, cell, depth, score = self._entry(low)
+            if entry_key == key:
+                return cell, depth, score
+        return None
+
+    def entries(self):
+        """Itera sobre todas as entradas (chave, célula, profundidade, pontuação)"""
+        for index in range(self.size):
+            yield self._entry(index)
+
+    def lookup(self, game):
+        """Jogada do livro para a posição atual do jogo, na orientação real, ou None"""
+        if game.board_size != self.board_size:
+            return None
+
+        key, symmetry = game.canonical_key()
+        found = self.probe(key)
+        if found is None:
+            self.misses += 1
+            return None
+
+        cell, _, _ = found
+        move = from_canonical(divmod(cell, self.board_size), symmetry, self.board_size)
+        if game.board[move] != 0:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return move
+
+
+def write_book(path, board_size, entries):
+    """Grava o livro; entries é um dicionário chave -> (célula, profundidade, pontuação)"""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(BOOK_MAGIC, board_size, len(entries)))
+        for key in sorted(entries):
+            cell, depth, score = entries[key]
+            f.write(ENTRY.pack(key, cell, depth, max(-2 ** 31, min(2 ** 31 - 1, int(score)))))
+    os.replace(tmp_path, path)
+
+
+def read_book(path):
+    """Carrega todas as entradas de um livro existente num dicionário"""
+    book = OpeningBook(path)
+    try:
+        return book.board_size, {key: (cell, depth, score) for key, cell, depth, score in book.entries()}
+    finally:
+        book.close()
+
+
+def _analyse_position(args):
+    """Busca profunda de uma posição (executada nos processos do pool)"""
+    from gomoku import GomokuGame
+
+    board_bytes, board_size, depth, time_limit = args
+    game = GomokuGame(board_size)
+    game.load_board(np.frombuffer(board_bytes, dtype=np.int8).reshape(board_size, board_size))
+    game.set_difficulty(search_depth=depth, time_limit=time_limit)
+    game.last_search_depth = 0
+    game.last_search_score = 0
+    move = game.find_best_move()
+    # Jogadas táticas (vitória, bloqueio, VCF) não passam pelo Minimax e valem na profundidade pedida
+    return move, game.last_search_depth or depth, game.last_search_score
+
+
+def _first_moves(game, radius):
+    """Primeiras jogadas do humano perto do centro, uma por classe de simetria"""
+    center = game.board_size // 2
+    seen = set()
+    moves = []
+    for i in range(center - radius, center + radius + 1):
+        for j in range(center - radius, center + radius + 1):
+            key, _ = canonical_key([(i * game.board_size + j, game.human_player)], game.zobrist)
+            if key not in seen:
+                seen.add(key)
+                moves.append((i, j))
+    return moves
+
+
+def build_book(path, board_size=15, plies=4, width=3, radius=1, depth=6, time_limit=10.0,
+               workers=None, extend=False):
+    """Constrói (ou estende) o livro expandindo a árvore de aberturas nível a nível
+
+    Em cada nível, as posições com a IA a jogar são analisadas em paralelo; a resposta da
+    IA é aplicada e as width melhores respostas do humano geram as posições do próximo nível.
+    """
+    from gomoku import GomokuGame
+
+    entries = {}
+    if extend and os.path.exists(path):
+        existing_size, entries = read_book(path)
+        if existing_size != board_size:
+            raise ValueError(f"O livro {path} é de um tabuleiro {existing_size}x{existing_size}")
+
+    game = GomokuGame(board_size)
+    level = []
+    for move in _first_moves(game, radius):
+        game.reset_game()
+        game.make_move(move[0], move[1], game.human_player)
+        level.append(np.asarray(game.board, dtype=np.int8).copy())
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for ply in range(plies):
+            # Remove posições simétricas repetidas e as que o livro já cobre com a profundidade pedida
+            pending = {}
+            for board in level:
+                key, symmetry = canonical_key([(c, int(board.flat[c])) for c in np.flatnonzero(board)],
+                                              game.zobrist)
+                if key in pending:
+                    continue
+                known = entries.get(key)
+                pending[key] = (board, symmetry, known if known is not None and known[1] >= depth else None)
+
+            to_analyse = [(key, board) for key, (board, _, known) in pending.items() if known is None]
+            started = time.perf_counter()
+            jobs = [(board.tobytes(), board_size, depth, time_limit) for _, board in to_analyse]
+            for (key, board), (move, reached, score) in zip(to_analyse, pool.map(_analyse_position, jobs)):
+                symmetry = pending[key][1]
+                cell = to_canonical(move, symmetry, board_size)
+                entries[key] = (cell[0] * board_size + cell[1], reached, score)
+            print(f"nível {ply + 1}: {len(pending)} posições, {len(to_analyse)} analisadas "
+                  f"em {time.perf_counter() - started:.1f}s")
+
+            if ply == plies - 1:
+                break
+
+            # Próximo nível: resposta da IA seguida das melhores respostas do humano
+            next_level = []
+            for key, (board, symmetry, _) in pending.items():
+                move = from_canonical(divmod(entries[key][0], board_size), symmetry, board_size)
+                game.load_board(board)
+                game.make_move(move[0], move[1], game.ai_player)
+                if game.game_over:
+                    continue
+                replies = game._order_moves(game.get_valid_moves(), game.human_player)[:width]
+                for reply in replies:
+                    game._place_stone(reply[0], reply[1], game.human_player)
+                    next_level.append(np.asarray(game.board, dtype=np.int8).copy())
+                    game._remove_stone(reply[0], reply[1])
+            level = next_level
+
+    write_book(path, board_size, entries)
+    print(f"{path}: {len(entries)} posições")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Livro de aberturas do Gomoku")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    for name in ('build', 'extend'):
+        cmd = sub.add_parser(name, help="constrói um livro novo" if name == 'build' else "estende um livro existente")
+        cmd.add_argument('--book', default=DEFAULT_BOOK_PATH)
+        cmd.add_argument('--board-size', type=int, default=15)
+        cmd.add_argument('--plies', type=int, default=4, help="jogadas da IA cobertas pelo livro")
+        cmd.add_argument('--width', type=int, default=3, help="respostas do humano expandidas por posição")
+        cmd.add_argument('--radius', type=int, default=1, help="raio das primeiras jogadas do humano em torno do centro")
+        cmd.add_argument('--depth', type=int, default=6)
+        cmd.add_argument('--time', type=float, default=10.0)
+        cmd.add_argument('--workers', type=int, default=None)
+
+    show = sub.add_parser('show', help="mostra o conteúdo do livro")
+    show.add_argument('--book', default=DEFAULT_BOOK_PATH)
+
+    args = parser.parse_args()
+    if args.command == 'show':
+        book = OpeningBook(args.book)
+        print(f"tabuleiro {book.board_size}x{book.board_size}, {book.size} posições")
+        for key, cell, depth, score in book.entries():
+            print(f"{key:016x} -> {divmod(cell, book.board_size)} prof. {depth} pontuação {score}")
+        book.close()
+    else:
+        directory = os.path.dirname(args.book)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        build_book(args.book, args.board_size, args.plies, args.width, args.radius, args.depth,
+                   args.time, args.workers, extend=args.command == 'extend')
+
+
+if __name__ == "__main__":
+    main()
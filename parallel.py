@@ -0,0 +1,269 @@
+import argparse
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+
+import numpy as np
+
+# Estado de cada processo do pool: o jogo é mantido entre jogadas para reaproveitar a tabela de transposição
+_worker_game = None
+_worker_settings = None
+_shared_bound = None
+
+
+def _init_worker(shared_bound):
+    """Inicializa o processo com o vetor compartilhado
+
+    Posição 0: id da última busca cancelada; depois, para cada grupo de jogadas da raiz,
+    [id da busca, profundidade, alpha] publicados pelo processo que o busca.
+    """
+    global _shared_bound
+    _shared_bound = shared_bound
+
+
+def _get_worker_game(settings):
+    """Retorna o jogo do processo, recriando-o apenas se a configuração mudou"""
+    global _worker_game, _worker_settings
+    from gomoku import GomokuGame
+
+    if _worker_game is None or _worker_settings != settings:
+        board_size, board_backend, tt_memory_mb, ai_player, _, _, _, _ = settings
+        _worker_game = GomokuGame(board_size, tt_memory_mb=tt_memory_mb, board_backend=board_backend,
+                                  ai_player=ai_player)
+        _worker_settings = settings
+
+    _, _, _, _, search_depth, max_candidates, patterns, search_algorithm = settings
+    _worker_game.search_depth = search_depth
+    _worker_game.max_candidates = max_candidates
+    _worker_game.search_algorithm = search_algorithm
+    if dict(_worker_game.patterns) != dict(patterns):
+        _worker_game.patterns = dict(patterns)
+    return _worker_game
+
+
+def _read_shared_alpha(search_id, depth, group):
+    """Maior alpha publicado pelos outros grupos para a mesma busca e profundidade
+
+    O próprio grupo fica de fora: numa nova busca com a janela de aspiração alargada, a
+    jogada que publicou o alpha falharia baixo contra ele e perderia a pontuação exata.
+    """
+    alpha = -float('inf')
+    with _shared_bound.get_lock():
+        for base in range(1, len(_shared_bound), 3):
+            if base != 1 + 3 * group and _shared_bound[base] == search_id and _shared_bound[base + 1] == depth:
+                alpha = max(alpha, _shared_bound[base + 2])
+    return alpha
+
+
+def _publish_alpha(search_id, depth, group, score):
+    """Publica um alpha melhor do grupo para os outros processos"""
+    base = 1 + 3 * group
+    with _shared_bound.get_lock():
+        if _shared_bound[base] != search_id or _shared_bound[base + 1] < depth:
+            _shared_bound[base], _shared_bound[base + 1], _shared_bound[base + 2] = search_id, depth, score
+        elif _shared_bound[base + 1] == depth and score > _shared_bound[base + 2]:
+            _shared_bound[base + 2] = score
+
+
+class SharedAlpha:
+    """Alpha compartilhado de uma busca, na interface que GomokuGame._search_root espera"""
+
+    def __init__(self, search_id, group):
+        self.search_id = search_id
+        self.group = group
+
+    def read(self, depth):
+        return _read_shared_alpha(self.search_id, depth, self.group)
+
+    def publish(self, depth, score):
+        _publish_alpha(self.search_id, depth, self.group, score)
+
+
+def _watch_cancel(game, search_id, done):
+    """Interrompe a busca do processo quando o processo principal cancela a busca search_id"""
+    while not done.wait(0.005):
+        if _shared_bound[0] == search_id:
+            game.cancel_search()
+            return
+
+
+def _search_root_moves(board_bytes, settings, moves, time_budget, search_id, group):
+    """Aprofundamento iterativo restrito a um subconjunto das jogadas da raiz
+
+    Usa a mesma iteração da busca em um processo (_aspiration_search/_search_root, com PVS e
+    janelas de aspiração), com o alpha compartilhado entre os processos. Retorna
+    ({profundidade: ({jogada: pontuação exata}, {jogada: pontuação ou limite})}, nós
+    visitados) com as iterações completas. Com o alpha elevado por outro processo, uma
+    jogada que falha baixo tem apenas um limite superior (<= alpha): só a melhor pontuação
+    exata disputa a escolha, e os limites servem apenas quando nenhum processo tem uma.
+    """
+    start_time = time.perf_counter()
+    deadline = start_time + time_budget
+    game = _get_worker_game(settings)
+    board_size = settings[0]
+    game.load_board(np.frombuffer(board_bytes, dtype=np.int8).reshape(board_size, board_size))
+    game._new_search()
+    game.search_cancelled = False
+    shared = SharedAlpha(search_id, group)
+
+    done = threading.Event()
+    watcher = threading.Thread(target=_watch_cancel, args=(game, search_id, done), daemon=True)
+    watcher.start()
+    try:
+        moves = list(moves)
+        completed = {}
+        previous = {}  # Profundidade -> melhor pontuação exata deste processo, para as janelas de aspiração
+        for depth in range(1, game.search_depth + 1):
+            result = game._aspiration_search(moves, depth, deadline, previous.get(depth - 2), shared)
+            if result is None:
+                break
+
+            best_move, best_score, scores = result
+            completed[depth] = ({best_move: best_score} if best_move is not None else {}, scores)
+            if best_move is not None:
+                previous[depth] = best_score
+            moves.sort(key=lambda move: scores.get(move, -float('inf')), reverse=True)
+
+            if best_move is not None and best_score >= game.patterns[(game.ai_player, 5)]:
+                break
+            if time.perf_counter() - start_time > time_budget / 2:
+                break
+    finally:
+        done.set()
+
+    return completed, game.ordering_stats['nodes']
+
+
+class ParallelSearcher:
+    """Busca paralela na raiz: as jogadas são divididas entre processos de um pool reutilizado
+
+    Cada processo recebe uma cópia compacta do tabuleiro (int8) e faz aprofundamento
+    iterativo nas suas jogadas, compartilhando o melhor alpha de cada profundidade. A
+    jogada escolhida é a melhor na maior profundidade completada por todos os processos.
+    """
+
+    def __init__(self, workers):
+        self.workers = workers
+        self._shared_bound = multiprocessing.Array('d', [0.0] + [0.0, 0.0, -float('inf')] * workers)
+        self._executor = None
+        self._search_id = 0
+        self.last_depth = 0
+        self.last_nodes = 0
+
+    def _pool(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                                 initargs=(self._shared_bound,))
+        return self._executor
+
+    def search(self, game, root_moves, time_budget):
+        """Busca a melhor jogada entre root_moves dentro de time_budget segundos
+
+        Retorna (jogada, pontuação); a pontuação é None quando nenhuma profundidade foi
+        completada por todos os processos.
+        """
+        self._search_id += 1
+        board_bytes = np.asarray(game.board, dtype=np.int8).tobytes()
+        settings = (game.board_size, game.board_backend, game.tt.max_memory_mb, game.ai_player,
+                    game.search_depth, game.max_candidates, tuple(sorted(game.patterns.items())),
+                    game.search_algorithm)
+
+        # Distribuição alternada para que cada processo receba jogadas boas e ruins
+        groups = [root_moves[k::self.workers] for k in range(self.workers)]
+        futures = [self._pool().submit(_search_root_moves, board_bytes, settings, group,
+                                       time_budget, self._search_id, index)
+                   for index, group in enumerate(groups) if group]
+
+        # Pequena folga para a comunicação entre processos; game.cancel_search() é repassado aos
+        # processos, que devolvem logo as iterações já completas
+        limit = time.perf_counter() + time_budget + 1.0
+        cancelled = False
+        done, pending = set(), futures
+        while pending and time.perf_counter() < limit:
+            if game.search_cancelled and not cancelled:
+                cancelled = True
+                with self._shared_bound.get_lock():
+                    self._shared_bound[0] = self._search_id
+                limit = min(limit, time.perf_counter() + 1.0)
+            finished, pending = wait(pending, timeout=0.01)
+            done |= finished
+        results = [future.result() for future in futures if future in done]
+
+        self.last_nodes = sum(nodes for _, nodes in results)
+        if cancelled or len(results) < len(futures) or not all(completed for completed, _ in results):
+            self.last_depth = 0
+            game.last_search_depth = 0
+            return root_moves[0], None
+
+        # Profundidade que todos completaram; empates resolvidos pela ordem original da raiz.
+        # Normalmente a jogada que publicou o maior alpha tem pontuação exata; se a nova busca
+        # de uma janela de aspiração a fez falhar baixo contra o próprio alpha publicado, as
+        # jogadas cujo limite alcança esse alpha empatam e a ordem da raiz decide.
+        depth = min(max(completed) for completed, _ in results)
+        scores, bounds = {}, {}
+        for completed, _ in results:
+            exact, searched = completed[depth]
+            scores.update(exact)
+            bounds.update(searched)
+        if not scores:
+            scores = bounds
+        order = {move: index for index, move in enumerate(root_moves)}
+        best_move = max(scores, key=lambda move: (scores[move], -order[move]))
+
+        self.last_depth = depth
+        game.last_search_depth = depth
+        return best_move, scores[best_move]
+
+    def close(self):
+        """Encerra os processos do pool"""
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+
+# Posições usadas para medir o ganho de velocidade
+SPEEDUP_POSITIONS = [
+    [((7, 7), 1), ((8, 8), 2), ((7, 10), 1), ((6, 5), 2)],
+    [((7, 7), 1), ((7, 8), 2), ((8, 6), 1), ((6, 8), 2), ((9, 5), 1), ((10, 4), 2)],
+    [((7, 7), 1), ((6, 6), 2), ((7, 9), 1), ((8, 8), 2), ((5, 8), 1), ((9, 9), 2), ((10, 10), 1)],
+]
+
+
+def measure_speedup(workers, depth, time_limit):
+    """Compara o tempo até a profundidade dada entre a busca em um processo e a paralela"""
+    from gomoku import GomokuGame
+
+    for stones in SPEEDUP_POSITIONS:
+        timings = {}
+        for count in (1, workers):
+            game = GomokuGame()
+            for (r, c), player in stones:
+                game.make_move(r, c, player)
+            game.set_difficulty(search_depth=depth, time_limit=time_limit)
+            game.parallel_workers = count
+            if count > 1:
+                # Aquece o pool para não medir a criação dos processos
+                game._parallel_searcher()._pool().submit(time.sleep, 0).result()
+            start = time.perf_counter()
+            move = game.find_best_move()
+            timings[count] = (time.perf_counter() - start, move, game.last_search_depth)
+            game.close()
+
+        single, parallel = timings[1], timings[workers]
+        print(f"{len(stones):2d} peças: 1 processo {single[0]:.2f}s {single[1]} (prof. {single[2]}) | "
+              f"{workers} processos {parallel[0]:.2f}s {parallel[1]} (prof. {parallel[2]}) | "
+              f"ganho {single[0] / parallel[0]:.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mede o ganho da busca paralela na raiz")
+    parser.add_argument('--workers', type=int, default=multiprocessing.cpu_count())
+    parser.add_argument('--depth', type=int, default=4)
+    parser.add_argument('--time', type=float, default=60.0)
+    args = parser.parse_args()
+    measure_speedup(args.workers, args.depth, args.time)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,322 @@
+import argparse
+import hashlib
+import mmap
+import os
+import struct
+from collections import Counter
+
+from symmetry import to_canonical, from_canonical
+from transposition import EXACT
+
+# Formato do arquivo: cabeçalho de 64 bytes seguido de baldes com BUCKET_SLOTS slots de 24 bytes
+CACHE_MAGIC = b'GMKCACH1'
+HEADER = struct.Struct('<8sHxxIQ')  # magic, tamanho do tabuleiro, número de baldes, geração
+HEADER_SIZE = 64
+SLOT = struct.Struct('<QQQ')  # verificação (chave ^ dados ^ extra), dados, extra
+BUCKET_SLOTS = 4
+
+DEFAULT_CACHE_PATH = "assets/search_cache.bin"
+DEFAULT_CACHE_MB = 64
+
+# Maior tabuleiro suportado: a célula da jogada é guardada em 16 bits
+MAX_BOARD_SIZE = 255
+NO_CELL = 0xFFFF
+
+
+def pack_entry(depth, score, flag, cell, search_depth, time_limit, generation):
+    """Empacota uma entrada em dois inteiros de 64 bits (dados, extra)
+
+    dados: pontuação (32 bits, com sinal), profundidade (8), tipo de limite (8), célula (16).
+    extra: profundidade pedida (8), tempo pedido em ms (32), geração (16).
+    """
+    score = max(-2 ** 31, min(2 ** 31 - 1, int(score)))
+    data = (score & 0xFFFFFFFF) | depth << 32 | flag << 40 | (NO_CELL if cell is None else cell) << 48
+    extra = min(search_depth, 255) | min(int(time_limit * 1000), 0xFFFFFFFF) << 8 | (generation & 0xFFFF) << 40
+    return data, extra
+
+
+def unpack_entry(data, extra):
+    """Inverso de pack_entry: (profundidade, pontuação, tipo, célula, prof. pedida, tempo pedido, geração)"""
+    score = data & 0xFFFFFFFF
+    if score >= 2 ** 31:
+        score -= 2 ** 32
+    cell = data >> 48
+    return ((data >> 32) & 0xFF, score, (data >> 40) & 0xFF, None if cell == NO_CELL else cell,
+            extra & 0xFF, ((extra >> 8) & 0xFFFFFFFF) / 1000, (extra >> 40) & 0xFFFF)
+
+
+def settings_digest(game):
+    """Resumo estável (entre processos) do que muda o resultado da busca além da posição
+
+    O hash() do Python varia entre processos para strings, então os pesos entram pela sua
+    representação textual num blake2b.
+    """
+    settings = repr((game.board_size, game.ai_player, sorted(game.patterns.items(), key=repr),
+                     game.use_vct, game.max_candidates))
+    return int.from_bytes(hashlib.blake2b(settings.encode(), digest_size=8).digest(), 'little')
+
+
+class PersistentCache:
+    """Cache de resultados de busca em disco, de tamanho fixo, compartilhado via mmap
+
+    Vários processos do mesmo computador podem ler e gravar o arquivo ao mesmo tempo sem
+    travas: cada slot guarda a chave combinada por XOR com os dados ("lockless hashing"),
+    então um slot gravado pela metade por outro processo simplesmente não confere e vale
+    como ausente. As posições são indexadas pela chave canônica sob as 8 simetrias, como
+    no livro de aberturas, e o arquivo sobrevive ao fim do programa.
+    """
+
+    def __init__(self, path, board_size=15, size_mb=DEFAULT_CACHE_MB, new_generation=True, create=True):
+        """Abre o cache em path; sem create, um arquivo inexistente é um erro em vez de ser criado"""
+        if board_size > MAX_BOARD_SIZE:
+            raise ValueError(f"O cache persistente suporta tabuleiros de até {MAX_BOARD_SIZE}x{MAX_BOARD_SIZE}")
+        self.path = path
+        if not os.path.exists(path):
+            if not create:
+                raise FileNotFoundError(f"Cache de busca não encontrado: {path}")
+            create_cache_file(path, board_size, size_mb)
+        self._file = open(path, 'r+b')
+        self._map = mmap.mmap(self._file.fileno(), 0)
+        magic, self.board_size, self.num_buckets, generation = HEADER.unpack_from(self._map, 0)
+        if magic != CACHE_MAGIC:
+            self.close()
+            raise ValueError(f"{path} não é um cache de busca")
+        # Cada abertura por um motor é uma nova geração: entradas de sessões antigas são trocadas primeiro
+        self.generation = generation
+        if new_generation:
+            self.generation = (generation + 1) & 0xFFFF
+            HEADER.pack_into(self._map, 0, CACHE_MAGIC, self.board_size, self.num_buckets, self.generation)
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def _slot_offset(self, key, slot):
+        return HEADER_SIZE + ((key % self.num_buckets) * BUCKET_SLOTS + slot) * SLOT.size
+
+    def _read(self, offset):
+        """Lê um slot; retorna (chave, dados, extra) ou None se estiver vazio ou corrompido"""
+        check, data, extra = SLOT.unpack_from(self._map, offset)
+        if not (data >> 32) & 0xFF:  # Profundidade 0: slot vazio
+            return None
+        return check ^ data ^ extra, data, extra
+
+    def probe(self, key):
+        """Entrada da chave: (profundidade, pontuação, tipo, célula, prof. pedida, tempo pedido, geração)"""
+        for slot in range(BUCKET_SLOTS):
+            found = self._read(self._slot_offset(key, slot))
+            if found is not None and found[0] == key:
+                return unpack_entry(found[1], found[2])
+        return None
+
+    def put(self, key, depth, score, flag, cell, search_depth, time_limit):
+        """Grava a entrada no balde da chave
+
+        Uma entrada mais profunda da mesma chave não é substituída. Sem a chave no balde,
+        o slot trocado é um vazio, senão o de geração mais antiga e menor profundidade.
+        """
+        data, extra = pack_entry(depth, score, flag, cell, search_depth, time_limit, self.generation)
+        victim = None
+        victim_rank = None
+        for slot in range(BUCKET_SLOTS):
+            offset = self._slot_offset(key, slot)
+            found = self._read(offset)
+            if found is None:
+                rank = (-1, 0)
+            elif found[0] == key:
+                if (found[1] >> 32) & 0xFF > depth:
+                    return
+                victim = offset
+                break
+            else:
+                rank = ((found[2] >> 40) & 0xFFFF == self.generation, (found[1] >> 32) & 0xFF)
+            if victim_rank is None or rank < victim_rank:
+                victim, victim_rank = offset, rank
+        SLOT.pack_into(self._map, victim, key ^ data ^ extra, data, extra)
+        self.stores += 1
+
+    def game_key(self, game):
+        """Chave da posição do jogo (canônica, combinada com as configurações) e a simetria usada"""
+        key, symmetry = game.canonical_key()
+        return key ^ settings_digest(game), symmetry
+
+    def lookup(self, game):
+        """(jogada na orientação real, profundidade, pontuação) válida para a configuração do jogo, ou None
+
+        Vale a mesma regra do cache em memória: a busca guardada completou a profundidade
+        pedida ou foi feita com profundidade e tempo pelo menos iguais.
+        """
+        if game.board_size != self.board_size:
+            return None
+        key, symmetry = self.game_key(game)
+        entry = self.probe(key)
+        if entry is not None:
+            depth, score, flag, cell, search_depth, time_limit, _ = entry
+            if flag == EXACT and cell is not None and (
+                    depth >= game.search_depth or (search_depth >= game.search_depth and time_limit >= game.time_limit)):
+                move = from_canonical(divmod(cell, self.board_size), symmetry, self.board_size)
+                if game.board[move] == 0:
+                    self.hits += 1
+                    return move, depth, score
+        self.misses += 1
+        return None
+
+    def store(self, game, move, depth, score):
+        """Grava o resultado de uma busca completa do jogo"""
+        if game.board_size != self.board_size or not depth:
+            return
+        key, symmetry = self.game_key(game)
+        cell = to_canonical(move, symmetry, self.board_size)
+        self.put(key, min(depth, 255), score, EXACT, cell[0] * self.board_size + cell[1],
+                 game.search_depth, game.time_limit)
+
+    def entries(self):
+        """Itera sobre as entradas válidas: (chave, profundidade, pontuação, tipo, célula, prof. pedida, tempo, geração)"""
+        for index in range(self.num_buckets * BUCKET_SLOTS):
+            found = self._read(HEADER_SIZE + index * SLOT.size)
+            if found is not None:
+                yield (found[0],) + unpack_entry(found[1], found[2])
+
+    def stats(self):
+        """Ocupação do arquivo e taxa de acerto desta instância"""
+        used = sum(1 for _ in self.entries())
+        probes = self.hits + self.misses
+        return {
+            'entries': used,
+            'slots': self.num_buckets * BUCKET_SLOTS,
+            'usage': used / (self.num_buckets * BUCKET_SLOTS),
+            'hits': self.hits,
+            'misses': self.misses,
+            'stores': self.stores,
+            'hit_rate': self.hits / probes if probes else 0.0
+        }
+
+
+def create_cache_file(path, board_size, size_mb, generation=0):
+    """Cria um arquivo de cache vazio sem corrida com outros processos
+
+    O arquivo é montado num nome temporário e ligado ao nome final com os.link, que falha
+    se outro processo já o criou; nesse caso vale o arquivo do outro processo.
+    """
+    num_buckets = max(1, int(size_mb * 1024 * 1024) // (SLOT.size * BUCKET_SLOTS))
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(CACHE_MAGIC, board_size, num_buckets, generation).ljust(HEADER_SIZE, b'\0'))
+        f.truncate(HEADER_SIZE + num_buckets * BUCKET_SLOTS * SLOT.size)
+    try:
+        os.link(tmp_path, path)
+    except FileExistsError:
+        pass
+    finally:
+        os.unlink(tmp_path)
+
+
+def inspect(path):
+    """Resumo do arquivo: ocupação, profundidades e gerações das entradas"""
+    cache = PersistentCache(path, new_generation=False, create=False)
+    try:
+        depths = Counter()
+        generations = Counter()
+        for _, depth, _, _, _, _, _, generation in cache.entries():
+            depths[depth] += 1
+            generations[generation] += 1
+        slots = cache.num_buckets * BUCKET_SLOTS
+        used = sum(depths.values())
+        return {
+            'board_size': cache.board_size,
+            'slots': slots,
+            'entries': used,
+            'usage': used / slots,
+            'size_mb': (HEADER_SIZE + slots * SLOT.size) / (1024 * 1024),
+            'generation': cache.generation,
+            'depths': dict(sorted(depths.items())),
+            'generations': dict(sorted(generations.items()))
+        }
+    finally:
+        cache.close()
+
+
+def compact(path, size_mb=None, min_depth=1, keep_generations=None, output=None):
+    """Regrava o cache só com as entradas úteis, opcionalmente com outro tamanho
+
+    Descarta entradas mais rasas que min_depth e, com keep_generations, as de gerações mais
+    antigas que as últimas keep_generations. As entradas mais profundas e mais novas são
+    gravadas por último, para vencerem as disputas por slot no arquivo novo. Deve ser
+    executado com os motores parados: quem já tem o arquivo antigo mapeado não vê o novo.
+    """
+    source = PersistentCache(path, new_generation=False, create=False)
+    try:
+        generation = source.generation
+        entries = [entry for entry in source.entries() if entry[1] >= min_depth]
+        if keep_generations is not None:
+            entries = [entry for entry in entries if (generation - entry[7]) & 0xFFFF < keep_generations]
+        if size_mb is None:
+            size_mb = source.num_buckets * BUCKET_SLOTS * SLOT.size / (1024 * 1024)
+        board_size = source.board_size
+    finally:
+        source.close()
+
+    output = output or path
+    tmp_path = output + '.compact'
+    if os.path.exists(tmp_path):
+        os.unlink(tmp_path)
+    create_cache_file(tmp_path, board_size, size_mb, generation)
+    target = PersistentCache(tmp_path, new_generation=False, create=False)
+    try:
+        entries.sort(key=lambda entry: ((generation - entry[7]) & 0xFFFF, entry[1]), reverse=True)
+        for key, depth, score, flag, cell, search_depth, time_limit, entry_generation in entries:
+            target.generation = entry_generation
+            target.put(key, depth, score, flag, cell, search_depth, time_limit)
+        kept = sum(1 for _ in target.entries())
+    finally:
+        target.close()
+    os.replace(tmp_path, output)
+    return len(entries), kept
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cache de busca persistente do Gomoku")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    show = sub.add_parser('inspect', help="mostra a ocupação do cache")
+    show.add_argument('--cache', default=DEFAULT_CACHE_PATH)
+    show.add_argument('--entries', type=int, default=0, help="lista as N entradas mais profundas")
+
+    pack = sub.add_parser('compact', help="regrava o cache descartando entradas rasas ou antigas")
+    pack.add_argument('--cache', default=DEFAULT_CACHE_PATH)
+    pack.add_argument('--size-mb', type=float, default=None, help="novo tamanho do arquivo")
+    pack.add_argument('--min-depth', type=int, default=1)
+    pack.add_argument('--keep-generations', type=int, default=None, help="mantém só as últimas N gerações")
+    pack.add_argument('--output', default=None, help="grava em outro arquivo em vez de substituir")
+
+    args = parser.parse_args()
+    if not os.path.exists(args.cache):
+        parser.error(f"cache de busca não encontrado: {args.cache}")
+    if args.command == 'inspect':
+        info = inspect(args.cache)
+        print(f"{args.cache}: tabuleiro {info['board_size']}x{info['board_size']}, {info['size_mb']:.1f} MB, "
+              f"{info['entries']}/{info['slots']} slots ({info['usage']:.1%}), geração {info['generation']}")
+        print("profundidades: " + ", ".join(f"{depth}: {count}" for depth, count in info['depths'].items()))
+        print("gerações: " + ", ".join(f"{gen}: {count}" for gen, count in info['generations'].items()))
+        if args.entries:
+            cache = PersistentCache(args.cache, new_generation=False, create=False)
+            deepest = sorted(cache.entries(), key=lambda entry: entry[1], reverse=True)[:args.entries]
+            for key, depth, score, _, cell, _, _, generation in deepest:
+                print(f"{key:016x} -> {divmod(cell, cache.board_size)} prof. {depth} pontuação {score} "
+                      f"geração {generation}")
+            cache.close()
+    else:
+        total, kept = compact(args.cache, args.size_mb, args.min_depth, args.keep_generations, args.output)
+        print(f"{args.output or args.cache}: {kept} de {total} entradas mantidas")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+import threading
+import time
+
+
+class PonderedSearch:
+    """Resultado de uma busca feita durante a vez do humano, com a mesma interface do AIWorker"""
+
+    def __init__(self, ponderer, reply):
+        self._ponderer = ponderer
+        self._reply = reply
+
+    def is_done(self):
+        return self._ponderer._result_for(self._reply) is not None
+
+    def result(self):
+        """Retorna a jogada calculada, relançando um erro ocorrido na busca (como o AIWorker)"""
+        result = self._ponderer._result_for(self._reply)
+        if result is None:
+            return None
+        if result[3] is not None:
+            raise result[3]
+        return result[0]
+
+    def search_stats(self):
+        result = self._ponderer._result_for(self._reply)
+        return result[2] if result is not None else None
+
+    def cancel(self, timeout=1.0):
+        self._ponderer.stop(timeout, force=True)
+
+
+class Ponderer:
+    """Pondering: enquanto o humano pensa, a IA já busca a resposta às jogadas mais prováveis dele
+
+    Depois de cada jogada da IA, start() prevê as respostas do humano (a jogada da variação
+    principal e as melhores pela ordenação estática) e, numa thread, calcula a resposta da
+    IA para cada uma. Quando o humano joga, on_human_move() devolve o resultado pronto, ou
+    a busca em andamento se ela era sobre a jogada feita; em caso de erro de previsão a busca
+    é cancelada imediatamente. A tabela de transposição é compartilhada com o jogo, então
+    mesmo uma busca interrompida deixa trabalho aproveitável.
+    """
+
+    def __init__(self, predictions=3):
+        self.predictions = predictions
+        self._lock = threading.Lock()
+        self._thread = None
+        self._snapshot = None
+        self._base_hash = None
+        self._results = {}
+        self._current = None
+        self._current_started = None
+        self._stop_after_current = False
+
+        # Estatísticas
+        self.pondered_turns = 0
+        self.hits = 0
+        self.partial_hits = 0
+        self.misses = 0
+        self.latency_saved = 0.0
+
+    def predict_replies(self, game):
+        """Jogadas mais prováveis do humano na posição atual"""
+        replies = []
+        entry = game.tt.probe(game.hash)
+        if entry is not None and entry[4] is not None and game.board[entry[4]] == 0:
+            replies.append(entry[4])
+        for move in game._order_moves(game.get_valid_moves(), game.human_player):
+            if len(replies) >= self.predictions:
+                break
+            if move not in replies:
+                replies.append(move)
+        return replies
+
+    def start(self, game):
+        """Começa a pensar no tempo do humano (chamar logo após a jogada da IA)"""
+        self.stop()
+        if game.game_over:
+            return
+
+        self._snapshot = game.snapshot()
+        self._base_hash = game.hash
+        self._results = {}
+        self._current = None
+        self._stop_after_current = False
+        self.pondered_turns += 1
+
+        replies = self.predict_replies(game)
+        self._thread = threading.Thread(target=self._run, args=(replies,), name="gomoku-ponder", daemon=True)
+        self._thread.start()
+
+    def _run(self, replies):
+        snapshot = self._snapshot
+        for reply in replies:
+            with self._lock:
+                if self._stop_after_current or snapshot.search_cancelled:
+                    return
+                self._current = reply
+                self._current_started = time.perf_counter()
+
+            started = self._current_started
+            move, error = None, None
+            snapshot.make_move(reply[0], reply[1], snapshot.human_player)
+            try:
+                move = None if snapshot.game_over else snapshot.find_best_move()
+            except Exception as exc:  # Repassado por PonderedSearch.result(), como no AIWorker
+                error = exc
+            finally:
+                snapshot._remove_stone(reply[0], reply[1])
+                snapshot.game_over = False
+                snapshot.winner = None
+                elapsed = time.perf_counter() - started
+                with self._lock:
+                    self._current = None
+                    # Um erro sempre vira resultado: quem aproveita esta busca não pode esperar para sempre
+                    if error is not None or not snapshot.search_cancelled:
+                        stats = snapshot.search_stats if move is not None else None
+                        self._results[reply] = (move, elapsed, stats, error)
+
+            if error is not None or snapshot.search_cancelled:
+                return
+
+    def _result_for(self, reply):
+        with self._lock:
+            return self._results.get(reply)
+
+    def on_human_move(self, game, move):
+        """Chamado após a jogada do humano; retorna a busca aproveitável ou None"""
+        if self._snapshot is None:
+            return None
+
+        # A posição precisa ser exatamente a prevista: base + jogada do humano
+        expected = self._base_hash ^ game.zobrist.key(game.human_player, move[0], move[1])
+        if game.hash != expected:
+            self.stop()
+            return None
+
+        with self._lock:
+            result = self._results.get(move)
+            current = self._current
+            current_started = self._current_started
+            if result is None and current == move:
+                # A busca sobre esta jogada continua de onde está; nada mais é iniciado depois dela
+                self._stop_after_current = True
+
+        if result is not None:
+            self.hits += 1
+            self.latency_saved += result[1]
+            self.stop()
+            return PonderedSearch(self, move)
+
+        if current == move:
+            self.partial_hits += 1
+            self.latency_saved += time.perf_counter() - current_started
+            return PonderedSearch(self, move)
+
+        self.misses += 1
+        self.stop()
+        return None
+
+    def stop(self, timeout=1.0, force=False):
+        """Cancela o pondering em andamento (os resultados já prontos continuam disponíveis)
+
+        Uma busca que acertou a previsão e está sendo aproveitada só é cancelada com force.
+        """
+        if self._thread is not None and self._thread.is_alive():
+            with self._lock:
+                kept = self._stop_after_current
+            if force or not kept:
+                self._snapshot.cancel_search()
+                self._thread.join(timeout)
+
+    def stats(self):
+        """Taxa de acerto das previsões e tempo de resposta economizado"""
+        predicted = self.hits + self.partial_hits + self.misses
+        return {
+            'pondered_turns': self.pondered_turns,
+            'hits': self.hits,
+            'partial_hits': self.partial_hits,
+            'misses': self.misses,
+            'hit_rate': (self.hits + self.partial_hits) / predicted if predicted else 0.0,
+            'latency_saved': self.latency_saved,
+            'latency_saved_per_move': self.latency_saved / predicted if predicted else 0.0
+        }
@@ -0,0 +1,72 @@
+import threading
+from collections import OrderedDict
+
+
+class SearchCache:
+    """Cache LRU de resultados de busca indexado pela chave canônica da posição
+
+    Posições equivalentes por rotação ou reflexão compartilham a mesma entrada, então uma
+    abertura já calculada em qualquer orientação é respondida sem busca. A jogada é guardada
+    na orientação canônica. Diferente da tabela de transposição, o cache sobrevive ao
+    reinício do jogo, e é compartilhado com as cópias usadas pelas buscas em segundo plano.
+    """
+
+    def __init__(self, max_entries=4096):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, search_depth, time_limit):
+        """Retorna (célula canônica, profundidade, pontuação) se a entrada vale para a configuração
+
+        Uma entrada vale se foi calculada com configuração pelo menos tão forte (profundidade
+        e tempo) ou se a busca dela completou a profundidade pedida.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                cell, depth, score, entry_depth_limit, entry_time_limit = entry
+                if depth >= search_depth or (entry_depth_limit >= search_depth and entry_time_limit >= time_limit):
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return cell, depth, score
+            self.misses += 1
+            return None
+
+    def put(self, key, cell, depth, score, search_depth, time_limit):
+        with self._lock:
+            old = self._entries.get(key)
+            # Não substitui um resultado mais profundo por um mais raso
+            if old is not None and old[1] > depth:
+                self._entries.move_to_end(key)
+                return
+            self._entries[key] = (cell, depth, score, search_depth, time_limit)
+            self._entries.move_to_end(key)
+            self.stores += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Ocupação e taxa de acerto"""
+        probes = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'stores': self.stores,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / probes if probes else 0.0
+        }
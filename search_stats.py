@@ -0,0 +1,146 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+# Contadores mantidos sempre (usados também pela ordenação de jogadas)
+BASE_COUNTERS = ('nodes', 'cutoffs', 'first_move_cutoffs')
+# Contadores extras, mantidos só com a instrumentação ligada
+DETAIL_COUNTERS = ('leaves', 'terminals', 'tt_hits', 'threat_nodes', 'timeouts',
+                   'pvs_researches', 'lmr_researches', 'aspiration_researches')
+
+
+class SearchStats:
+    """Contadores e tempos de uma chamada de find_best_move
+
+    counters é o dicionário incrementado diretamente pela busca. phases acumula o tempo
+    (em segundos) de cada etapa: 'livro', 'tatico', 'minimax' ou 'paralela' e, com a
+    instrumentação ligada, 'geracao' (gerar e ordenar jogadas) e 'avaliacao' (folhas).
+    """
+
+    def __init__(self, detailed=True):
+        self.detailed = detailed
+        self.counters = dict.fromkeys(BASE_COUNTERS + DETAIL_COUNTERS if detailed else BASE_COUNTERS, 0)
+        self.phases = {}
+        self.depth_times = []  # Tempo decorrido ao completar cada profundidade
+        self.depth = 0
+        self.score = None
+        self.move = None
+        self.source = None  # Etapa que decidiu a jogada
+        self.timed_out = False
+        self.cancelled = False
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+        self.profile = None  # Preenchido pelo SamplingProfiler, se houver um
+
+    def add_time(self, phase, seconds):
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def finish(self, move, source):
+        self.move = move
+        self.source = source
+        self.elapsed = time.perf_counter() - self.started
+
+    def as_dict(self):
+        """Contadores, taxas derivadas e tempos num dicionário simples"""
+        counters = self.counters
+        nodes = counters['nodes']
+        cutoffs = counters['cutoffs']
+        result = dict(counters)
+        if 'leaves' in counters:
+            result['evaluations'] = counters['leaves'] + counters['terminals']
+        result.update({
+            'cutoff_rate': cutoffs / nodes if nodes else 0.0,
+            'first_move_cutoff_rate': counters['first_move_cutoffs'] / cutoffs if cutoffs else 0.0,
+            'nodes_per_second': nodes / self.elapsed if self.elapsed else 0.0,
+            'depth': self.depth,
+            'score': self.score,
+            'move': self.move,
+            'source': self.source,
+            'timed_out': self.timed_out,
+            'cancelled': self.cancelled,
+            'elapsed': self.elapsed,
+            'phases': dict(self.phases),
+            'depth_times': list(self.depth_times),
+        })
+        if self.profile is not None:
+            result['profile'] = self.profile
+        return result
+
+    def summary_line(self):
+        """Resumo de uma linha, para log ou para a sobreposição da interface"""
+        counters = self.counters
+        nodes = counters['nodes']
+        parts = [f"{self.source or '-'}", f"prof. {self.depth}", f"{nodes} nós"]
+        if self.elapsed and nodes:
+            parts.append(f"{nodes / self.elapsed:.0f} nós/s")
+        if counters['cutoffs']:
+            parts.append(f"1º corte {counters['first_move_cutoffs'] / counters['cutoffs']:.0%}")
+        if self.timed_out:
+            parts.append("tempo esgotado")
+        phases = " ".join(f"{name} {seconds * 1000:.0f}ms" for name, seconds in self.phases.items())
+        if phases:
+            parts.append(phases)
+        return " | ".join(parts)
+
+
+class SamplingProfiler:
+    """Profiler por amostragem da thread que está buscando
+
+    Registrado como gancho de busca (GomokuGame.search_hooks): uma thread auxiliar lê a
+    pilha da thread da busca a cada interval segundos e conta as funções encontradas. O
+    custo fica na thread auxiliar, então a busca praticamente não é afetada.
+    """
+
+    def __init__(self, interval=0.002, top=15):
+        self.interval = interval
+        self.top = top
+        self.own = Counter()  # Amostras em que a função estava no topo da pilha
+        self.total = Counter()  # Amostras em que a função estava em qualquer ponto da pilha
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def search_started(self, game):
+        self.own.clear()
+        self.total.clear()
+        self.samples = 0
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._sample, args=(threading.get_ident(),),
+                                        name="gomoku-profiler", daemon=True)
+        self._thread.start()
+
+    def search_finished(self, game, stats):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        stats.profile = self.report()
+
+    def _sample(self, thread_id):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(thread_id)
+            if frame is None:
+                continue
+            self.samples += 1
+            self.own[_frame_name(frame)] += 1
+            seen = set()
+            while frame is not None:
+                name = _frame_name(frame)
+                if name not in seen:
+                    seen.add(name)
+                    self.total[name] += 1
+                frame = frame.f_back
+
+    def report(self):
+        """Funções mais amostradas: (nome, fração própria, fração acumulada)"""
+        if not self.samples:
+            return []
+        return [(name, count / self.samples, self.total[name] / self.samples)
+                for name, count in self.own.most_common(self.top)]
+
+
+def _frame_name(frame):
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
@@ -0,0 +1,288 @@
+import argparse
+import json
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# Partidas IA contra IA sem interface: só o motor (gomoku.py) é importado, nunca o pygame
+
+DEFAULT_PLAYER = {'depth': 2, 'time': 1.0, 'weights': None, 'use_vct': False, 'algorithm': 'pvs'}
+
+
+def player_config(depth=None, time_limit=None, weights=None, use_vct=None, algorithm=None):
+    """Configuração de um lado: profundidade, tempo por jogada, pesos, busca VCT e algoritmo de busca"""
+    config = dict(DEFAULT_PLAYER)
+    if depth is not None:
+        config['depth'] = depth
+    if time_limit is not None:
+        config['time'] = time_limit
+    if weights is not None:
+        config['weights'] = weights
+    if use_vct is not None:
+        config['use_vct'] = use_vct
+    if algorithm is not None:
+        config['algorithm'] = algorithm
+    return config
+
+
+def load_weights(path):
+    """Lê pesos de um arquivo JSON no formato {"own:4:open": 100000, "opponent:3": -5000, ...}
+
+    'own' é o lado configurado e 'opponent' o adversário; os padrões ausentes mantêm o peso padrão.
+    """
+    with open(path) as f:
+        return json.load(f)
+
+
+def _new_engine(config, color, board_size):
+    """Jogo do ponto de vista de um lado, com a sua própria tabela de transposição"""
+    from gomoku import GomokuGame
+
+    game = GomokuGame(board_size, tt_memory_mb=config.get('tt_memory_mb', 16), ai_player=color,
+                      persistent_cache=config.get('cache'))
+    game.set_difficulty(search_depth=config['depth'], time_limit=config['time'])
+    game.use_vct = config.get('use_vct', False)
+    game.search_algorithm = config.get('algorithm', DEFAULT_PLAYER['algorithm'])
+    if config.get('weights'):
+        game.apply_weights(config['weights'])
+    return game
+
+
+def random_opening(board_size, plies, seed, radius=2):
+    """Jogadas de abertura aleatórias perto do centro, para que as partidas não se repitam"""
+    rng = random.Random(seed)
+    center = board_size // 2
+    cells = [(center + i, center + j) for i in range(-radius, radius + 1) for j in range(-radius, radius + 1)]
+    return rng.sample(cells, min(plies, len(cells)))
+
+
+def play_game(game_id, first, second, board_size=15, opening=(), max_moves=None):
+    """Joga uma partida completa entre duas configurações; first joga com as peças 1
+
+    Retorna um dicionário com as jogadas, o vencedor (1, 2 ou None para empate) e, para
+    cada jogada calculada, o tempo de reflexão e os nós visitados.
+    """
+    engines = {1: _new_engine(first, 1, board_size), 2: _new_engine(second, 2, board_size)}
+    max_moves = max_moves or board_size * board_size
+    moves = []
+    think_times = []
+    nodes = []
+    winner = None
+    player = 1
+    started = time.perf_counter()
+
+    for move in opening:
+        for engine in engines.values():
+            engine.make_move(move[0], move[1], player)
+        moves.append(list(move))
+        think_times.append(0.0)
+        nodes.append(0)
+        player = 3 - player
+
+    while len(moves) < max_moves and not engines[1].game_over:
+        engine = engines[player]
+        if not engine.get_valid_moves():
+            break
+
+        move_started = time.perf_counter()
+        move = engine.find_best_move()
+        think_times.append(round(time.perf_counter() - move_started, 4))
+        nodes.append(engine.search_stats.counters['nodes'])
+
+        for other in engines.values():
+            other.make_move(move[0], move[1], player)
+        moves.append(list(move))
+        player = 3 - player
+
+    if engines[1].game_over:
+        winner = engines[1].winner
+    for engine in engines.values():
+        engine.close()
+
+    return {
+        'game': game_id,
+        'first': first,
+        'second': second,
+        'board_size': board_size,
+        'opening_plies': len(opening),
+        'moves': moves,
+        'winner': winner,
+        'think_times': think_times,
+        'nodes': nodes,
+        'duration': round(time.perf_counter() - started, 3)
+    }
+
+
+def _play_job(job):
+    game_id, config_a, config_b, a_first, board_size, opening, max_moves = job
+    first, second = (config_a, config_b) if a_first else (config_b, config_a)
+    record = play_game(game_id, first, second, board_size, opening, max_moves)
+    record['a_color'] = 1 if a_first else 2
+    return record
+
+
+def run_match(config_a, config_b, games, output, workers=None, board_size=15, opening_plies=2,
+              max_moves=None, seed=0):
+    """Joga games partidas entre A e B num pool de processos, gravando cada uma em JSONL ao terminar
+
+    As partidas vêm em pares com a mesma abertura aleatória e as cores trocadas, o que
+    cancela a vantagem de quem começa. Retorna o resumo do confronto (ver summarize).
+    """
+    jobs = []
+    for game_id in range(games):
+        opening = random_opening(board_size, opening_plies, seed + game_id // 2)
+        jobs.append((game_id, config_a, config_b, game_id % 2 == 0, board_size, opening, max_moves))
+
+    records = []
+    started = time.perf_counter()
+    with open(output, 'w') as out, ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_play_job, job) for job in jobs]
+        for future in as_completed(futures):
+            record = future.result()
+            out.write(json.dumps(record) + '\n')
+            out.flush()
+            records.append(record)
+            print(f"partida {record['game']}: {_result_label(record)} em {len(record['moves'])} jogadas "
+                  f"({len(records)}/{games})")
+
+    summary = summarize(records)
+    summary['elapsed'] = time.perf_counter() - started
+    summary['games_per_minute'] = 60 * len(records) / summary['elapsed'] if summary['elapsed'] else 0.0
+    return summary
+
+
+def _result_label(record):
+    if record['winner'] is None:
+        return "empate"
+    return "A venceu" if record['winner'] == record['a_color'] else "B venceu"
+
+
+def elo_difference(score):
+    """Diferença de Elo correspondente a uma pontuação esperada entre 0 e 1"""
+    if score <= 0:
+        return -float('inf')
+    if score >= 1:
+        return float('inf')
+    return -400 * math.log10(1 / score - 1)
+
+
+def summarize(records):
+    """Vitórias, empates, taxa de vitória e Elo de A em relação a B, com intervalo de 95%
+
+    Com 0% ou 100% de pontuação o Elo é infinito e só um dos limites é finito: o limite
+    unilateral de 95% da taxa de vitória (Clopper-Pearson, 0.05 ** (1 / partidas)).
+    """
+    games = len(records)
+    wins = sum(1 for r in records if r['winner'] is not None and r['winner'] == r['a_color'])
+    draws = sum(1 for r in records if r['winner'] is None)
+    losses = games - wins - draws
+    first_wins = sum(1 for r in records if r['winner'] == 1)
+
+    summary = {'games': games, 'a_wins': wins, 'b_wins': losses, 'draws': draws,
+               'first_player_wins': first_wins}
+    if not games:
+        return summary
+
+    score = (wins + draws / 2) / games
+    # Desvio padrão da pontuação por partida, para o intervalo de confiança do Elo
+    variance = (wins * (1 - score) ** 2 + draws * (0.5 - score) ** 2 + losses * score ** 2) / games
+    margin = 1.96 * math.sqrt(variance / games)
+    if score >= 1:
+        elo_low, elo_high = elo_difference(0.05 ** (1 / games)), float('inf')
+    elif score <= 0:
+        elo_low, elo_high = -float('inf'), elo_difference(1 - 0.05 ** (1 / games))
+    else:
+        elo_low, elo_high = elo_difference(max(0.0, score - margin)), elo_difference(min(1.0, score + margin))
+    # Todas as jogadas dos motores (inclusive livro, táticas e cache), sem as da abertura aleatória
+    all_times = [t for r in records for t in r['think_times'][r['opening_plies']:]]
+    all_nodes = [n for r in records for n in r['nodes'][r['opening_plies']:]]
+
+    summary.update({
+        'a_score': score,
+        'a_win_rate': wins / games,
+        'elo': elo_difference(score),
+        'elo_low': elo_low,
+        'elo_high': elo_high,
+        'mean_game_length': sum(len(r['moves']) for r in records) / games,
+        'mean_think_time': sum(all_times) / len(all_times) if all_times else 0.0,
+        'nodes_per_second': sum(all_nodes) / sum(all_times) if all_times and sum(all_times) else 0.0
+    })
+    return summary
+
+
+def read_results(path):
+    """Lê as partidas gravadas num arquivo JSONL"""
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _elo_label(summary):
+    """Elo com o intervalo de 95%; um limite infinito vira só uma desigualdade"""
+    elo, low, high = summary['elo'], summary['elo_low'], summary['elo_high']
+    if math.isinf(high) and math.isinf(low):
+        return "Elo indeterminado"
+    if math.isinf(elo):
+        return f"Elo > {low:+.0f} (95%)" if elo > 0 else f"Elo < {high:+.0f} (95%)"
+    if math.isinf(low):
+        return f"Elo {elo:+.0f} (95%: < {high:+.0f})"
+    if math.isinf(high):
+        return f"Elo {elo:+.0f} (95%: > {low:+.0f})"
+    return f"Elo {elo:+.0f} [{low:+.0f}, {high:+.0f}]"
+
+
+def print_summary(summary):
+    games = summary['games']
+    print(f"{games} partidas: A {summary['a_wins']} x {summary['b_wins']} B, {summary['draws']} empates "
+          f"(quem começa venceu {summary['first_player_wins']})")
+    if games:
+        print(f"pontuação de A {summary['a_score']:.3f}, {_elo_label(summary)}")
+        print(f"{summary['mean_game_length']:.1f} jogadas por partida, "
+              f"{summary['mean_think_time']:.3f}s por jogada, {summary['nodes_per_second']:.0f} nós/s")
+    if 'games_per_minute' in summary:
+        print(f"{summary['elapsed']:.1f}s, {summary['games_per_minute']:.1f} partidas por minuto")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Partidas IA contra IA sem interface gráfica")
+    parser.add_argument('--games', type=int, default=20)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--output', default='selfplay.jsonl')
+    parser.add_argument('--board-size', type=int, default=15)
+    parser.add_argument('--opening-plies', type=int, default=2, help="jogadas aleatórias antes dos motores")
+    parser.add_argument('--max-moves', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    for side in ('a', 'b'):
+        parser.add_argument(f'--{side}-depth', type=int, default=DEFAULT_PLAYER['depth'])
+        parser.add_argument(f'--{side}-time', type=float, default=DEFAULT_PLAYER['time'])
+        parser.add_argument(f'--{side}-weights', default=None, help="arquivo JSON de pesos")
+        parser.add_argument(f'--{side}-vct', action='store_true')
+        parser.add_argument(f'--{side}-algorithm', choices=('pvs', 'alphabeta'), default=DEFAULT_PLAYER['algorithm'])
+    parser.add_argument('--cache', default=None, help="cache de busca em disco compartilhado pelos processos")
+    parser.add_argument('--summary', metavar='JSONL', help="só resume um arquivo de resultados existente")
+    args = parser.parse_args()
+
+    if args.summary:
+        print_summary(summarize(read_results(args.summary)))
+        return
+
+    configs = []
+    for side in ('a', 'b'):
+        weights_path = getattr(args, f'{side}_weights')
+        configs.append(player_config(getattr(args, f'{side}_depth'), getattr(args, f'{side}_time'),
+                                     load_weights(weights_path) if weights_path else None,
+                                     getattr(args, f'{side}_vct'), getattr(args, f'{side}_algorithm')))
+        if args.cache:
+            configs[-1]['cache'] = args.cache
+
+    directory = os.path.dirname(args.output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    summary = run_match(configs[0], configs[1], args.games, args.output, args.workers, args.board_size,
+                        args.opening_plies, args.max_moves, args.seed)
+    print_summary(summary)
+
+
+if __name__ == "__main__":
+    main()
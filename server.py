@@ -0,0 +1,596 @@
+import argparse
+import asyncio
+import itertools
+import multiprocessing
+import os
+import signal
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from compact_game import CompactGame
+
+# Servidor do motor no protocolo de texto do Gomocup (piskvork), pela entrada e saída padrão
+# (uma partida, como um "brain" comum) ou por TCP (uma partida por conexão, muitas ao mesmo
+# tempo). As buscas rodam num pool limitado de processos; cada sessão guarda só o estado
+# compacto da partida (CompactGame). Só o motor (gomoku.py) é importado, nunca o pygame.
+#
+# Comandos: START n, RECTSTART w,h (só quadrado), RESTART, BEGIN, TURN x,y, BOARD ... DONE,
+# TAKEBACK x,y, INFO chave valor, ABOUT, END e STOP (ou YXSTOP), que pede a jogada já. As
+# coordenadas são x,y = coluna,linha; no BOARD, 1 é peça própria e 2 do adversário.
+
+ABOUT = 'name="Gomoku-Minimax", version="1.0", author="Gomoku-Minimax", country="BR"'
+
+DEFAULT_SETTINGS = {'depth': 9, 'time': 2.0, 'tt_memory_mb': 16, 'use_vct': False}
+
+MIN_BOARD_SIZE = 5
+MAX_BOARD_SIZE = 100
+
+# Folga entre o fim da busca e o prazo da jogada (comunicação entre processos e rede)
+SAFETY_MARGIN = 0.1
+
+# Busca mínima mesmo quando a fila consumiu quase todo o tempo da jogada
+MIN_SEARCH_TIME = 0.05
+
+# Jogadas que ainda se espera fazer, para dividir o tempo restante da partida (INFO time_left)
+MOVES_TO_GO = 20
+
+# Depois do prazo, espera extra pela jogada de uma busca interrompida antes de jogar qualquer uma
+CANCEL_GRACE = 1.0
+
+# Slots do vetor compartilhado que avisa os processos das buscas canceladas
+CANCEL_SLOTS = 1024
+
+_cancelled = None
+_games = {}
+
+
+def _init_worker(cancelled):
+    global _cancelled
+    _cancelled = cancelled
+    # O processo principal cuida do Ctrl+C e encerra o pool com calma
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def _engine(board_size, ai_player, settings):
+    """Jogo de busca do processo, reaproveitado entre sessões (um por tamanho e cor)"""
+    from gomoku import GomokuGame
+
+    game = _games.get((board_size, ai_player))
+    if game is None:
+        game = GomokuGame(board_size, tt_memory_mb=settings['tt_memory_mb'], ai_player=ai_player)
+        game.use_vct = settings['use_vct']
+        _games[(board_size, ai_player)] = game
+    return game
+
+
+def warm_up(board_size, settings):
+    """Cria os jogos de busca do processo antes da primeira sessão (importações e tabelas)"""
+    for ai_player in (1, 2):
+        _engine(board_size, ai_player, settings)
+    return os.getpid()
+
+
+def _watch_cancel(game, task_id, done):
+    """Interrompe a busca quando o servidor marca a tarefa como cancelada"""
+    slot = task_id % len(_cancelled)
+    while not done.wait(0.005):
+        if _cancelled[slot] == task_id:
+            game.cancel_search()
+            return
+
+
+def search_move(task_id, board_bytes, board_size, ai_player, depth, time_limit, settings):
+    """Busca a jogada da IA numa posição (tabuleiro int8 em bytes); roda nos processos do pool"""
+    game = _engine(board_size, ai_player, settings)
+    board = np.frombuffer(board_bytes, dtype=np.int8).reshape(board_size, board_size)
+    game.load_board(board)
+    game.game_over = False
+    game.winner = None
+    game.set_difficulty(search_depth=depth, time_limit=time_limit)
+    game.search_cancelled = False
+
+    done = threading.Event()
+    watcher = threading.Thread(target=_watch_cancel, args=(game, task_id, done), daemon=True)
+    watcher.start()
+    try:
+        move = game.find_best_move()
+    finally:
+        done.set()
+    stats = game.search_stats
+    return move, {'depth': stats.depth, 'score': stats.score, 'nodes': stats.counters['nodes'],
+                  'source': stats.source, 'cancelled': stats.cancelled}
+
+
+class ProtocolError(Exception):
+    """Comando inválido: vira uma resposta ERROR e a sessão continua"""
+
+
+class Busy(Exception):
+    """Fila de buscas cheia ou servidor encerrando"""
+
+
+class EngineServer:
+    """Pool limitado de processos de busca compartilhado pelas sessões
+
+    No máximo workers buscas rodam ao mesmo tempo; as demais esperam numa fila de até
+    max_queue pedidos, e além disso o pedido é recusado na hora. O tempo na fila conta
+    no prazo da jogada. Uma busca em andamento pode ser interrompida (cancel), e então
+    devolve a melhor jogada da última profundidade completa.
+    """
+
+    def __init__(self, workers=None, max_queue=64, settings=None):
+        self.settings = dict(DEFAULT_SETTINGS, **(settings or {}))
+        self.workers = workers or os.cpu_count() or 1
+        self.max_queue = max_queue
+        # 'spawn': um fork herdaria a trava da leitura da entrada padrão (feita numa thread) e
+        # o processo travaria ao terminar
+        context = multiprocessing.get_context('spawn')
+        self._cancelled = context.Array('q', CANCEL_SLOTS, lock=False)
+        self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=context,
+                                             initializer=_init_worker, initargs=(self._cancelled,))
+        self._slots = asyncio.Semaphore(self.workers)
+        self._task_ids = itertools.count(1)
+        self.sessions = set()
+        self.waiting = 0
+        self.running = 0
+        self.closing = False
+        self._servers = []
+        self._connections = set()  # Tarefas das conexões TCP abertas
+
+        # Estatísticas do servidor
+        self.searches = 0
+        self.rejected = 0
+        self.timeouts = 0
+
+    async def search(self, board, ai_player, deadline, depth=None, stop=None):
+        """Busca a jogada da IA; deadline é o instante (perf_counter) em que ela deve estar pronta
+
+        stop é um asyncio.Event: se for marcado na fila a busca roda com o tempo mínimo, e se
+        for marcado durante a busca ela é interrompida. Retorna (jogada, estatísticas).
+        """
+        if self.closing:
+            raise Busy("servidor encerrando")
+        if self.waiting >= self.max_queue:
+            self.rejected += 1
+            raise Busy("fila de buscas cheia")
+
+        self.waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+        self.running += 1
+        try:
+            return await self._run(board, ai_player, deadline, depth, stop)
+        finally:
+            self.running -= 1
+            self._slots.release()
+
+    async def _run(self, board, ai_player, deadline, depth, stop):
+        loop = asyncio.get_running_loop()
+        task_id = next(self._task_ids)
+        stopped = stop is not None and stop.is_set()
+        time_limit = MIN_SEARCH_TIME if stopped else max(MIN_SEARCH_TIME, deadline - time.perf_counter())
+        board_bytes = np.asarray(board, dtype=np.int8).tobytes()
+        future = loop.run_in_executor(self._executor, search_move, task_id, board_bytes, len(board), ai_player,
+                                      depth or self.settings['depth'], time_limit, self.settings)
+        self.searches += 1
+
+        waiters = [future]
+        stop_wait = asyncio.ensure_future(stop.wait()) if stop is not None else None
+        if stop_wait is not None:
+            waiters.append(stop_wait)
+        try:
+            # O prazo do servidor cobre a busca e a comunicação; depois dele a busca é interrompida
+            limit = max(time_limit, deadline - time.perf_counter()) + SAFETY_MARGIN
+            done, _ = await asyncio.wait(waiters, timeout=limit, return_when=asyncio.FIRST_COMPLETED)
+            if future not in done:
+                if stop_wait not in done:
+                    self.timeouts += 1
+                self.cancel(task_id)
+                await asyncio.wait([future], timeout=CANCEL_GRACE)
+            if not future.done():
+                # O processo não respondeu nem depois do cancelamento: a sessão joga sem ele
+                future.cancel()
+                return None, {'cancelled': True}
+            return future.result()
+        except asyncio.CancelledError:
+            self.cancel(task_id)
+            raise
+        finally:
+            if stop_wait is not None:
+                stop_wait.cancel()
+
+    async def warm_up(self, board_size=15):
+        """Inicia os processos do pool e prepara os jogos de busca, para que a primeira jogada
+        de cada processo não pague a inicialização dentro do prazo"""
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self._executor, warm_up, board_size, self.settings)
+                               for _ in range(self.workers)))
+
+    def cancel(self, task_id):
+        """Marca a tarefa como cancelada; o processo que a executa interrompe a busca"""
+        self._cancelled[task_id % CANCEL_SLOTS] = task_id
+
+    async def serve_tcp(self, host, port):
+        server = await asyncio.start_server(self._accept, host, port)
+        self._servers.append(server)
+        return server
+
+    async def _accept(self, reader, writer):
+        task = asyncio.current_task()
+        self._connections.add(task)
+        try:
+            await Session(self, reader, writer).run()
+        finally:
+            self._connections.discard(task)
+
+    async def serve_stdio(self):
+        """Uma única sessão pela entrada e saída padrão; termina com END ou no fim da entrada"""
+        stream = StdioStream()
+        await Session(self, stream, stream).run()
+
+    async def shutdown(self, grace=5.0):
+        """Para de aceitar conexões e jogadas novas, espera as buscas em andamento por até
+        grace segundos, interrompe as que restarem e fecha as sessões e o pool"""
+        self.closing = True
+        for server in self._servers:
+            server.close()
+        thinking = [session.thinking for session in self.sessions
+                    if session.thinking is not None and not session.thinking.done()]
+        if thinking:
+            await asyncio.wait(thinking, timeout=grace)
+        for session in list(self.sessions):
+            session.stop.set()
+        if thinking:
+            await asyncio.wait(thinking, timeout=CANCEL_GRACE + SAFETY_MARGIN)
+        for session in list(self.sessions):
+            await session.close()
+        if self._connections:
+            await asyncio.wait(list(self._connections), timeout=CANCEL_GRACE)
+        for server in self._servers:
+            await server.wait_closed()
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def stats(self):
+        return {'sessions': len(self.sessions), 'running': self.running, 'waiting': self.waiting,
+                'searches': self.searches, 'rejected': self.rejected, 'timeouts': self.timeouts}
+
+
+class StdioStream:
+    """Entrada e saída padrão com a interface de StreamReader/StreamWriter usada por Session
+
+    A leitura roda numa thread própria (daemon, para não segurar o encerramento), o que
+    funciona com terminais, pipes e arquivos redirecionados (connect_read_pipe só aceita pipes).
+    """
+
+    def __init__(self):
+        self._closed = False
+        self._lines = asyncio.Queue()
+        loop = asyncio.get_running_loop()
+        threading.Thread(target=self._read, args=(loop,), name="gomoku-stdin", daemon=True).start()
+
+    def _read(self, loop):
+        # os.read direto no descritor: sys.stdin guardaria uma trava que impede o encerramento
+        pending = b''
+        while True:
+            chunk = os.read(sys.stdin.fileno(), 65536)
+            if not chunk:
+                for line in ([pending] if pending else []) + [b'']:
+                    loop.call_soon_threadsafe(self._lines.put_nowait, line)
+                return
+            *lines, pending = (pending + chunk).split(b'\n')
+            for line in lines:
+                loop.call_soon_threadsafe(self._lines.put_nowait, line + b'\n')
+
+    async def readline(self):
+        return await self._lines.get()
+
+    def write(self, data):
+        sys.stdout.buffer.write(data)
+        sys.stdout.buffer.flush()
+
+    async def drain(self):
+        pass
+
+    def is_closing(self):
+        return self._closed
+
+    def close(self):
+        self._closed = True
+
+
+class Session:
+    """Uma partida do protocolo: tabuleiro próprio, controle de tempo e a busca em andamento
+
+    Os comandos são tratados na ordem em que chegam; enquanto a IA pensa, só STOP, END e
+    ABOUT são atendidos na hora, e os demais esperam a jogada ser enviada.
+    """
+
+    def __init__(self, server, reader, writer):
+        self.server = server
+        self.reader = reader
+        self.writer = writer
+        self.game = None
+        self.board_size = None
+        self.board_lines = None  # Linhas recebidas entre BOARD e DONE
+        self.thinking = None
+        self.stop = asyncio.Event()
+
+        # Controle de tempo (INFO), em segundos; None = sem limite
+        self.turn_time = server.settings['time']
+        self.match_time = None
+        self.time_left = None
+
+    def send(self, line):
+        if not self.writer.is_closing():
+            self.writer.write((line + '\n').encode())
+
+    async def run(self):
+        self.server.sessions.add(self)
+        try:
+            while True:
+                line = await self.reader.readline()
+                if not line:
+                    # Fim da entrada: a jogada pedida ainda é enviada (END é que interrompe)
+                    if self.thinking is not None:
+                        await self.thinking
+                    break
+                command = line.decode(errors='replace').strip()
+                if not command:
+                    continue
+                name = command.split(maxsplit=1)[0].upper()
+                if self.thinking is not None and not self.thinking.done():
+                    if name in ('STOP', 'YXSTOP'):
+                        self.stop.set()
+                        continue
+                    if name == 'END':
+                        break
+                    if name != 'ABOUT':
+                        await self.thinking
+                if self.handle(command) is False:
+                    break
+                await self.writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            await self.close()
+
+    async def close(self):
+        if self.thinking is not None and not self.thinking.done():
+            self.thinking.cancel()
+            await asyncio.gather(self.thinking, return_exceptions=True)
+        self.server.sessions.discard(self)
+        if not self.writer.is_closing():
+            try:
+                await self.writer.drain()
+            except ConnectionError:
+                pass
+            self.writer.close()
+
+    def handle(self, command):
+        """Trata um comando; retorna False para encerrar a sessão"""
+        if self.board_lines is not None:
+            if command.upper() == 'DONE':
+                lines, self.board_lines = self.board_lines, None
+                self._guard(self._load_board, lines)
+            else:
+                self.board_lines.append(command)
+            return True
+
+        name, _, argument = command.partition(' ')
+        name = name.upper()
+        if name == 'END':
+            return False
+        if name == 'ABOUT':
+            self.send(ABOUT)
+        elif name == 'START':
+            self._guard(self._start, argument, argument)
+        elif name == 'RECTSTART':
+            self._guard(self._start_rect, argument)
+        elif name == 'RESTART':
+            self._guard(self._restart)
+        elif name == 'BEGIN':
+            self._guard(self._begin)
+        elif name == 'TURN':
+            self._guard(self._turn, argument)
+        elif name == 'BOARD':
+            self._guard(self._require_game)
+            if self.game is not None:
+                self.board_lines = []
+        elif name == 'TAKEBACK':
+            self._guard(self._takeback, argument)
+        elif name == 'INFO':
+            self._info(argument)
+        elif name in ('STOP', 'YXSTOP'):
+            pass  # Nada em andamento
+        else:
+            self.send(f"UNKNOWN {command}")
+        return True
+
+    def _guard(self, handler, *args):
+        try:
+            handler(*args)
+        except ProtocolError as exc:
+            self.send(f"ERROR {exc}")
+
+    def _start(self, width, height):
+        try:
+            width, height = int(width), int(height)
+        except ValueError:
+            raise ProtocolError("tamanho inválido")
+        if width != height:
+            raise ProtocolError("só tabuleiros quadrados")
+        if not MIN_BOARD_SIZE <= width <= MAX_BOARD_SIZE:
+            raise ProtocolError(f"tamanho fora de {MIN_BOARD_SIZE}..{MAX_BOARD_SIZE}")
+        self.board_size = width
+        self._new_game(np.zeros((width, width), dtype=int), ai_player=2)
+        self.send("OK")
+
+    def _start_rect(self, argument):
+        width, _, height = argument.partition(',')
+        self._start(width, height)
+
+    def _restart(self):
+        self._require_game()
+        self._new_game(np.zeros((self.board_size, self.board_size), dtype=int), ai_player=2)
+        self.send("OK")
+
+    def _new_game(self, board, ai_player):
+        """Estado da partida da sessão (só o tabuleiro e as regras; a busca roda no pool)"""
+        if self.game is None or self.game.board_size != len(board):
+            self.game = CompactGame(len(board), ai_player)
+        self.game.ai_player = ai_player
+        self.game.load_board(board)
+
+    def _require_game(self):
+        if self.game is None:
+            raise ProtocolError("use START antes")
+
+    def _parse_cell(self, argument):
+        try:
+            x, y = (int(value) for value in argument.split(',')[:2])
+        except ValueError:
+            raise ProtocolError(f"coordenadas inválidas: {argument}")
+        if not (0 <= x < self.board_size and 0 <= y < self.board_size):
+            raise ProtocolError(f"fora do tabuleiro: {argument}")
+        return y, x
+
+    def _begin(self):
+        self._require_game()
+        if self.game.stone_count:
+            raise ProtocolError("BEGIN só com o tabuleiro vazio")
+        self._think()
+
+    def _turn(self, argument):
+        self._require_game()
+        row, col = self._parse_cell(argument)
+        if self.game.get(row, col):
+            raise ProtocolError(f"casa ocupada: {argument}")
+        self.game.make_move(row, col, self.game.human_player)
+        self._think()
+
+    def _load_board(self, lines):
+        """Posição do BOARD: 1 é peça própria e 2 do adversário (3, do modo contínuo, não é suportado)"""
+        fields = np.zeros((self.board_size, self.board_size), dtype=int)
+        for line in lines:
+            parts = line.split(',')
+            if len(parts) != 3 or parts[2].strip() not in ('1', '2'):
+                raise ProtocolError(f"linha de BOARD inválida: {line}")
+            row, col = self._parse_cell(','.join(parts[:2]))
+            fields[row, col] = int(parts[2])
+        own, other = int(np.count_nonzero(fields == 1)), int(np.count_nonzero(fields == 2))
+        # Quem tem menos peças (ou o mesmo número) começou a partida
+        ai_player = 1 if own == other else 2
+        if own + 1 == other or own == other:
+            board = np.where(fields == 1, ai_player, np.where(fields == 2, 3 - ai_player, 0))
+        else:
+            raise ProtocolError(f"contagem de peças impossível: {own} x {other}")
+        self._new_game(board, ai_player)
+        self._think()
+
+    def _takeback(self, argument):
+        self._require_game()
+        row, col = self._parse_cell(argument)
+        if not self.game.get(row, col):
+            raise ProtocolError(f"casa vazia: {argument}")
+        self.game.remove_stone(row, col)
+        self.send("OK")
+
+    def _info(self, argument):
+        key, _, value = argument.partition(' ')
+        key = key.lower()
+        try:
+            number = int(value)
+        except ValueError:
+            return  # Outras chaves (folder, evaluate...) não são usadas
+        if key == 'timeout_turn':
+            self.turn_time = number / 1000  # 0 = jogar o mais rápido possível
+        elif key == 'timeout_match':
+            self.match_time = number / 1000 if number > 0 else None
+        elif key == 'time_left':
+            self.time_left = number / 1000
+
+    def time_budget(self):
+        """Tempo para a próxima jogada: o do turno, limitado pelo que resta da partida"""
+        budget = self.turn_time
+        if self.time_left is not None and self.match_time is not None:
+            budget = min(budget, self.time_left / MOVES_TO_GO)
+        return max(MIN_SEARCH_TIME, budget - SAFETY_MARGIN)
+
+    def _think(self):
+        """Inicia a busca da jogada da IA; a resposta é enviada quando ela termina"""
+        if self.game.winner is not None or not self.game.get_valid_moves():
+            raise ProtocolError("partida encerrada")
+        # Com o lado da IA trocado (por exemplo, TURN num tabuleiro vazio), o jogo é recriado
+        stones = self.game.stone_count
+        ai_player = 1 if stones % 2 == 0 else 2
+        if ai_player != self.game.ai_player:
+            board = self.game.board_array()
+            board = np.where(board == 0, 0, 3 - board)
+            self._new_game(board, ai_player)
+        self.stop.clear()
+        deadline = time.perf_counter() + self.time_budget()
+        self.thinking = asyncio.ensure_future(self._search(deadline))
+
+    async def _search(self, deadline):
+        board = self.game.board_array()
+        try:
+            move, stats = await self.server.search(board, self.game.ai_player, deadline, stop=self.stop)
+        except Busy as exc:
+            self.send(f"ERROR {exc}")
+            return
+        if move is None:
+            move = self.game.get_valid_moves()[0]
+        row, col = move
+        self.game.make_move(row, col, self.game.ai_player)
+        if 'source' in stats:
+            self.send(f"DEBUG {stats['source']} profundidade {stats['depth']} pontuação {stats['score']} "
+                      f"nós {stats['nodes']}")
+        self.send(f"{col},{row}")
+        await self.writer.drain()
+
+
+async def _serve(args):
+    settings = {'depth': args.depth, 'time': args.time, 'tt_memory_mb': args.tt_memory_mb, 'use_vct': args.vct}
+    server = EngineServer(args.workers, args.max_queue, settings)
+    loop = asyncio.get_running_loop()
+    stopped = asyncio.Event()
+    await server.warm_up()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stopped.set)
+
+    if args.port is None:
+        session = asyncio.ensure_future(server.serve_stdio())
+        await asyncio.wait([session, asyncio.ensure_future(stopped.wait())], return_when=asyncio.FIRST_COMPLETED)
+    else:
+        tcp = await server.serve_tcp(args.host, args.port)
+        host, port = tcp.sockets[0].getsockname()[:2]
+        print(f"escutando em {host}:{port} com {server.workers} processos de busca", file=sys.stderr, flush=True)
+        await stopped.wait()
+        print(f"encerrando: {server.stats()}", file=sys.stderr, flush=True)
+    await server.shutdown(args.grace)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Motor de Gomoku no protocolo do Gomocup (stdin/stdout ou TCP)")
+    parser.add_argument('--port', type=int, default=None, help="serve por TCP nesta porta (0 = qualquer livre)")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--workers', type=int, default=None, help="processos de busca")
+    parser.add_argument('--max-queue', type=int, default=64, help="buscas esperando na fila antes de recusar")
+    parser.add_argument('--depth', type=int, default=DEFAULT_SETTINGS['depth'])
+    parser.add_argument('--time', type=float, default=DEFAULT_SETTINGS['time'],
+                        help="segundos por jogada, se o gerenciador não mandar INFO timeout_turn")
+    parser.add_argument('--tt-memory-mb', type=int, default=DEFAULT_SETTINGS['tt_memory_mb'])
+    parser.add_argument('--vct', action='store_true')
+    parser.add_argument('--grace', type=float, default=5.0, help="segundos para as buscas terminarem ao encerrar")
+    args = parser.parse_args()
+    asyncio.run(_serve(args))
+
+
+if __name__ == "__main__":
+    main()
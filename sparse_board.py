@@ -0,0 +1,93 @@
+import numpy as np
+
+# Lado do tabuleiro virtual usado no modo ilimitado: as coordenadas continuam sendo (linha, coluna)
+# e índices planos, mas nenhuma estrutura é alocada por célula, então o tamanho não custa nada
+UNBOUNDED_SIZE = 1 << 20
+
+DIRECTIONS = ((0, 1), (1, 0), (1, 1), (1, -1))
+
+
+class SparseBoard:
+    """Tabuleiro que guarda só as células ocupadas, num dicionário (linha, coluna) -> jogador
+
+    Suporta a mesma indexação board[i, j] do ndarray. Com bounded=False não há bordas: a
+    detecção de vitória anda pelas linhas sem checar limites, e o custo de todas as
+    operações depende só do número de peças.
+    """
+
+    def __init__(self, board_size, bounded=True):
+        self.board_size = board_size
+        self.bounded = bounded
+        self.shape = (board_size, board_size)
+        self.stones = {}
+
+    def __getitem__(self, key):
+        row, col = key
+        if isinstance(row, slice) or isinstance(col, slice):
+            return self.to_array()[key]
+        return self.stones.get((int(row), int(col)), 0)
+
+    def __setitem__(self, key, value):
+        row, col = int(key[0]), int(key[1])
+        if value:
+            self.stones[(row, col)] = int(value)
+        else:
+            self.stones.pop((row, col), None)
+
+    def __len__(self):
+        return len(self.stones)
+
+    def __array__(self, dtype=None, copy=None):
+        array = self.to_array()
+        return array.astype(dtype) if dtype is not None else array
+
+    def to_array(self):
+        """Converte para o ndarray equivalente (só faz sentido em tabuleiros limitados)"""
+        if not self.bounded:
+            raise ValueError("Um tabuleiro ilimitado não pode ser convertido em array; use bounding_box()")
+        array = np.zeros(self.shape, dtype=int)
+        for (row, col), player in self.stones.items():
+            array[row, col] = player
+        return array
+
+    def copy(self):
+        other = SparseBoard(self.board_size, self.bounded)
+        other.stones = dict(self.stones)
+        return other
+
+    def bounding_box(self, margin=0):
+        """Menor retângulo (linha mínima, coluna mínima, linha máxima, coluna máxima) com as peças"""
+        if not self.stones:
+            center = self.board_size // 2
+            return center, center, center, center
+        rows = [row for row, _ in self.stones]
+        cols = [col for _, col in self.stones]
+        return min(rows) - margin, min(cols) - margin, max(rows) + margin, max(cols) + margin
+
+    def _run_length(self, row, col, dr, dc, player):
+        stones = self.stones
+        count = 0
+        r, c = row + dr, col + dc
+        while stones.get((r, c)) == player:
+            count += 1
+            r += dr
+            c += dc
+        return count
+
+    def check_win(self, row, col):
+        """Verifica se a peça em (row, col) faz parte de uma sequência de 5 ou mais"""
+        player = self.stones.get((row, col))
+        if not player:
+            return False
+        for dr, dc in DIRECTIONS:
+            if 1 + self._run_length(row, col, dr, dc, player) + self._run_length(row, col, -dr, -dc, player) >= 5:
+                return True
+        return False
+
+    def count_consecutive(self, row, col):
+        """Maior sequência de peças iguais que passa por (row, col)"""
+        player = self.stones.get((row, col))
+        if not player:
+            return 1
+        return max(1 + self._run_length(row, col, dr, dc, player) + self._run_length(row, col, -dr, -dc, player)
+                   for dr, dc in DIRECTIONS)
@@ -0,0 +1,141 @@
+from functools import lru_cache
+
+from transposition import ZobristHasher, ZOBRIST_SEED
+
+# As 8 simetrias do tabuleiro quadrado: 4 rotações, com e sem reflexão
+NUM_SYMMETRIES = 8
+
+# Os 8 hashes simétricos são mantidos juntos num único inteiro, 64 bits para cada simetria
+HASH_BITS = 64
+HASH_MASK = (1 << HASH_BITS) - 1
+
+# Acima deste lado os mapas de células não são pré-calculados (tabuleiros esparsos grandes ou ilimitados)
+MAX_MAPPED_SIZE = 256
+
+
+def transform_cell(row, col, symmetry, board_size):
+    """Aplica uma simetria à célula: reflexão horizontal (symmetry >= 4) e depois symmetry % 4 rotações"""
+    last = board_size - 1
+    if symmetry >= 4:
+        col = last - col
+    for _ in range(symmetry % 4):
+        row, col = col, last - row
+    return row, col
+
+
+def inverse_symmetry(symmetry):
+    """Simetria que desfaz a dada: as reflexões são a própria inversa, as rotações voltam"""
+    return symmetry if symmetry >= 4 else (4 - symmetry) % 4
+
+
+@lru_cache(maxsize=None)
+def cell_maps(board_size):
+    """Para cada simetria, tupla que leva o índice plano de uma célula ao índice transformado"""
+    maps = []
+    for symmetry in range(NUM_SYMMETRIES):
+        mapping = []
+        for cell in range(board_size * board_size):
+            row, col = transform_cell(*divmod(cell, board_size), symmetry, board_size)
+            mapping.append(row * board_size + col)
+        maps.append(tuple(mapping))
+    return tuple(maps)
+
+
+@lru_cache(maxsize=None)
+def inverse_maps(board_size):
+    """Mapas inversos de cell_maps: levam a célula transformada de volta à original"""
+    inverses = []
+    for mapping in cell_maps(board_size):
+        inverse = [0] * len(mapping)
+        for cell, image in enumerate(mapping):
+            inverse[image] = cell
+        inverses.append(tuple(inverse))
+    return tuple(inverses)
+
+
+def symmetric_hashes(stones, zobrist):
+    """Hash Zobrist da posição sob cada uma das 8 simetrias
+
+    stones é uma sequência de (índice plano, jogador).
+    """
+    maps = cell_maps(zobrist.board_size)
+    keys = zobrist.keys
+    hashes = [0] * NUM_SYMMETRIES
+    for cell, player in stones:
+        player_keys = keys[player]
+        for symmetry in range(NUM_SYMMETRIES):
+            hashes[symmetry] ^= player_keys[maps[symmetry][cell]]
+    return hashes
+
+
+class LazySymmetryKeys(dict):
+    """Chaves empacotadas de um jogador calculadas sob demanda, para tabuleiros esparsos"""
+
+    def __init__(self, board_size, player_keys):
+        super().__init__()
+        self.board_size = board_size
+        self.player_keys = player_keys
+
+    def __missing__(self, cell):
+        size = self.board_size
+        row, col = divmod(cell, size)
+        packed = 0
+        for symmetry in range(NUM_SYMMETRIES):
+            image_row, image_col = transform_cell(row, col, symmetry, size)
+            packed |= self.player_keys[image_row * size + image_col] << (HASH_BITS * symmetry)
+        self[cell] = packed
+        return packed
+
+
+@lru_cache(maxsize=None)
+def packed_symmetry_keys(board_size, seed=ZOBRIST_SEED, sparse=False):
+    """Chaves Zobrist das 8 imagens de cada peça, empacotadas num inteiro por (jogador, célula)
+
+    Com elas, um único XOR por peça colocada ou removida mantém os 8 hashes simétricos
+    atualizados (ver unpack_hashes); a simetria 0 é a identidade, igual ao hash comum.
+    Com sparse=True as chaves usam as do ZobristHasher esparso e são calculadas sob demanda.
+    """
+    if sparse:
+        zobrist = ZobristHasher(board_size, seed, sparse=True)
+        return [None] + [LazySymmetryKeys(board_size, zobrist.keys[player]) for player in (1, 2)]
+    zobrist = ZobristHasher(board_size, seed)
+    maps = cell_maps(board_size)
+    packed = [None]
+    for player in (1, 2):
+        keys = zobrist.keys[player]
+        packed.append([sum(keys[maps[symmetry][cell]] << (HASH_BITS * symmetry)
+                           for symmetry in range(NUM_SYMMETRIES))
+                       for cell in range(board_size * board_size)])
+    return packed
+
+
+def unpack_hashes(packed):
+    """Separa os 8 hashes de um valor mantido com packed_symmetry_keys"""
+    return [(packed >> (HASH_BITS * symmetry)) & HASH_MASK for symmetry in range(NUM_SYMMETRIES)]
+
+
+def canonical_from_hashes(hashes):
+    """Chave canônica (o menor hash) e a simetria que a produz"""
+    symmetry = min(range(NUM_SYMMETRIES), key=hashes.__getitem__)
+    return hashes[symmetry], symmetry
+
+
+def canonical_key(stones, zobrist):
+    """Chave canônica da posição e a simetria que leva a posição real à canônica"""
+    return canonical_from_hashes(symmetric_hashes(stones, zobrist))
+
+
+def to_canonical(move, symmetry, board_size):
+    """Leva uma jogada da orientação real para a canônica"""
+    if board_size > MAX_MAPPED_SIZE:
+        return transform_cell(move[0], move[1], symmetry, board_size)
+    cell = cell_maps(board_size)[symmetry][move[0] * board_size + move[1]]
+    return divmod(cell, board_size)
+
+
+def from_canonical(move, symmetry, board_size):
+    """Leva uma jogada da orientação canônica de volta para a real"""
+    if board_size > MAX_MAPPED_SIZE:
+        return transform_cell(move[0], move[1], inverse_symmetry(symmetry), board_size)
+    cell = inverse_maps(board_size)[symmetry][move[0] * board_size + move[1]]
+    return divmod(cell, board_size)
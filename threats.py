@@ -0,0 +1,305 @@
+import time
+from functools import lru_cache
+
+from evaluation import NUM_WINDOW_CODES, decode_window
+
+
+@lru_cache(maxsize=None)
+def threat_tables():
+    """Tabelas por jogador indexadas pelo código da janela
+
+    four_gap[player][code] é a posição da única célula vazia numa janela com 4 peças do
+    jogador (ou -1); three[player][code] indica uma janela com 3 peças do jogador, 2 vazias
+    e nenhuma do adversário.
+    """
+    four_gap = [None]
+    three = [None]
+    for player in (1, 2):
+        gaps = []
+        threes = []
+        for code in range(NUM_WINDOW_CODES):
+            segment = decode_window(code)
+            own = segment.count(player)
+            empty = segment.count(0)
+            gaps.append(segment.index(0) if own == 4 and empty == 1 else -1)
+            threes.append(own == 3 and empty == 2)
+        four_gap.append(tuple(gaps))
+        three.append(tuple(threes))
+    return tuple(four_gap), tuple(three)
+
+
+class ThreatSolver:
+    """Busca no espaço de ameaças: vitória por quatros contínuos (VCF) e por três/quatros (VCT)
+
+    Só gera jogadas forçantes do atacante e as respostas forçadas do defensor, usando as
+    estruturas incrementais do GomokuGame (códigos das janelas e área de busca). A busca é
+    limitada em nós e em tempo; se o limite estoura, o resultado é "não encontrado".
+    """
+
+    def __init__(self, game, max_nodes=20000, deadline=None):
+        self.game = game
+        self.max_nodes = max_nodes
+        self.deadline = deadline
+        self.nodes = 0
+        self.aborted = False
+        self._budget_start = 0  # Valor de nodes no início do orçamento atual
+        self._four_gap, self._three = threat_tables()
+        self._failed = set()
+
+    def new_budget(self, deadline=None):
+        """Recomeça os limites de nós e de tempo para uma nova etapa (nodes continua somando)"""
+        self._budget_start = self.nodes
+        self.deadline = deadline
+        self.aborted = False
+
+    def _out_of_budget(self):
+        """Verifica os limites de nós e de tempo"""
+        self.nodes += 1
+        if self.nodes - self._budget_start > self.max_nodes or self.game.search_cancelled or (
+                self.deadline is not None and self.nodes % 64 == 0 and time.perf_counter() > self.deadline):
+            self.aborted = True
+        return self.aborted
+
+    def five_cells(self, player, around=None):
+        """Células vazias onde o jogador completa 5; com around, só nas linhas que passam por ela"""
+        game = self.game
+        codes = game._window_codes
+        windows = game._windows
+        gaps = self._four_gap[player]
+
+        if around is None:
+            window_ids = range(len(windows))
+        else:
+            window_ids = [w for w, _ in game._cell_windows[around[0] * game.board_size + around[1]]]
+
+        cells = set()
+        for w in window_ids:
+            gap = gaps[codes[w]]
+            if gap >= 0:
+                cells.add(divmod(windows[w][gap], game.board_size))
+        return cells
+
+    def four_moves(self, player):
+        """Jogadas candidatas que criam ao menos uma ameaça de 5 (um quatro)"""
+        game = self.game
+        codes = game._window_codes
+        threes = self._three[player]
+        size = game.board_size
+        moves = [move for move in game.get_valid_moves()
+                 if any(threes[codes[w]] for w, _ in game._cell_windows[move[0] * size + move[1]])]
+        return game._order_moves(moves, player)
+
+    def makes_open_four(self, row, col, player):
+        """Indica se jogar em (row, col) deixa duas ou mais formas de completar 5"""
+        game = self.game
+        game._place_stone(row, col, player)
+        count = len(self.five_cells(player, around=(row, col)))
+        game._remove_stone(row, col)
+        return count >= 2
+
+    def open_four_moves(self, player):
+        """Jogadas que criam um quatro aberto (ou quatro duplo) para o jogador"""
+        return [move for move in self.four_moves(player) if self.makes_open_four(move[0], move[1], player)]
+
+    def three_moves(self, player):
+        """Jogadas que criam um três aberto: depois delas existe uma jogada de quatro aberto"""
+        game = self.game
+        size = game.board_size
+        codes = game._window_codes
+        windows = game._windows
+        threes = self._three[player]
+        moves = []
+
+        for move in game.get_valid_moves():
+            game._place_stone(move[0], move[1], player)
+            follow_ups = set()
+            for w, _ in game._cell_windows[move[0] * size + move[1]]:
+                if threes[codes[w]]:
+                    follow_ups.update(divmod(cell, size) for cell in windows[w]
+                                      if game.board[divmod(cell, size)] == 0)
+            is_three = any(self.makes_open_four(r, c, player) for r, c in follow_ups)
+            game._remove_stone(move[0], move[1])
+            if is_three:
+                moves.append(move)
+
+        return game._order_moves(moves, player)
+
+    def find_vcf(self, attacker, max_depth=12):
+        """Procura vitória por quatros contínuos; retorna a primeira jogada ou None"""
+        self._failed = set()
+        line = []
+        if self._vcf(attacker, max_depth, line):
+            return line[0]
+        return None
+
+    def find_vct(self, attacker, max_depth=6):
+        """Procura vitória por ameaças contínuas (quatros e três abertos); retorna a primeira jogada"""
+        self._failed = set()
+        line = []
+        if self._vct(attacker, max_depth, line):
+            return line[0]
+        return None
+
+    def _vcf(self, attacker, depth, line):
+        """Nó do atacante na busca VCF"""
+        game = self.game
+        defender = 3 - attacker
+
+        wins = self.five_cells(attacker)
+        if wins:
+            line.append(min(wins))
+            return True
+        if depth == 0 or self._out_of_budget():
+            return False
+
+        key = (game.hash, attacker, depth)
+        if key in self._failed:
+            return False
+
+        # Se o defensor ameaça completar 5, o quatro do atacante precisa também bloquear
+        defender_wins = self.five_cells(defender)
+        if len(defender_wins) > 1:
+            self._failed.add(key)
+            return False
+
+        for move in self.four_moves(attacker):
+            if defender_wins and move not in defender_wins:
+                continue
+
+            game._place_stone(move[0], move[1], attacker)
+            threats = self.five_cells(attacker, around=move)
+            if len(threats) >= 2:
+                game._remove_stone(move[0], move[1])
+                line.append(move)
+                return True
+
+            found = False
+            if threats:
+                reply = next(iter(threats))
+                game._place_stone(reply[0], reply[1], defender)
+                if not game.check_win(reply[0], reply[1]):
+                    found = self._vcf(attacker, depth - 1, line)
+                game._remove_stone(reply[0], reply[1])
+            game._remove_stone(move[0], move[1])
+
+            if found:
+                line.insert(0, move)
+                return True
+            if self.aborted:
+                return False
+
+        self._failed.add(key)
+        return False
+
+    def _vct(self, attacker, depth, line):
+        """Nó do atacante na busca VCT: quatros ou três abertos, com todas as defesas testadas"""
+        game = self.game
+        defender = 3 - attacker
+
+        wins = self.five_cells(attacker)
+        if wins:
+            line.append(min(wins))
+            return True
+        if depth == 0 or self._out_of_budget():
+            return False
+
+        key = (game.hash, attacker, depth, 'vct')
+        if key in self._failed:
+            return False
+
+        defender_wins = self.five_cells(defender)
+        if len(defender_wins) > 1:
+            self._failed.add(key)
+            return False
+
+        fours = self.four_moves(attacker)
+        # Com ameaça de 5 do defensor, só quatros que bloqueiam mantêm a iniciativa
+        threes = [] if defender_wins else [m for m in self.three_moves(attacker) if m not in fours]
+
+        for move in fours + threes:
+            if defender_wins and move not in defender_wins:
+                continue
+
+            game._place_stone(move[0], move[1], attacker)
+            if move in fours:
+                threats = self.five_cells(attacker, around=move)
+                # Quatro aberto ou duplo: o defensor não consegue bloquear tudo
+                won = len(threats) >= 2 or self._vct_defense(attacker, next(iter(threats)), depth)
+            else:
+                replies = self._three_defenses(attacker, move)
+                won = bool(replies) and all(self._vct_defense(attacker, reply, depth) for reply in replies)
+            game._remove_stone(move[0], move[1])
+
+            if won:
+                line.append(move)
+                return True
+            if self.aborted:
+                return False
+
+        self._failed.add(key)
+        return False
+
+    def _vct_defense(self, attacker, reply, depth):
+        """Joga a defesa e verifica se o atacante ainda vence"""
+        game = self.game
+        defender = 3 - attacker
+        game._place_stone(reply[0], reply[1], defender)
+        if game.check_win(reply[0], reply[1]):
+            won = False
+        else:
+            won = self._vct(attacker, depth - 1, [])
+        game._remove_stone(reply[0], reply[1])
+        return won
+
+    def _three_defenses(self, attacker, move):
+        """Respostas do defensor a um três aberto: bloqueios que eliminam o quatro aberto e contra-quatros"""
+        game = self.game
+        defender = 3 - attacker
+        size = game.board_size
+        windows = game._windows
+
+        area = set()
+        for w, _ in game._cell_windows[move[0] * size + move[1]]:
+            for cell in windows[w]:
+                pos = divmod(cell, size)
+                if game.board[pos] == 0:
+                    area.add(pos)
+        threats = [pos for pos in area if self.makes_open_four(pos[0], pos[1], attacker)]
+
+        defenses = []
+        for pos in sorted(area):
+            game._place_stone(pos[0], pos[1], defender)
+            still_open = any(game.board[t] == 0 and self.makes_open_four(t[0], t[1], attacker)
+                             for t in threats)
+            game._remove_stone(pos[0], pos[1])
+            if not still_open:
+                defenses.append(pos)
+
+        # Um quatro do defensor também responde, pois obriga o atacante a bloquear
+        for pos in self.four_moves(defender):
+            if pos not in defenses:
+                defenses.append(pos)
+        return defenses
+
+    def find_defense(self, defender, candidates, max_depth=12):
+        """Entre as candidatas, retorna a primeira jogada após a qual o adversário não tem mais VCF"""
+        game = self.game
+        attacker = 3 - defender
+        for move in candidates:
+            if game.board[move] != 0:
+                continue
+            game._place_stone(move[0], move[1], defender)
+            refuted = game.check_win(move[0], move[1]) or self.find_vcf(attacker, max_depth) is None
+            aborted = self.aborted
+            game._remove_stone(move[0], move[1])
+            if aborted:
+                return None
+            if refuted:
+                return move
+        return None
+
+    def vcf_line(self, attacker, max_depth=12):
+        """Sequência de jogadas do atacante (sem as respostas) de uma VCF encontrada"""
+        self._failed = set()
+        line = []
+        return line if self._vcf(attacker, max_depth, line) else []
@@ -0,0 +1,155 @@
+import random
+
+# Tipos de limite armazenados em cada entrada da tabela
+EXACT = 0
+LOWER_BOUND = 1
+UPPER_BOUND = 2
+
+# Semente fixa: o mesmo tabuleiro gera sempre o mesmo hash, em qualquer processo
+ZOBRIST_SEED = 20240615
+
+# Estimativa de bytes ocupados por entrada (tupla + inteiros + jogada + ponteiro do slot)
+ENTRY_BYTES = 208
+
+
+class LazyZobristKeys(dict):
+    """Chaves de Zobrist de um jogador geradas sob demanda, para tabuleiros esparsos
+
+    A chave de cada célula é derivada deterministicamente de (semente, jogador, célula) na
+    primeira consulta, então nada é alocado para as células que nunca são usadas.
+    """
+
+    def __init__(self, seed, player):
+        super().__init__()
+        self.base = (seed * 0x9E3779B97F4A7C15 + player) & 0xFFFFFFFFFFFFFFFF
+
+    def __missing__(self, cell):
+        # splitmix64 sobre a célula combinada com a base do jogador
+        z = (self.base + (cell + 1) * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF
+        z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & 0xFFFFFFFFFFFFFFFF
+        z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & 0xFFFFFFFFFFFFFFFF
+        key = z ^ (z >> 31)
+        self[cell] = key
+        return key
+
+
+class ZobristHasher:
+    """Gera as chaves aleatórias de Zobrist para cada célula e jogador
+
+    Com sparse=True as chaves são geradas sob demanda (LazyZobristKeys), o que permite
+    tabuleiros grandes ou ilimitados sem alocar nada por célula.
+    """
+
+    def __init__(self, board_size, seed=ZOBRIST_SEED, sparse=False):
+        rng = random.Random(seed)
+        num_cells = board_size * board_size
+        self.board_size = board_size
+        self.sparse = sparse
+        # Índice 0 fica vazio para que keys[player] funcione diretamente com 1 e 2
+        if sparse:
+            self.keys = [None, LazyZobristKeys(seed, 1), LazyZobristKeys(seed, 2)]
+        else:
+            self.keys = [
+                None,
+                [rng.getrandbits(64) for _ in range(num_cells)],
+                [rng.getrandbits(64) for _ in range(num_cells)]
+            ]
+        self.side_key = rng.getrandbits(64)
+
+    def key(self, player, row, col):
+        """Retorna a chave de uma peça do jogador na célula (row, col)"""
+        return self.keys[player][row * self.board_size + col]
+
+    def hash_board(self, board):
+        """Calcula o hash completo de um tabuleiro (usado ao reiniciar o estado)"""
+        value = 0
+        if self.sparse:
+            for (i, j), player in board.stones.items():
+                value ^= self.keys[player][i * self.board_size + j]
+            return value
+        for i in range(self.board_size):
+            for j in range(self.board_size):
+                player = int(board[i, j])
+                if player:
+                    value ^= self.keys[player][i * self.board_size + j]
+        return value
+
+
+class TranspositionTable:
+    """Tabela de transposição limitada em memória
+
+    Cada entrada guarda (chave, profundidade, pontuação, tipo de limite, melhor jogada, geração).
+    A política 'two_tier' mantém dois slots por posição: um preferindo profundidade e outro
+    sempre substituído. A política 'depth' usa apenas o slot por profundidade.
+    """
+
+    def __init__(self, max_memory_mb=32, policy='two_tier'):
+        if policy not in ('two_tier', 'depth'):
+            raise ValueError(f"Política de substituição desconhecida: {policy}")
+
+        self.policy = policy
+        self.max_memory_mb = max_memory_mb
+        slots_per_bucket = 2 if policy == 'two_tier' else 1
+        self.num_buckets = max(1, int(max_memory_mb * 1024 * 1024) // (ENTRY_BYTES * slots_per_bucket))
+        self.depth_slots = [None] * self.num_buckets
+        self.always_slots = [None] * self.num_buckets if policy == 'two_tier' else None
+        self.generation = 0
+
+        # Estatísticas de uso
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+
+    def probe(self, key):
+        """Procura a posição na tabela; retorna a entrada ou None"""
+        self.probes += 1
+        index = key % self.num_buckets
+
+        entry = self.depth_slots[index]
+        if entry is not None and entry[0] == key:
+            self.hits += 1
+            return entry
+
+        if self.always_slots is not None:
+            entry = self.always_slots[index]
+            if entry is not None and entry[0] == key:
+                self.hits += 1
+                return entry
+
+        return None
+
+    def store(self, key, depth, score, flag, best_move):
+        """Armazena um resultado de busca respeitando a política de substituição"""
+        self.stores += 1
+        index = key % self.num_buckets
+        entry = (key, depth, score, flag, best_move, self.generation)
+
+        current = self.depth_slots[index]
+        if (current is None or current[0] == key or current[1] <= depth
+                or current[5] != self.generation):
+            self.depth_slots[index] = entry
+        elif self.always_slots is not None:
+            self.always_slots[index] = entry
+
+    def new_search(self):
+        """Marca o início de uma nova busca; entradas antigas passam a ser substituíveis"""
+        self.generation += 1
+
+    def clear(self):
+        """Esvazia a tabela (usado ao reiniciar o jogo)"""
+        self.depth_slots = [None] * self.num_buckets
+        if self.always_slots is not None:
+            self.always_slots = [None] * self.num_buckets
+        self.generation = 0
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+
+    def usage(self):
+        """Retorna a fração de slots ocupados"""
+        used = sum(1 for entry in self.depth_slots if entry is not None)
+        total = self.num_buckets
+        if self.always_slots is not None:
+            used += sum(1 for entry in self.always_slots if entry is not None)
+            total *= 2
+        return used / total
@@ -0,0 +1,339 @@
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from evaluation import NUM_WINDOW_CODES, batch_window_codes
+
+# Ajuste dos pesos dos padrões (_create_pattern_weights) por regressão logística no estilo
+# Texel: a avaliação estática de cada posição, passada por uma sigmoide, deve prever o
+# resultado da partida para o lado a jogar. As posições saem de partidas em JSONL no formato
+# do selfplay.py ("moves" e "winner"), geradas com o subcomando generate ou vindas de fora.
+# Só o motor (gomoku.py) é importado, nunca o pygame.
+
+DEFAULT_WEIGHTS_PATH = "assets/weights.json"
+
+# Partidas por tarefa do pool na extração das posições
+GAMES_PER_TASK = 64
+
+# Uma em cada VALIDATION_EVERY partidas fica fora do ajuste, para medir o erro em dados não vistos
+VALIDATION_EVERY = 10
+
+_engines = {}
+
+
+def pattern_features(game):
+    """Matriz (243, P) com quanto cada padrão contribui para a pontuação de cada janela
+
+    A tabela de janelas é linear nos pesos, então a coluna de um padrão é a tabela montada
+    com peso 1 nele e 0 nos demais. Retorna a matriz e os nomes relativos dos padrões, em
+    ordem alfabética (a mesma para os dois lados).
+    """
+    saved = dict(game.patterns)
+    names = sorted(game.relative_weights())
+    columns = []
+    try:
+        for name in names:
+            game.patterns = dict.fromkeys(saved, 0)
+            game.apply_weights({name: 1})
+            columns.append(game._window_table_array.copy())
+    finally:
+        game.patterns = saved
+    return np.stack(columns, axis=1), names
+
+
+def _engine(board_size, side):
+    """Jogo com a IA no lado a jogar e a sua matriz de padrões, reaproveitados no processo"""
+    from gomoku import GomokuGame
+
+    if (board_size, side) not in _engines:
+        game = GomokuGame(board_size, tt_memory_mb=1, ai_player=side, search_cache_entries=0)
+        _engines[(board_size, side)] = (game, *pattern_features(game))
+    return _engines[(board_size, side)]
+
+
+def game_positions(record, board_size, skip_plies=6):
+    """Posições de uma partida: tabuleiros (M, size, size), lado a jogar e resultado para ele
+
+    Entram as posições depois de cada jogada a partir de skip_plies, menos a final quando
+    ela tem vencedor (a sequência de 5 já decide o resultado). O resultado é 1 se o lado a
+    jogar venceu a partida, 0 se perdeu e 0.5 no empate.
+    """
+    moves = record['moves']
+    winner = record['winner']
+    last = len(moves) - 1 if winner is not None else len(moves)
+    boards = np.zeros((len(moves), board_size * board_size), dtype=np.int8)
+    for ply, (row, col) in enumerate(moves):
+        boards[ply:, row * board_size + col] = 1 if ply % 2 == 0 else 2
+
+    plies = np.arange(skip_plies, last)  # Tabuleiro plies[k] tem plies[k] + 1 peças
+    sides = np.where(plies % 2 == 0, 2, 1).astype(np.int8)
+    if winner is None:
+        results = np.full(len(plies), 0.5)
+    else:
+        results = (sides == winner).astype(np.float64)
+    return boards[plies].reshape(-1, board_size, board_size), sides, results
+
+
+def extract_features(boards, sides, board_size):
+    """Contagem de cada padrão (N, P) e bônus fixo do centro (N,), do ponto de vista do lado a jogar
+
+    Os códigos de todas as janelas saem de uma vez com batch_window_codes; o histograma de
+    códigos por tabuleiro, multiplicado pela matriz de padrões, dá as contagens.
+    """
+    count = len(boards)
+    codes = batch_window_codes(boards).astype(np.int64)
+    codes += (np.arange(count) * NUM_WINDOW_CODES)[:, np.newaxis]
+    histogram = np.bincount(codes.ravel(), minlength=count * NUM_WINDOW_CODES).reshape(count, -1)
+
+    features = None
+    bonus = np.zeros(count, dtype=np.int64)
+    for side in (1, 2):
+        game, matrix, _ = _engine(board_size, side)
+        if features is None:
+            features = np.zeros((count, matrix.shape[1]), dtype=np.int32)
+        mask = sides == side
+        if not mask.any():
+            continue
+        features[mask] = histogram[mask] @ matrix
+        # Só o bônus do centro fica fora da tabela de janelas
+        bonus[mask] = game.evaluate_boards(boards[mask]) - histogram[mask] @ game._window_table_array
+    return features, bonus
+
+
+def _extract_task(lines, first_game, board_size, skip_plies):
+    """Extrai as posições de um bloco de partidas; as de índice múltiplo de VALIDATION_EVERY vão para a validação"""
+    boards, sides, results, validation = [], [], [], []
+    for number, line in enumerate(lines, first_game):
+        record = json.loads(line)
+        if record.get('board_size', board_size) != board_size:
+            continue
+        game_boards, game_sides, game_results = game_positions(record, board_size, skip_plies)
+        boards.append(game_boards)
+        sides.append(game_sides)
+        results.append(game_results)
+        validation.append(np.full(len(game_sides), number % VALIDATION_EVERY == 0))
+    if not boards:
+        return None
+    boards = np.concatenate(boards)
+    sides = np.concatenate(sides)
+    features, bonus = extract_features(boards, sides, board_size)
+    return features, bonus, np.concatenate(results), np.concatenate(validation)
+
+
+def _read_tasks(paths):
+    """Blocos de GAMES_PER_TASK linhas de partidas, com o índice da primeira partida"""
+    chunk, first = [], 0
+    for path in paths:
+        with open(path) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                chunk.append(line)
+                if len(chunk) == GAMES_PER_TASK:
+                    yield chunk, first
+                    first += len(chunk)
+                    chunk = []
+    if chunk:
+        yield chunk, first
+
+
+def load_positions(paths, board_size=15, skip_plies=6, workers=None):
+    """Lê as partidas e extrai as posições num pool de processos
+
+    Retorna um dicionário com 'features' (N, P), 'bonus', 'results', 'validation' (máscara
+    das posições reservadas) e 'names' (nomes relativos das P colunas).
+    """
+    parts = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_extract_task, lines, first, board_size, skip_plies)
+                   for lines, first in _read_tasks(paths)]
+        for future in as_completed(futures):
+            part = future.result()
+            if part is not None:
+                parts.append(part)
+    if not parts:
+        raise ValueError("Nenhuma posição encontrada nas partidas")
+
+    features, bonus, results, validation = (np.concatenate(column) for column in zip(*parts))
+    return {'features': features, 'bonus': bonus, 'results': results, 'validation': validation,
+            'names': _engine(board_size, 1)[2]}
+
+
+def _sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-np.clip(x, -500, 500)))
+
+
+def texel_loss(scores, results, scale):
+    """Erro quadrático médio entre o resultado e a sigmoide da avaliação"""
+    return float(np.mean((results - _sigmoid(scale * scores)) ** 2))
+
+
+def fit_scale(scores, results):
+    """Constante K da sigmoide que melhor liga as avaliações aos resultados (busca em escala log)"""
+    exponents = np.linspace(-8, -1, 71)
+    losses = [texel_loss(scores, results, 10 ** e) for e in exponents]
+    best = int(np.argmin(losses))
+    low, high = exponents[max(best - 1, 0)], exponents[min(best + 1, len(exponents) - 1)]
+    # Refinamento por busca ternária entre os vizinhos do melhor ponto da grade
+    for _ in range(40):
+        a, b = low + (high - low) / 3, high - (high - low) / 3
+        if texel_loss(scores, results, 10 ** a) < texel_loss(scores, results, 10 ** b):
+            high = b
+        else:
+            low = a
+    return 10 ** ((low + high) / 2)
+
+
+def tune_weights(data, weights, iterations=500, learning_rate=0.05):
+    """Ajusta os pesos (relativos) minimizando o erro de Texel nas posições de treino
+
+    Os pesos são multiplicados por exp(theta), o que mantém o sinal de cada padrão, e theta
+    é otimizado por Adam com o gradiente exato (a avaliação é linear nos pesos). Os padrões
+    de 5 (vitória) ficam fixos e os demais ficam abaixo da metade deles, para que os limiares
+    de vitória da busca continuem valendo. Retorna os pesos de menor erro na validação e um
+    relatório.
+    """
+    names = data['names']
+    features = data['features'].astype(np.float64)
+    bonus = data['bonus'].astype(np.float64)
+    results = data['results']
+    validation = data['validation']
+    train = ~validation
+    if not validation.any():
+        validation = train
+
+    initial = np.array([weights[name] for name in names], dtype=np.float64)
+    tunable = np.array([not name.endswith(':5') and initial[i] != 0 and features[train, i].any()
+                        for i, name in enumerate(names)])
+    limit = max(abs(weights[name]) for name in names if name.endswith(':5')) / 2
+    max_theta = np.log(limit / np.maximum(np.abs(initial), 1))
+
+    def current(theta):
+        return np.where(tunable, initial * np.exp(theta), initial)
+
+    scale = fit_scale(features[train] @ initial + bonus[train], results[train])
+
+    def losses(values):
+        scores = features @ values + bonus
+        return (texel_loss(scores[train], results[train], scale),
+                texel_loss(scores[validation], results[validation], scale))
+
+    start_train, start_validation = losses(initial)
+    theta = np.zeros(len(names))
+    moment, velocity = np.zeros(len(names)), np.zeros(len(names))
+    best_theta, best_validation = theta.copy(), start_validation
+    train_features, train_bonus, train_results = features[train], bonus[train], results[train]
+
+    for step in range(1, iterations + 1):
+        values = current(theta)
+        p = _sigmoid(scale * (train_features @ values + train_bonus))
+        slope = 2 * (p - train_results) * p * (1 - p) * scale / len(train_results)
+        gradient = (train_features.T @ slope) * values * tunable
+
+        moment = 0.9 * moment + 0.1 * gradient
+        velocity = 0.999 * velocity + 0.001 * gradient ** 2
+        theta -= learning_rate * (moment / (1 - 0.9 ** step)) / (np.sqrt(velocity / (1 - 0.999 ** step)) + 1e-12)
+        theta = np.minimum(theta, max_theta)
+
+        if step % 10 == 0 or step == iterations:
+            validation_loss = losses(current(theta))[1]
+            if validation_loss < best_validation:
+                best_theta, best_validation = theta.copy(), validation_loss
+
+    tuned = current(best_theta)
+    final_train, final_validation = losses(tuned)
+    report = {'positions': len(results), 'train': int(train.sum()), 'validation': int(data['validation'].sum()),
+              'scale': scale, 'train_loss': (start_train, final_train),
+              'validation_loss': (start_validation, final_validation),
+              'fixed': [name for name, flag in zip(names, tunable) if not flag]}
+    return {name: int(round(value)) for name, value in zip(names, tuned)}, report
+
+
+def _generate_job(job):
+    from selfplay import play_game
+
+    game_id, config, board_size, opening = job
+    record = play_game(game_id, config, config, board_size, opening)
+    return {key: record[key] for key in ('game', 'board_size', 'moves', 'winner')}
+
+
+def generate_games(output, games, config, workers=None, board_size=15, opening_plies=6, seed=0, progress=None):
+    """Joga partidas da IA contra ela mesma num pool de processos e grava as jogadas em JSONL
+
+    As aberturas aleatórias (opening_plies jogadas perto do centro) variam as partidas,
+    já que a busca é determinística.
+    """
+    from selfplay import random_opening
+
+    with open(output, 'w') as out, ProcessPoolExecutor(max_workers=workers) as pool:
+        jobs = [(game_id, config, board_size, random_opening(board_size, opening_plies, seed + game_id))
+                for game_id in range(games)]
+        for done, record in enumerate(pool.map(_generate_job, jobs, chunksize=8), 1):
+            out.write(json.dumps(record) + '\n')
+            if progress is not None:
+                progress(done)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ajuste dos pesos de avaliação do Gomoku (Texel)")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    play = sub.add_parser('generate', help="gera partidas da IA contra ela mesma para o ajuste")
+    play.add_argument('--output', default='tuning_games.jsonl')
+    play.add_argument('--games', type=int, default=1000)
+    play.add_argument('--depth', type=int, default=2)
+    play.add_argument('--time', type=float, default=0.2, help="segundos por jogada")
+    play.add_argument('--opening-plies', type=int, default=6)
+    play.add_argument('--board-size', type=int, default=15)
+    play.add_argument('--workers', type=int, default=None)
+    play.add_argument('--seed', type=int, default=0)
+
+    fit = sub.add_parser('tune', help="ajusta os pesos a partir de partidas em JSONL")
+    fit.add_argument('games', nargs='+', help="arquivos JSONL com 'moves' e 'winner' por partida")
+    fit.add_argument('--output', default=DEFAULT_WEIGHTS_PATH)
+    fit.add_argument('--start', default=None, help="pesos iniciais (JSON); padrão: os de _create_pattern_weights")
+    fit.add_argument('--iterations', type=int, default=500)
+    fit.add_argument('--learning-rate', type=float, default=0.05)
+    fit.add_argument('--skip-plies', type=int, default=6, help="ignora as primeiras jogadas de cada partida")
+    fit.add_argument('--board-size', type=int, default=15)
+    fit.add_argument('--workers', type=int, default=None)
+
+    args = parser.parse_args()
+    started = time.perf_counter()
+    if args.command == 'generate':
+        from selfplay import player_config
+
+        config = player_config(depth=args.depth, time_limit=args.time)
+        generate_games(args.output, args.games, config, args.workers, args.board_size, args.opening_plies,
+                       args.seed, progress=lambda done: done % 100 == 0 and print(f"{done}/{args.games} partidas"))
+        print(f"{args.games} partidas em {time.perf_counter() - started:.1f}s -> {args.output}")
+        return
+
+    from gomoku import GomokuGame
+
+    weights = GomokuGame(args.board_size, tt_memory_mb=1, search_cache_entries=0,
+                         weights=args.start).relative_weights()
+    data = load_positions(args.games, args.board_size, args.skip_plies, args.workers)
+    loaded = time.perf_counter() - started
+    print(f"{len(data['results'])} posições extraídas em {loaded:.1f}s "
+          f"({len(data['results']) / loaded:.0f} por segundo)")
+
+    tuned, report = tune_weights(data, weights, args.iterations, args.learning_rate)
+    print(f"K = {report['scale']:.3g}; erro de treino {report['train_loss'][0]:.5f} -> {report['train_loss'][1]:.5f}, "
+          f"validação {report['validation_loss'][0]:.5f} -> {report['validation_loss'][1]:.5f}")
+    for name in sorted(tuned):
+        note = " (fixo)" if name in report['fixed'] else ""
+        print(f"  {name}: {weights[name]} -> {tuned[name]}{note}")
+
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump(tuned, f, indent=2, sort_keys=True)
+    print(f"{time.perf_counter() - started:.1f}s -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()